@@ -0,0 +1,275 @@
+"""
+Category tree service
+Process-wide immutable snapshot of Categorias/Subcategorias
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.infrastructure.search.text import fold_text
+from app.presentation.schemas import CategoriaResponse, SubcategoriaResponse
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SubcategoriaNode:
+    id: int
+    categoria_id: int
+    nombre: str
+    activo: bool
+    fecha_creacion: Any
+
+
+@dataclass(frozen=True)
+class CategoriaNode:
+    id: int
+    nombre: str
+    descripcion: Optional[str]
+    activo: bool
+    fecha_creacion: Any
+    fecha_actualizacion: Any
+    subcategorias: Tuple[SubcategoriaNode, ...] = ()
+
+
+@dataclass(frozen=True)
+class CategoryTree:
+    """Immutable snapshot; replaced as a whole when the tables change"""
+    version: int
+    fingerprint: Tuple
+    categorias: Tuple[CategoriaNode, ...]
+    categorias_by_id: Mapping[int, CategoriaNode] = field(repr=False)
+    subcategorias_by_id: Mapping[int, SubcategoriaNode] = field(repr=False)
+    categoria_id_by_name: Mapping[str, int] = field(repr=False)
+    subcategoria_id_by_name: Mapping[str, int] = field(repr=False)
+    subcategoria_id_by_cat_name: Mapping[Tuple[int, str], int] = field(repr=False)
+    admin_response: Tuple[CategoriaResponse, ...] = field(repr=False)
+    public_response: Tuple[Dict[str, Any], ...] = field(repr=False)
+
+    @staticmethod
+    def name_key(value: Any) -> str:
+        """Accent/case-folded, whitespace-collapsed name ("  Alimento  Húmedo" -> "alimento humedo")"""
+        return " ".join(fold_text(str(value)).split())
+
+
+class CategoryTreeService:
+    """
+    Serves category lookups from memory.
+
+    The snapshot is reloaded when:
+    - `invalidate()` is called (category messages published / sync deletes);
+      the worker applies those writes later, so the fingerprint is re-checked on
+      every access until it changes or CATEGORY_TREE_STALE_WINDOW_SECONDS pass;
+    - the periodic fingerprint check (every CATEGORY_TREE_CHECK_SECONDS) sees a
+      change made by someone else.
+
+    The fingerprint/load queries run without holding the lock: under
+    AsyncSession.run_sync they yield to the event loop, and a thread lock held
+    across that yield would block the loop thread for the next caller. The lock
+    only guards the "check in progress" flag and the snapshot swap; while one
+    caller checks, the others keep serving the current snapshot. Lookup misses
+    are answered from the snapshot as well (no extra query).
+    """
+
+    def __init__(self):
+        self._tree: Optional[CategoryTree] = None
+        self._lock = threading.Lock()
+        self._checking = False
+        self._checked_at = 0.0
+        self._stale_since: Optional[float] = None
+        self._version = 0
+
+    @staticmethod
+    def _fingerprint(db: Session) -> Tuple:
+        row = db.execute(text("""
+            SELECT
+                (SELECT COUNT(*) FROM Categorias) AS cat_count,
+                (SELECT CHECKSUM_AGG(BINARY_CHECKSUM(id, nombre, descripcion, activo, fecha_actualizacion)) FROM Categorias) AS cat_checksum,
+                (SELECT COUNT(*) FROM Subcategorias) AS sub_count,
+                (SELECT CHECKSUM_AGG(BINARY_CHECKSUM(id, categoria_id, nombre, activo)) FROM Subcategorias) AS sub_checksum
+        """)).first()
+        return (row.cat_count, row.cat_checksum, row.sub_count, row.sub_checksum)
+
+    def _load(self, db: Session, fingerprint: Tuple) -> CategoryTree:
+        cat_rows = db.execute(text("""
+            SELECT id, nombre, descripcion, activo, fecha_creacion, fecha_actualizacion
+            FROM Categorias ORDER BY id
+        """)).fetchall()
+        sub_rows = db.execute(text("""
+            SELECT id, categoria_id, nombre, activo, fecha_creacion
+            FROM Subcategorias ORDER BY id
+        """)).fetchall()
+
+        subs_by_cat: Dict[int, List[SubcategoriaNode]] = {}
+        subcategorias_by_id: Dict[int, SubcategoriaNode] = {}
+        subcategoria_id_by_name: Dict[str, int] = {}
+        subcategoria_id_by_cat_name: Dict[Tuple[int, str], int] = {}
+        for r in sub_rows:
+            node = SubcategoriaNode(
+                id=int(r.id),
+                categoria_id=int(r.categoria_id),
+                nombre=r.nombre,
+                activo=bool(r.activo) if r.activo is not None else True,
+                fecha_creacion=r.fecha_creacion
+            )
+            subs_by_cat.setdefault(node.categoria_id, []).append(node)
+            subcategorias_by_id[node.id] = node
+            key = CategoryTree.name_key(node.nombre)
+            subcategoria_id_by_name.setdefault(key, node.id)
+            subcategoria_id_by_cat_name.setdefault((node.categoria_id, key), node.id)
+
+        categorias = []
+        categoria_id_by_name: Dict[str, int] = {}
+        for r in cat_rows:
+            node = CategoriaNode(
+                id=int(r.id),
+                nombre=r.nombre,
+                descripcion=r.descripcion,
+                activo=bool(r.activo) if r.activo is not None else True,
+                fecha_creacion=r.fecha_creacion,
+                fecha_actualizacion=r.fecha_actualizacion,
+                subcategorias=tuple(subs_by_cat.get(int(r.id), ()))
+            )
+            categorias.append(node)
+            categoria_id_by_name.setdefault(CategoryTree.name_key(node.nombre), node.id)
+
+        admin_response = tuple(
+            CategoriaResponse(
+                id=c.id,
+                nombre=c.nombre,
+                created_at=c.fecha_creacion,
+                updated_at=c.fecha_actualizacion or c.fecha_creacion,
+                subcategorias=[
+                    SubcategoriaResponse(
+                        id=s.id,
+                        categoria_id=c.id,
+                        nombre=s.nombre,
+                        created_at=s.fecha_creacion,
+                        updated_at=s.fecha_creacion or c.fecha_creacion
+                    )
+                    for s in c.subcategorias
+                ]
+            )
+            for c in categorias
+        )
+        public_response = tuple(
+            {
+                "id": c.id,
+                "nombre": c.nombre,
+                "descripcion": c.descripcion if c.descripcion else "",
+                "activo": c.activo,
+                "fecha_creacion": c.fecha_creacion.isoformat() if c.fecha_creacion else None,
+                "fecha_actualizacion": c.fecha_actualizacion.isoformat() if c.fecha_actualizacion else None
+            }
+            for c in sorted(categorias, key=lambda c: c.nombre.casefold())
+            if c.activo
+        )
+
+        # version is assigned when the snapshot is swapped in (get_tree)
+        return CategoryTree(
+            version=0,
+            fingerprint=fingerprint,
+            categorias=tuple(categorias),
+            categorias_by_id=MappingProxyType({c.id: c for c in categorias}),
+            subcategorias_by_id=MappingProxyType(subcategorias_by_id),
+            categoria_id_by_name=MappingProxyType(categoria_id_by_name),
+            subcategoria_id_by_name=MappingProxyType(subcategoria_id_by_name),
+            subcategoria_id_by_cat_name=MappingProxyType(subcategoria_id_by_cat_name),
+            admin_response=admin_response,
+            public_response=public_response
+        )
+
+    def get_tree(self, db: Session, force_check: bool = False) -> CategoryTree:
+        """Current snapshot, reloading it first if the version check says so"""
+        now = time.monotonic()
+        tree = self._tree
+        needs_check = (
+            tree is None
+            or force_check
+            or self._stale_since is not None
+            or now - self._checked_at >= settings.CATEGORY_TREE_CHECK_SECONDS
+        )
+        if not needs_check:
+            return tree
+
+        with self._lock:
+            if self._checking and tree is not None:
+                return tree
+            self._checking = True
+        try:
+            fingerprint = self._fingerprint(db)
+            loaded = None
+            if tree is None or fingerprint != tree.fingerprint:
+                loaded = self._load(db, fingerprint)
+        finally:
+            with self._lock:
+                self._checking = False
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+            current = self._tree
+            if loaded is not None and (current is None or current.fingerprint != fingerprint):
+                self._version += 1
+                current = replace(loaded, version=self._version)
+                self._tree = current
+                self._stale_since = None
+                logger.info("Category tree snapshot v%s loaded (%s categorias, %s subcategorias)",
+                            current.version, len(current.categorias), len(current.subcategorias_by_id))
+            elif self._stale_since is not None and now - self._stale_since > settings.CATEGORY_TREE_STALE_WINDOW_SECONDS:
+                self._stale_since = None
+            return current
+
+    def invalidate(self) -> None:
+        """A category write was published/applied: re-check on next access"""
+        if self._stale_since is None:
+            self._stale_since = time.monotonic()
+
+    def get_categoria(self, db: Session, categoria_id: int) -> Optional[CategoriaNode]:
+        """Category by id"""
+        return self.get_tree(db).categorias_by_id.get(int(categoria_id))
+
+    def get_subcategoria(self, db: Session, subcategoria_id: int) -> Optional[SubcategoriaNode]:
+        """Subcategory by id"""
+        return self.get_tree(db).subcategorias_by_id.get(int(subcategoria_id))
+
+    def resolve_categoria_id(self, db: Session, value: Any) -> Optional[int]:
+        """Category id from an id or a name (accent/case-insensitive, O(1))"""
+        try:
+            node = self.get_categoria(db, int(value))
+            return node.id if node else None
+        except (TypeError, ValueError):
+            pass
+        return self.get_tree(db).categoria_id_by_name.get(CategoryTree.name_key(value))
+
+    def resolve_subcategoria_id(self, db: Session, value: Any, categoria_id: Optional[int] = None) -> Optional[int]:
+        """
+        Subcategory id from an id or a name (accent/case-insensitive, O(1)).
+        Names are only unique per category, so a match inside `categoria_id`
+        wins over the first global match.
+        """
+        try:
+            node = self.get_subcategoria(db, int(value))
+            return node.id if node else None
+        except (TypeError, ValueError):
+            pass
+        key = CategoryTree.name_key(value)
+
+        def lookup(tree: CategoryTree) -> Optional[int]:
+            if categoria_id is not None:
+                scoped = tree.subcategoria_id_by_cat_name.get((int(categoria_id), key))
+                if scoped is not None:
+                    return scoped
+            return tree.subcategoria_id_by_name.get(key)
+
+        return lookup(self.get_tree(db))
+
+
+# Create singleton instance
+category_tree_service = CategoryTreeService()
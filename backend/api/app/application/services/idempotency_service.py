@@ -0,0 +1,240 @@
+"""
+Idempotency Service: Idempotency-Key support for create endpoints
+A retried request with the same key gets the stored response back instead
+of running again (no new stock checks, inserts or Stripe calls)
+
+The key row is inserted in the same transaction as the work it protects and
+updated with the response right before commit, so a stored response always
+belongs to committed work. A concurrent retry blocks on the key row until the
+first request commits (and then replays it) or rolls back (and then runs).
+Committed responses are also kept in an in-process TTL cache in front of the table.
+"""
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.infrastructure.cache.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+PURGE_INTERVAL_SECONDS = 300
+PURGE_BATCH = 500
+
+LOOKUP_QUERY = text("""
+    SELECT solicitud_hash, status_code, respuesta
+    FROM ClavesIdempotencia
+    WHERE usuario_id = :usuario_id AND clave_hash = :clave_hash AND expira_en > SYSUTCDATETIME()
+""")
+
+CLAIM_INSERT = text("""
+    INSERT INTO ClavesIdempotencia (usuario_id, clave_hash, solicitud_hash, expira_en)
+    VALUES (:usuario_id, :clave_hash, :solicitud_hash, DATEADD(SECOND, :ttl_seconds, SYSUTCDATETIME()))
+""")
+
+# Una clave vencida se puede volver a usar
+DELETE_EXPIRED_KEY = text("""
+    DELETE FROM ClavesIdempotencia
+    WHERE usuario_id = :usuario_id AND clave_hash = :clave_hash AND expira_en <= SYSUTCDATETIME()
+""")
+
+COMPLETE_UPDATE = text("""
+    UPDATE ClavesIdempotencia SET status_code = :status_code, respuesta = :respuesta
+    WHERE usuario_id = :usuario_id AND clave_hash = :clave_hash
+""")
+
+PURGE_EXPIRED = text("""
+    DELETE TOP (:limit) FROM ClavesIdempotencia WHERE expira_en <= SYSUTCDATETIME()
+""")
+
+
+def _sha256(value: str) -> bytes:
+    return hashlib.sha256(value.encode("utf-8")).digest()
+
+
+def request_hash(payload: Any) -> bytes:
+    """Fingerprint of the request body (key order does not matter)"""
+    return _sha256(json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":")))
+
+
+@dataclass
+class IdempotencyClaim:
+    """A key taken by the current request; completed right before commit"""
+    usuario_id: int
+    clave_hash: bytes
+    solicitud_hash: bytes
+    status_code: Optional[int] = None
+    respuesta: Optional[str] = None
+
+    @property
+    def cache_key(self) -> Tuple[int, bytes]:
+        return (self.usuario_id, self.clave_hash)
+
+
+class IdempotencyService:
+    """Claim / replay of Idempotency-Key requests, scoped per user and endpoint"""
+
+    def __init__(self, cache: Optional[TTLCache] = None, ttl_seconds: Optional[int] = None,
+                 clock=time.monotonic):
+        self.cache = cache if cache is not None else TTLCache(
+            max_entries=settings.IDEMPOTENCY_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.IDEMPOTENCY_CACHE_TTL_SECONDS,
+        )
+        self.ttl_seconds = settings.IDEMPOTENCY_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._clock = clock
+        self._last_purge = clock()
+
+    @staticmethod
+    def _replay(status_code: int, respuesta: str) -> JSONResponse:
+        return JSONResponse(
+            status_code=status_code, content=json.loads(respuesta), headers={REPLAYED_HEADER: "true"}
+        )
+
+    @staticmethod
+    def _check_same_request(stored_hash: bytes, claim: IdempotencyClaim) -> None:
+        if bytes(stored_hash) != claim.solicitud_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={
+                    "status": "error",
+                    "message": f"La clave {IDEMPOTENCY_HEADER} ya se usó con otra solicitud.",
+                    "code": "IDEMPOTENCY_KEY_REUSED",
+                }
+            )
+
+    def _lookup(self, db: Session, claim: IdempotencyClaim) -> Optional[JSONResponse]:
+        cached = self.cache.get(claim.cache_key)
+        if cached is not None:
+            stored_hash, status_code, respuesta = cached
+            self._check_same_request(stored_hash, claim)
+            return self._replay(status_code, respuesta)
+
+        row = db.execute(
+            LOOKUP_QUERY, {"usuario_id": claim.usuario_id, "clave_hash": claim.clave_hash}
+        ).first()
+        if row is None:
+            return None
+        self._check_same_request(row.solicitud_hash, claim)
+        if row.respuesta is None:
+            # Solo posible si la fila se completó fuera de este servicio
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"status": "error", "message": "La solicitud original sigue en proceso.", "code": "IDEMPOTENCY_IN_PROGRESS"}
+            )
+        self.cache.set(claim.cache_key, (bytes(row.solicitud_hash), row.status_code, row.respuesta))
+        return self._replay(row.status_code, row.respuesta)
+
+    def _insert(self, db: Session, claim: IdempotencyClaim) -> bool:
+        try:
+            db.execute(CLAIM_INSERT, {
+                "usuario_id": claim.usuario_id,
+                "clave_hash": claim.clave_hash,
+                "solicitud_hash": claim.solicitud_hash,
+                "ttl_seconds": int(self.ttl_seconds),
+            })
+            return True
+        except IntegrityError:
+            # Otra solicitud con la misma clave hizo commit primero
+            db.rollback()
+            return False
+
+    def _maybe_purge(self, db: Session) -> None:
+        now = self._clock()
+        if now - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        purged = db.execute(PURGE_EXPIRED, {"limit": PURGE_BATCH}).rowcount
+        if purged:
+            logger.info(f"Purged {purged} expired idempotency keys")
+
+    def begin(
+        self,
+        db: Session,
+        usuario_id: int,
+        endpoint: str,
+        key: Optional[str],
+        payload: Any,
+    ) -> Tuple[Optional[IdempotencyClaim], Optional[JSONResponse]]:
+        """
+        Call at the start of the request, before any write.
+
+        Returns:
+            (None, response) if the key was already used: return the response as is.
+            (claim, None) otherwise: run the request and call `complete` before commit.
+            (None, None) if no key was sent.
+
+        Raises:
+            HTTPException: 400 for a malformed key, 422 if the key was used with another body
+        """
+        if key is None:
+            return None, None
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"status": "error", "message": f"{IDEMPOTENCY_HEADER} debe tener entre 1 y {MAX_KEY_LENGTH} caracteres."}
+            )
+
+        claim = IdempotencyClaim(
+            usuario_id=int(usuario_id),
+            clave_hash=_sha256(f"{endpoint}\n{key}"),
+            solicitud_hash=request_hash(payload),
+        )
+        replay = self._lookup(db, claim)
+        if replay is not None:
+            logger.info(f"Idempotent replay: {endpoint}, usuario_id={usuario_id}")
+            return None, replay
+
+        if not self._insert(db, claim):
+            replay = self._lookup(db, claim)
+            if replay is not None:
+                logger.info(f"Idempotent replay after concurrent request: {endpoint}, usuario_id={usuario_id}")
+                return None, replay
+            # La fila existente estaba vencida
+            db.execute(DELETE_EXPIRED_KEY, {"usuario_id": claim.usuario_id, "clave_hash": claim.clave_hash})
+            if not self._insert(db, claim):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={"status": "error", "message": "La solicitud original sigue en proceso.", "code": "IDEMPOTENCY_IN_PROGRESS"}
+                )
+
+        self._maybe_purge(db)
+        return claim, None
+
+    def complete(self, db: Session, claim: Optional[IdempotencyClaim], response: Any,
+                 status_code: int = status.HTTP_201_CREATED) -> None:
+        """Store the response in the claimed row; call right before db.commit()"""
+        if claim is None:
+            return
+        claim.status_code = status_code
+        claim.respuesta = json.dumps(jsonable_encoder(response), separators=(",", ":"), ensure_ascii=False)
+        db.execute(COMPLETE_UPDATE, {
+            "status_code": claim.status_code,
+            "respuesta": claim.respuesta,
+            "usuario_id": claim.usuario_id,
+            "clave_hash": claim.clave_hash,
+        })
+
+    def remember(self, claim: Optional[IdempotencyClaim]) -> None:
+        """Put a committed response in the front cache; call after db.commit()"""
+        if claim is None or claim.respuesta is None:
+            return
+        self.cache.set(claim.cache_key, (claim.solicitud_hash, claim.status_code, claim.respuesta))
+
+
+# Singleton instance
+idempotency_service = IdempotencyService()
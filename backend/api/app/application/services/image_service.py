@@ -15,6 +15,7 @@ from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
+from app.infrastructure.cache import catalog_version
 
 logger = logging.getLogger(__name__)
 
@@ -108,6 +109,7 @@ class ImageService:
             """)
             db.execute(query, {"producto_id": producto_id, "ruta_imagen": ruta_imagen})
             db.commit()
+            catalog_version.bump()
         except SQLAlchemyError as e:
             logger.exception("Error inserting product image: %s", e)
             db.rollback()
@@ -144,6 +146,7 @@ class ImageService:
             res = db.execute(query, params)
             row = res.fetchone()
             db.commit()
+            catalog_version.bump()
             return row
         except Exception as e:
             logger.exception("Error updating product image: %s", e)
@@ -157,6 +160,7 @@ class ImageService:
             query = text("DELETE FROM ProductoImagenes WHERE id = :imagen_id AND producto_id = :producto_id")
             res = db.execute(query, {"imagen_id": imagen_id, "producto_id": producto_id})
             db.commit()
+            catalog_version.bump()
             try:
                 return res.rowcount
             except Exception:
@@ -173,6 +177,7 @@ class ImageService:
             query = text("DELETE FROM ProductoImagenes WHERE producto_id = :id")
             db.execute(query, {"id": producto_id})
             db.commit()
+            catalog_version.bump()
         except Exception as e:
             logger.exception("Error deleting all product images: %s", e)
             db.rollback()
@@ -0,0 +1,106 @@
+"""
+Order Export Service: CSV/NDJSON export of orders for accounting
+One line per order item (orders without items get one line with empty item columns)
+"""
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# Filas por fetch del cursor; la memoria depende de esto, no del rango exportado
+EXPORT_BATCH_ROWS = 1000
+
+EXPORT_COLUMNS = [
+    "pedido_id", "fecha_creacion", "usuario_id", "cliente", "email", "estado", "estado_pago",
+    "metodo_pago", "subtotal", "costo_envio", "total", "municipio", "departamento", "pais",
+    "item_id", "producto_id", "producto_nombre", "cantidad", "precio_unitario", "total_item",
+]
+
+EXPORT_QUERY = text("""
+    SELECT p.id AS pedido_id, p.fecha_creacion, p.usuario_id, u.nombre_completo AS cliente, u.email,
+           p.estado, p.estado_pago, p.metodo_pago, p.subtotal, p.costo_envio, p.total,
+           p.municipio, p.departamento, p.pais,
+           i.id AS item_id, i.producto_id, pr.nombre AS producto_nombre, i.cantidad, i.precio_unitario,
+           i.cantidad * i.precio_unitario AS total_item
+    FROM Pedidos p
+    LEFT JOIN Usuarios u ON u.id = p.usuario_id
+    LEFT JOIN PedidoItems i ON i.pedido_id = p.id
+    LEFT JOIN Productos pr ON pr.id = i.producto_id
+    WHERE p.fecha_creacion >= :desde AND p.fecha_creacion < :hasta
+    ORDER BY p.fecha_creacion, p.id, i.id
+""")
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class OrderExportService:
+    """Streams the export from a forward-only cursor in EXPORT_BATCH_ROWS chunks"""
+
+    def __init__(self, engine: Engine = None):
+        self._engine = engine
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            from app.core.database import engine
+            self._engine = engine
+        return self._engine
+
+    @staticmethod
+    def _batches(conn: Connection, desde: date, hasta: date) -> Iterator[List[Dict[str, Any]]]:
+        # No stream_results: the mssql dialect has no server-side cursors and ignores it.
+        # Memory stays bounded because partitions() -> pyodbc fetchmany pulls rows from
+        # the driver's forward-only cursor one batch at a time.
+        result = conn.execute(
+            EXPORT_QUERY,
+            # hasta inclusive
+            {"desde": desde, "hasta": hasta + timedelta(days=1)}
+        )
+        for partition in result.partitions(EXPORT_BATCH_ROWS):
+            yield [{col: _plain(value) for col, value in zip(EXPORT_COLUMNS, row)} for row in partition]
+
+    def iter_batches(self, desde: date, hasta: date) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Own connection for the whole stream: the request session may be closed
+        before the response body finishes.
+        """
+        rows = 0
+        with self.engine.connect() as conn:
+            for batch in self._batches(conn, desde, hasta):
+                rows += len(batch)
+                yield batch
+        logger.info(f"Orders export {desde}..{hasta}: {rows} rows")
+
+    def iter_csv(self, desde: date, hasta: date) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        for batch in self.iter_batches(desde, hasta):
+            writer.writerows(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def iter_ndjson(self, desde: date, hasta: date) -> Iterator[str]:
+        for batch in self.iter_batches(desde, hasta):
+            yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in batch)
+
+
+# Singleton instance
+order_export_service = OrderExportService()
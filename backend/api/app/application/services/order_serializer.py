@@ -0,0 +1,168 @@
+"""
+Order Serializer: PedidoResponse dicts for a page of orders
+Loads product names/main images and customer names for the whole page at once,
+plus the single-query summary projection used by the admin grid
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.infrastructure.repositories.sql_helpers import id_list_param, in_id_list, keyset_after_clause
+
+logger = logging.getLogger(__name__)
+
+
+class OrderSerializer:
+    """
+    Serialize orders with a fixed number of queries per page.
+
+    Items come from `Pedido.detalles` (joined eager load, no extra query);
+    products and users are fetched with one query each for every order in
+    the page, so a page costs 2 queries regardless of its size.
+    """
+
+    @staticmethod
+    def _load_products(db: Session, producto_ids) -> Dict[int, Any]:
+        if not producto_ids:
+            return {}
+        rows = db.execute(
+            text(f"""
+                SELECT p.id, p.nombre, img.ruta_imagen AS imagen
+                FROM Productos p
+                OUTER APPLY (
+                    SELECT TOP 1 ruta_imagen FROM ProductoImagenes
+                    WHERE producto_id = p.id ORDER BY orden ASC
+                ) img
+                WHERE {in_id_list('p.id')}
+            """),
+            {"ids": id_list_param(producto_ids)}
+        ).fetchall()
+        return {row.id: row for row in rows}
+
+    @staticmethod
+    def _load_user_names(db: Session, usuario_ids) -> Dict[int, str]:
+        if not usuario_ids:
+            return {}
+        rows = db.execute(
+            text(f"SELECT id, nombre_completo FROM Usuarios WHERE {in_id_list('id')}"),
+            {"ids": id_list_param(usuario_ids)}
+        ).fetchall()
+        return {row.id: row.nombre_completo for row in rows}
+
+    @staticmethod
+    def serialize_many(db: Session, pedidos: Iterable) -> List[Dict[str, Any]]:
+        """Serialize a page of orders (2 queries for any page size)"""
+        pedidos = list(pedidos)
+        if not pedidos:
+            return []
+
+        items_by_pedido = {
+            pedido.id: sorted(pedido.detalles or [], key=lambda item: item.id)
+            for pedido in pedidos
+        }
+        productos = OrderSerializer._load_products(
+            db, {item.producto_id for items in items_by_pedido.values() for item in items}
+        )
+        nombres = OrderSerializer._load_user_names(db, {pedido.usuario_id for pedido in pedidos})
+
+        result = []
+        for pedido in pedidos:
+            items_resp = []
+            for item in items_by_pedido[pedido.id]:
+                item_data = {
+                    "id": item.id,
+                    "producto_id": item.producto_id,
+                    "cantidad": item.cantidad,
+                    "precio_unitario": float(item.precio_unitario),
+                }
+                producto = productos.get(item.producto_id)
+                if producto:
+                    item_data["producto_nombre"] = producto.nombre
+                    item_data["producto_imagen"] = producto.imagen
+                items_resp.append(item_data)
+
+            result.append({
+                "id": pedido.id,
+                "usuario_id": pedido.usuario_id,
+                "clienteNombre": nombres.get(pedido.usuario_id) or f"Usuario ID: {pedido.usuario_id}",
+                "estado": pedido.estado,
+                "total": float(pedido.total),
+                "metodo_pago": pedido.metodo_pago or 'Efectivo',
+                "direccion_entrega": pedido.direccion_entrega,
+                "municipio": pedido.municipio,
+                "departamento": pedido.departamento,
+                "pais": pedido.pais or 'Colombia',
+                "telefono_contacto": pedido.telefono_contacto,
+                "fecha_creacion": pedido.fecha_creacion,
+                "items": items_resp,
+            })
+        return result
+
+    @staticmethod
+    def serialize(db: Session, pedido) -> Dict[str, Any]:
+        """Serialize a single order"""
+        return OrderSerializer.serialize_many(db, [pedido])[0]
+
+    @staticmethod
+    def list_summaries(
+        db: Session,
+        estado: Optional[str] = None,
+        usuario_id: Optional[int] = None,
+        estado_pago: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Grid columns only (PedidoResumenResponse), newest first, in one query.
+        Rows are read as tuples: no Pedido/PedidoItem hydration, no items payload.
+        With `after` (decoded cursor) the page starts after that row and skip is ignored.
+        """
+        filters, params = [], {"skip": 0 if after else skip, "limit": limit}
+        if estado:
+            filters.append("p.estado = :estado")
+            params["estado"] = estado
+        if estado_pago:
+            filters.append("p.estado_pago = :estado_pago")
+            params["estado_pago"] = estado_pago
+        if usuario_id:
+            filters.append("p.usuario_id = :usuario_id")
+            params["usuario_id"] = usuario_id
+        if after:
+            filters.append(keyset_after_clause("p"))
+            params["after_fecha"], params["after_id"] = after
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+        rows = db.execute(
+            text(f"""
+                SELECT p.id, p.usuario_id, u.nombre_completo, p.estado, p.estado_pago, p.total,
+                       p.fecha_creacion,
+                       (SELECT COUNT(*) FROM PedidoItems i WHERE i.pedido_id = p.id) AS items_count
+                FROM Pedidos p
+                LEFT JOIN Usuarios u ON u.id = p.usuario_id
+                {where}
+                ORDER BY p.fecha_creacion DESC, p.id DESC
+                OFFSET :skip ROWS FETCH NEXT :limit ROWS ONLY
+            """),
+            params
+        ).fetchall()
+        return [
+            {
+                "id": row.id,
+                "usuario_id": row.usuario_id,
+                "clienteNombre": row.nombre_completo or f"Usuario ID: {row.usuario_id}",
+                "estado": row.estado,
+                "estado_pago": row.estado_pago,
+                "total": float(row.total),
+                "fecha_creacion": row.fecha_creacion,
+                "items_count": row.items_count,
+            }
+            for row in rows
+        ]
+
+
+# Singleton instance
+order_serializer = OrderSerializer()
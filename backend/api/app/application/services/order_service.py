@@ -6,7 +6,9 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from datetime import datetime
 import logging
-from app.domain.models import Pedido, PedidoItem, TransaccionPago
+from app.domain.models import Pedido, PedidoItem, PedidosHistorialEstado, TransaccionPago
+from app.domain.order_status import is_valid_transition
+from app.infrastructure.repositories.stock_repository import StockRepository
 from sqlalchemy import text
 
 logger = logging.getLogger(__name__)
@@ -139,17 +141,8 @@ class OrderService:
             # Save previous status
             estado_anterior = pedido.estado
             
-            # Define valid state transitions
-            valid_transitions = {
-                "Pendiente": ["Pagado", "Cancelado"],  # Solo puede cambiar cuando se confirma el pago o se cancela
-                "Pagado": ["Enviado", "Cancelado"],     # Admin puede marcar como enviado o cancelar
-                "Enviado": ["Entregado", "Cancelado"],   # Admin puede marcar como entregado o cancelar
-                "Entregado": [],                         # Estado final - no se puede cambiar
-                "Cancelado": []                          # Estado final - no se puede cambiar
-            }
-            
             # Validate transition
-            if new_status not in valid_transitions.get(estado_anterior, []):
+            if not is_valid_transition(estado_anterior, new_status):
                 logger.warning(
                     f"Invalid state transition: pedido_id={pedido_id}, "
                     f"{estado_anterior} → {new_status}"
@@ -190,7 +183,9 @@ class OrderService:
             )
     
     @staticmethod
-    async def cancel_pending_payment_order(db: Session, pedido_id: int, razon: str = None):
+    async def cancel_pending_payment_order(
+        db: Session, pedido_id: int, razon: str = None, expected_estado: str = None
+    ):
         """
         Cancel an order that is still pending payment
         
@@ -203,6 +198,7 @@ class OrderService:
             db: Database session
             pedido_id: ID of the Pedido
             razon: Reason for cancellation (optional)
+            expected_estado: Only cancel if Pedido.estado is still this (optional)
         
         Returns:
             dict: {
@@ -213,11 +209,11 @@ class OrderService:
         
         Raises:
             HTTPException 404: If Pedido not found
-            HTTPException 400: If estado_pago != "Pendiente de Pago"
+            HTTPException 400: If estado_pago != "Pendiente de Pago", or estado != expected_estado
         """
         try:
-            # Get the Pedido
-            pedido = db.query(Pedido).filter(Pedido.id == pedido_id).first()
+            # Get the Pedido (locked: nobody changes it between the checks and the update)
+            pedido = db.query(Pedido).filter(Pedido.id == pedido_id).with_for_update().first()
             if not pedido:
                 logger.error(f"Pedido not found: pedido_id={pedido_id}")
                 raise HTTPException(
@@ -225,22 +221,44 @@ class OrderService:
                     detail=f"Pedido con ID {pedido_id} no encontrado"
                 )
             
+            estado_anterior, estado_pago = pedido.estado, pedido.estado_pago
+            
             # Check if payment is still pending
-            if pedido.estado_pago != "Pendiente de Pago":
+            if estado_pago != "Pendiente de Pago":
+                db.rollback()  # release the row lock
                 logger.warning(
                     f"Cannot cancel non-pending order: pedido_id={pedido_id}, "
-                    f"estado_pago={pedido.estado_pago}"
+                    f"estado_pago={estado_pago}"
                 )
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Solo se pueden cancelar pedidos pendientes de pago. "
-                           f"Estado actual: {pedido.estado_pago}"
+                           f"Estado actual: {estado_pago}"
+                )
+            
+            if expected_estado is not None and estado_anterior != expected_estado:
+                db.rollback()  # release the row lock
+                logger.warning(
+                    f"Cannot cancel order: pedido_id={pedido_id}, "
+                    f"estado={estado_anterior}, expected={expected_estado}"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"El pedido ya no está en estado {expected_estado}. Estado actual: {estado_anterior}"
                 )
             
-            # Update status to Cancelado
+            # Update status to Cancelado, record it and give back its stock holds
             pedido.estado = "Cancelado"
             pedido.estado_pago = "Cancelado"
             db.add(pedido)
+            db.add(PedidosHistorialEstado(
+                pedido_id=pedido_id,
+                estado_anterior=estado_anterior,
+                estado_nuevo="Cancelado",
+                usuario_id=None,
+                nota=razon,
+            ))
+            StockRepository(db).release_holds(pedido_id)
             db.commit()
             db.refresh(pedido)
             
@@ -0,0 +1,110 @@
+"""
+Order Status Batch: apply one estado transition to many orders at once
+Validates with the order state machine, writes history and estado with
+set-based statements in one transaction and publishes the events as a batch
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.domain.order_status import is_valid_transition
+from app.infrastructure.external.rabbitmq import publish_many_safe
+from app.infrastructure.repositories.sql_helpers import id_list_param, in_id_list
+
+logger = logging.getLogger(__name__)
+
+ESTADO_CAMBIADO_QUEUE = "pedido.estado.cambiado"
+
+# UPDLOCK: nadie cambia estos pedidos entre la validación y el UPDATE
+LOCK_QUERY = text(f"""
+    SELECT id, estado FROM Pedidos WITH (UPDLOCK, ROWLOCK)
+    WHERE {in_id_list("id")}
+""")
+
+# estado_anterior sale de la fila bloqueada, antes del UPDATE
+HISTORY_INSERT = text(f"""
+    INSERT INTO PedidosHistorialEstado (pedido_id, estado_anterior, estado_nuevo, usuario_id, nota)
+    SELECT p.id, p.estado, :estado, :usuario_id, :nota
+    FROM Pedidos p
+    WHERE {in_id_list("p.id")}
+""")
+
+STATUS_UPDATE = text(f"""
+    UPDATE Pedidos SET estado = :estado
+    WHERE {in_id_list("id")}
+""")
+
+
+class OrderStatusBatchService:
+    """Three statements per batch regardless of its size, plus one broker round"""
+
+    @staticmethod
+    def apply(
+        db: Session,
+        pedido_ids: Iterable[int],
+        estado: str,
+        nota: Optional[str] = None,
+        usuario_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Move every order whose current estado allows it to `estado`.
+
+        Orders that do not exist or whose transition is invalid are left
+        untouched and reported in `rechazados`; the rest are committed together.
+        """
+        ids = sorted({int(x) for x in pedido_ids})
+        try:
+            actuales = {
+                row.id: row.estado
+                for row in db.execute(LOCK_QUERY, {"ids": id_list_param(ids)}).fetchall()
+            }
+
+            validos: List[int] = []
+            rechazados: List[Dict[str, Any]] = []
+            for pedido_id in ids:
+                estado_actual = actuales.get(pedido_id)
+                if estado_actual is None:
+                    rechazados.append({"pedido_id": pedido_id, "estado_actual": None, "motivo": "Pedido no encontrado"})
+                elif not is_valid_transition(estado_actual, estado):
+                    rechazados.append({
+                        "pedido_id": pedido_id,
+                        "estado_actual": estado_actual,
+                        "motivo": f"Transición de estado inválida: {estado_actual} → {estado}",
+                    })
+                else:
+                    validos.append(pedido_id)
+
+            if validos:
+                params = {"ids": id_list_param(validos), "estado": estado, "usuario_id": usuario_id, "nota": nota}
+                db.execute(HISTORY_INSERT, params)
+                db.execute(STATUS_UPDATE, params)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(
+            f"Batch status update → {estado}: {len(validos)} updated, {len(rechazados)} rejected"
+        )
+
+        eventos = [
+            {"pedido_id": pedido_id, "estado_anterior": actuales[pedido_id], "estado_nuevo": estado}
+            for pedido_id in validos
+        ]
+        # best-effort, como en el cambio individual: el estado ya quedó confirmado
+        publicados = publish_many_safe(ESTADO_CAMBIADO_QUEUE, eventos) if eventos else 0
+        if publicados < len(eventos):
+            logger.warning(f"Batch status update: {len(eventos) - publicados} events not published")
+
+        return {
+            "estado": estado,
+            "actualizados": validos,
+            "rechazados": rechazados,
+            "eventos_publicados": publicados,
+        }
+
+
+# Singleton instance
+order_status_batch_service = OrderStatusBatchService()
@@ -12,6 +12,7 @@ from sqlalchemy import text
 
 from app.application.services.stripe_service import stripe_service
 import app.domain.models as models
+from app.infrastructure.repositories.stock_repository import InsufficientStockError, StockRepository
 
 logger = logging.getLogger(__name__)
 
@@ -184,28 +185,18 @@ class PaymentService:
             HTTPException: If any item lacks stock
         """
         try:
-            # Get all items in the order
-            items = db.query(models.PedidoItem).filter(
-                models.PedidoItem.pedido_id == pedido_id
-            ).all()
-            
-            for item in items:
-                # Check stock for each product
-                result = db.execute(
-                    text("SELECT cantidad_disponible FROM Productos WHERE id = :id"),
-                    {"id": item.producto_id}
-                ).fetchone()
-                
-                if not result or result.cantidad_disponible < item.cantidad:
-                    available = result.cantidad_disponible if result else 0
-                    logger.warning(
-                        f"Stock insufficient for producto {item.producto_id}: "
-                        f"needed {item.cantidad}, available {available}"
-                    )
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Stock insuficiente para producto {item.producto_id}"
-                    )
+            # One query for every item; units held by other pending orders are not available
+            faltantes = StockRepository(db).order_shortages(pedido_id)
+            if faltantes:
+                f = faltantes[0]
+                logger.warning(
+                    f"Stock insufficient for producto {f['producto_id']}: "
+                    f"needed {f['solicitado']}, available {f['disponible']}"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Stock insuficiente para producto {f['producto_id']}"
+                )
             
             return True
             
@@ -237,27 +228,24 @@ class PaymentService:
         try:
             logger.info(f"Deducting stock for order {pedido_id}")
             
-            # First verify stock is available
-            PaymentService.verify_stock_availability(db, pedido_id)
-            
-            # Get all items in the order
-            items = db.query(models.PedidoItem).filter(
-                models.PedidoItem.pedido_id == pedido_id
-            ).all()
-            
-            # Deduct stock for each item
-            for item in items:
-                update_stmt = text("""
-                    UPDATE Productos 
-                    SET cantidad_disponible = cantidad_disponible - :cantidad
-                    WHERE id = :id
-                """)
-                db.execute(update_stmt, {
-                    "cantidad": item.cantidad,
-                    "id": item.producto_id
-                })
-                
-                logger.info(f"Stock deducted for producto {item.producto_id}: {item.cantidad} units")
+            # Verify and deduct every item in one statement (all or nothing);
+            # the order's own stock holds become the deduction
+            stock = StockRepository(db)
+            try:
+                restante = stock.reserve_order(pedido_id)
+            except InsufficientStockError as e:
+                producto_id = e.first["producto_id"]
+                logger.warning(
+                    f"Stock insufficient for producto {producto_id}: "
+                    f"needed {e.first['solicitado']}, available {e.first['disponible']}"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Stock insuficiente para producto {producto_id}"
+                )
+            
+            stock.release_holds(pedido_id)
+            logger.info(f"Stock deducted for order {pedido_id}: {len(restante)} productos")
             
             return True
             
@@ -335,10 +323,7 @@ class PaymentService:
                     "pedido_id": pedido_id
                 }
             
-            # Verify stock availability
-            PaymentService.verify_stock_availability(db, pedido_id)
-            
-            # Deduct stock
+            # Verify and deduct stock (single atomic statement)
             PaymentService.deduct_stock(db, pedido_id)
             
             # Update order status
@@ -0,0 +1,56 @@
+"""
+Product facets: storefront navigation counts built from the GROUPING SETS
+rows of ProductRepository.get_facet_counts
+"""
+from typing import Any, Dict, Iterable, List
+
+
+def build_facets(rows: Iterable[Any], price_boundaries: List[int]) -> Dict[str, Any]:
+    """
+    Split facet rows by `nivel` into the response shape:
+    total, categories (with their subcategories) sorted by name, and one
+    price bucket per boundary interval (empty buckets count 0, the last has
+    no upper bound). Subcategories whose category row is missing are dropped.
+    """
+    total = 0
+    categorias: Dict[int, Dict[str, Any]] = {}
+    bucket_counts: Dict[int, int] = {}
+    subcategorias = []
+    for r in rows:
+        if r.nivel == 'total':
+            total = int(r.total)
+        elif r.nivel == 'precio':
+            bucket_counts[int(r.bucket)] = int(r.total)
+        elif r.nivel == 'categoria':
+            categorias[int(r.categoria_id)] = {
+                "id": int(r.categoria_id),
+                "nombre": r.categoria_nombre,
+                "total": int(r.total),
+                "subcategorias": []
+            }
+        else:
+            subcategorias.append(r)
+
+    for r in subcategorias:
+        cat = categorias.get(int(r.categoria_id))
+        if cat is not None:
+            cat["subcategorias"].append({
+                "id": int(r.subcategoria_id),
+                "nombre": r.subcategoria_nombre,
+                "total": int(r.total)
+            })
+
+    bounds = [0] + list(price_boundaries)
+    precios = [
+        {
+            "desde": bounds[i],
+            "hasta": price_boundaries[i] if i < len(price_boundaries) else None,
+            "total": bucket_counts.get(i, 0)
+        }
+        for i in range(len(bounds))
+    ]
+
+    ordered = sorted(categorias.values(), key=lambda c: (c["nombre"] or ""))
+    for cat in ordered:
+        cat["subcategorias"].sort(key=lambda sc: (sc["nombre"] or ""))
+    return {"total": total, "categorias": ordered, "precios": precios}
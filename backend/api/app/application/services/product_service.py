@@ -3,6 +3,7 @@ Product service - Business Logic Layer
 Centralizes all product-related business logic
 Follows Single Responsibility and Dependency Inversion principles
 """
+import json
 import uuid
 import logging
 from typing import Dict, Any, List, Optional
@@ -14,6 +15,10 @@ from app.infrastructure.repositories.product_repository import ProductRepository
 from app.application.validators.product_validator import ProductValidator
 from app.application.services.ratings_service import RatingsService
 from app.infrastructure.external.rabbitmq import publish_message_safe
+from app.infrastructure.cache import catalog_version
+from app.application.services.search_service import product_search_service
+from app.application.services.category_tree_service import category_tree_service
+from app.application.services.product_facets import build_facets
 
 logger = logging.getLogger(__name__)
 
@@ -135,19 +140,76 @@ class ProductService:
 
         return products
 
+    def build_product_card(self, row: Any) -> Dict[str, Any]:
+        """Build fully enriched product dict from a `list_product_cards` row"""
+        producto = self.build_product_response(row)
+
+        producto['categoria'] = {
+            "id": row.categoria_id,
+            "nombre": row.cat_nombre,
+            "created_at": row.cat_created_at,
+            "updated_at": row.cat_updated_at
+        } if row.cat_nombre is not None else None
+
+        producto['subcategoria'] = {
+            "id": row.subcategoria_id,
+            "categoria_id": row.sub_categoria_id,
+            "nombre": row.sub_nombre,
+            "created_at": row.sub_created_at,
+            "updated_at": row.sub_created_at
+        } if row.sub_nombre is not None else None
+
+        try:
+            images = json.loads(row.imagenes_json) if row.imagenes_json else []
+        except (TypeError, ValueError):
+            logger.exception("Invalid imagenes_json for product %s", row.id)
+            images = []
+        producto['imagenes'] = [img.get('ruta_imagen') for img in images]
+
+        producto['promedio_calificacion'] = float(row.promedio_calificacion) if row.promedio_calificacion is not None else 0.0
+        producto['total_calificaciones'] = int(row.total_calificaciones or 0)
+        return producto
+
+    def list_product_cards(
+        self,
+        categoria_id: Optional[int] = None,
+        subcategoria_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 20,
+        after: Optional[tuple] = None
+    ) -> List[Dict[str, Any]]:
+        """Enriched product page in a single query (see ProductRepository.list_product_cards)"""
+        rows = self.repository.list_product_cards(categoria_id, subcategoria_id, skip, limit, after=after)
+        return [self.build_product_card(r) for r in rows]
+
+    def get_products_in_order(self, producto_ids: List[int]) -> List[Dict[str, Any]]:
+        """Enriched active products for `producto_ids`, keeping the given order"""
+        if not producto_ids:
+            return []
+        rows = self.repository.get_products_by_ids(producto_ids)
+        by_id = {int(r.id): self.build_product_response(r) for r in rows}
+        products = [by_id[pid] for pid in producto_ids if pid in by_id]
+        products = self.enrich_products_with_relations(products)
+        return self.enrich_products_with_ratings(products)
+
+    def get_facets(self, price_boundaries: List[int]) -> Dict[str, Any]:
+        """Category/subcategory counts and price buckets for storefront navigation"""
+        return build_facets(self.repository.get_facet_counts(price_boundaries), price_boundaries)
+
     def resolve_category_and_subcategory(self, categoria_value: Any, subcategoria_value: Any) -> tuple:
         """
-        Resolve category and subcategory IDs from values
+        Resolve category and subcategory IDs from values (ids or names),
+        served from the in-memory category tree snapshot
         Returns: (categoria_id, subcategoria_id, error_response)
         """
-        categoria_id = self.repository.resolve_category_id(categoria_value)
+        categoria_id = category_tree_service.resolve_categoria_id(self.db, categoria_value)
         if categoria_id is None:
             return None, None, JSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={"status": "error", "message": "Categoría no encontrada o id inválido."}
             )
 
-        subcategoria_id = self.repository.resolve_subcategory_id(subcategoria_value)
+        subcategoria_id = category_tree_service.resolve_subcategoria_id(self.db, subcategoria_value, categoria_id)
         if subcategoria_id is None:
             return None, None, JSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -182,6 +244,8 @@ class ProductService:
 
     def publish_product_created(self, message: Dict[str, Any]) -> bool:
         """Publish product created message to RabbitMQ"""
+        catalog_version.bump()
+        product_search_service.mark_created()
         published = publish_message_safe("productos.crear", message, retry=True)
         if not published:
             logger.error(f"Failed to publish message to productos.crear. Message: {message}")
@@ -190,6 +254,8 @@ class ProductService:
     def publish_product_updated(self, producto_id: int, producto: Dict[str, Any]) -> bool:
         """Publish product updated message to RabbitMQ"""
         message = {"producto_id": producto_id, "producto": producto}
+        catalog_version.bump()
+        product_search_service.index_product(producto)
         published = publish_message_safe("productos.actualizar", message, retry=True)
         if not published:
             logger.warning(f"Failed to publish productos.actualizar message for product {producto_id}")
@@ -198,6 +264,7 @@ class ProductService:
     def publish_product_deleted(self, producto_id: int) -> bool:
         """Publish product deleted message to RabbitMQ"""
         message = {"requestId": str(uuid.uuid4()), "productoId": int(producto_id)}
+        catalog_version.bump()
         published = publish_message_safe("productos.eliminar", message, retry=True)
         if not published:
             logger.warning(f"Failed to publish productos.eliminar message for product {producto_id}")
@@ -210,6 +277,7 @@ class ProductService:
             "productoId": int(producto_id),
             "cantidad": int(cantidad)
         }
+        catalog_version.bump()
         published = publish_message_safe("inventario.reabastecer", message, retry=True)
         if not published:
             logger.error(f"Failed to publish inventario.reabastecer message for product {producto_id}")
@@ -0,0 +1,192 @@
+"""
+Product search service
+Keeps the in-memory ProductSearchIndex in sync with Productos
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.infrastructure.search import ProductSearchIndex, PrefixSuggestionIndex
+
+logger = logging.getLogger(__name__)
+
+
+class ProductSearchService:
+    """
+    Full-text search over active products.
+
+    - The index is loaded from the database on first use and fully rebuilt
+      every SEARCH_INDEX_REBUILD_SECONDS as a safety net.
+    - Updates and soft deletes done by the API are applied incrementally.
+    - Creates are persisted by the worker, so `mark_created` only flags the
+      index; the next search pulls rows with id > last indexed id (PK seek).
+    """
+
+    # Give the worker this long to persist a published create before giving up on the catch-up
+    PENDING_CREATE_WINDOW_SECONDS = 60
+
+    def __init__(self):
+        self.index = ProductSearchIndex()
+        # Guards the bookkeeping below only; never held across a query (run_sync
+        # runs on the event loop thread, another request may enter mid-query)
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._max_id = 0
+        self._pending_since: Optional[float] = None
+        self._refreshing = False
+
+    @staticmethod
+    def _fetch_all(db: Session) -> list:
+        return db.execute(text(
+            "SELECT id, nombre, descripcion FROM Productos WHERE activo = 1"
+        )).fetchall()
+
+    @staticmethod
+    def _fetch_created(db: Session, max_id: int) -> list:
+        return db.execute(
+            text("SELECT id, nombre, descripcion FROM Productos WHERE id > :max_id AND activo = 1"),
+            {"max_id": max_id}
+        ).fetchall()
+
+    def _apply_rebuild(self, rows: list) -> None:
+        self.index.rebuild((r.id, r.nombre, r.descripcion) for r in rows)
+        with self._lock:
+            self._max_id = max((int(r.id) for r in rows), default=0)
+            self._loaded_at = time.monotonic()
+            self._pending_since = None
+        logger.info("Product search index rebuilt with %s products", len(rows))
+
+    def _apply_created(self, rows: list) -> None:
+        for r in rows:
+            self.index.upsert(r.id, r.nombre, r.descripcion)
+        with self._lock:
+            self._max_id = max([self._max_id] + [int(r.id) for r in rows])
+            if self._pending_since is not None and (
+                rows or time.monotonic() - self._pending_since > self.PENDING_CREATE_WINDOW_SECONDS
+            ):
+                self._pending_since = None
+
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        Load/rebuild the index if needed and apply pending creates.
+
+        While one caller queries the database, others search the current index;
+        only a cold start (nothing to serve yet) loads in parallel.
+        """
+        with self._lock:
+            age = None if self._loaded_at is None else time.monotonic() - self._loaded_at
+            rebuild = age is None or age > settings.SEARCH_INDEX_REBUILD_SECONDS
+            if not rebuild and self._pending_since is None:
+                return
+            if self._refreshing and self._loaded_at is not None:
+                return
+            self._refreshing = True
+            max_id = self._max_id
+
+        try:
+            if rebuild:
+                self._apply_rebuild(self._fetch_all(db))
+            else:
+                self._apply_created(self._fetch_created(db, max_id))
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def mark_created(self) -> None:
+        """A product create was published; pick it up on the next search"""
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+
+    def index_product(self, producto: Dict[str, Any]) -> None:
+        """Apply an updated product dict (removes it if inactive)"""
+        if self._loaded_at is None or not producto.get("id"):
+            return
+        if producto.get("activo", True):
+            self.index.upsert(producto["id"], producto.get("nombre"), producto.get("descripcion"))
+        else:
+            self.index.remove(producto["id"])
+
+    def remove_product(self, producto_id: int) -> None:
+        """Drop a soft-deleted product from the index"""
+        self.index.remove(producto_id)
+
+    def search(self, db: Session, query: str, skip: int = 0, limit: int = 20) -> List[int]:
+        """Ranked product ids for `query`"""
+        self.ensure_loaded(db)
+        return [producto_id for producto_id, _ in self.index.search(query, limit=limit, offset=skip)]
+
+
+class ProductSuggestionService:
+    """
+    Typeahead suggestions for product names, ranked by units sold.
+
+    A background task rebuilds a PrefixSuggestionIndex every
+    SUGGEST_INDEX_REFRESH_SECONDS and swaps the reference. Lookups only read
+    the current snapshot and never touch the database.
+    """
+
+    def __init__(self):
+        self.snapshot: Optional[PrefixSuggestionIndex] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def rebuild(self) -> None:
+        """Load names + units sold and swap in a new snapshot (blocking)"""
+        db = SessionLocal()
+        try:
+            rows = db.execute(text("""
+                SELECT p.id, p.nombre, COALESCE(SUM(v.cantidad), 0) AS unidades
+                FROM Productos p
+                LEFT JOIN (
+                    SELECT pi.producto_id, pi.cantidad
+                    FROM PedidoItems pi
+                    INNER JOIN Pedidos pe ON pe.id = pi.pedido_id
+                    WHERE pe.estado <> 'Cancelado'
+                ) v ON v.producto_id = p.id
+                WHERE p.activo = 1
+                GROUP BY p.id, p.nombre
+            """)).fetchall()
+        finally:
+            db.close()
+        self.snapshot = PrefixSuggestionIndex((r.id, r.nombre, r.unidades) for r in rows)
+        logger.info("Product suggestion index rebuilt with %s products", len(self.snapshot))
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.rebuild)
+            except Exception:
+                logger.exception("Error rebuilding product suggestion index")
+            await asyncio.sleep(settings.SUGGEST_INDEX_REFRESH_SECONDS)
+
+    def start(self) -> None:
+        """Start the background refresh task (call from the app lifespan)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Suggestions from the current snapshot ([] until the first build finishes)"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return []
+        return snapshot.suggest(prefix, limit)
+
+
+# Create singleton instances
+product_search_service = ProductSearchService()
+product_suggestion_service = ProductSuggestionService()
@@ -0,0 +1,126 @@
+"""
+Stock Hold Sweeper: releases expired ReservasStock holds in the background
+Online-payment orders whose holds expired are cancelled through OrderService, in batches
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.infrastructure.repositories.stock_repository import StockRepository
+
+logger = logging.getLogger(__name__)
+
+EXPIRED_HOLD_REASON = "Reserva de stock vencida"
+
+
+def is_cancellable(pedido: Dict[str, Any]) -> bool:
+    """
+    Only an online-payment order nobody has moved yet is cancelled on expiry.
+    Anything else (cash orders, orders an admin already advanced) only loses its hold.
+    """
+    return (
+        pedido["estado"] == "Pendiente"
+        and pedido["estado_pago"] == "Pendiente de Pago"
+        and pedido["metodo_pago"] in settings.STOCK_HOLD_PAYMENT_METHODS
+    )
+
+
+class StockHoldSweeper:
+    """
+    Every STOCK_HOLD_SWEEP_SECONDS, takes up to STOCK_HOLD_SWEEP_BATCH orders
+    with expired holds (oldest first), cancels the ones `is_cancellable` accepts
+    (which also releases their holds and records the change) and deletes
+    whatever expired holds are left for the batch. Full batches are followed
+    immediately by the next one.
+
+    Database work runs in a worker thread so the event loop is not blocked.
+    """
+
+    def __init__(self, session_factory: Callable = None, cancel_order: Callable = None):
+        self._session_factory = session_factory
+        self._cancel_order = cancel_order
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def session_factory(self) -> Callable:
+        if self._session_factory is None:
+            from app.core.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    @property
+    def cancel_order(self) -> Callable:
+        if self._cancel_order is None:
+            from app.application.services.order_service import OrderService
+            self._cancel_order = OrderService.cancel_pending_payment_order
+        return self._cancel_order
+
+    async def _sweep_batch(self, batch_size: int) -> Dict[str, Any]:
+        db = self.session_factory()
+        try:
+            stock = StockRepository(db)
+            pedidos = stock.expired_hold_orders(batch_size)
+            pedido_ids = [p["pedido_id"] for p in pedidos]
+            cancelados = []
+            for pedido in pedidos:
+                if not is_cancellable(pedido):
+                    continue
+                try:
+                    # expected_estado: si alguien lo movió desde la consulta, no se cancela
+                    await self.cancel_order(
+                        db, pedido["pedido_id"], razon=EXPIRED_HOLD_REASON, expected_estado="Pendiente"
+                    )
+                    cancelados.append(pedido["pedido_id"])
+                except HTTPException as e:
+                    # Ya pagado o cambiado: solo quedan reservas por liberar
+                    logger.info(f"Expired hold for pedido {pedido['pedido_id']} not cancelled: {e.detail}")
+            liberadas = stock.release_expired(pedido_ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if pedido_ids:
+            logger.info(
+                f"Stock hold sweep: {len(pedido_ids)} pedidos expired, "
+                f"{len(cancelados)} cancelled, {liberadas} leftover holds released"
+            )
+        return {"expirados": len(pedido_ids), "cancelados": cancelados, "liberadas": liberadas}
+
+    def sweep_once(self, batch_size: int = None) -> Dict[str, Any]:
+        """One batch (blocking; OrderService methods are coroutines, so it runs its own loop)"""
+        return asyncio.run(self._sweep_batch(batch_size or settings.STOCK_HOLD_SWEEP_BATCH))
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                while True:
+                    result = await asyncio.to_thread(self.sweep_once)
+                    if result["expirados"] < settings.STOCK_HOLD_SWEEP_BATCH:
+                        break
+            except Exception:
+                logger.exception("Error sweeping expired stock holds")
+            await asyncio.sleep(settings.STOCK_HOLD_SWEEP_SECONDS)
+
+    def start(self) -> None:
+        """Start the background sweep task (call from the app lifespan)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Singleton instance
+stock_hold_sweeper = StockHoldSweeper()
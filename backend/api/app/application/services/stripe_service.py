@@ -7,6 +7,7 @@ import logging
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
 from app.core.config import settings
+from app.infrastructure.monitoring.metrics import track_stripe_call
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,8 @@ class StripeService:
         currency: str = "USD",
         customer_email: str = "",
         description: str = "",
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Create a Stripe Payment Intent for processing payment
@@ -39,6 +41,7 @@ class StripeService:
             customer_email: Customer email address
             description: Description for the payment
             metadata: Additional metadata to store with the intent
+            idempotency_key: Stripe idempotency key (retries return the same intent)
             
         Returns:
             Dictionary with payment intent details:
@@ -70,15 +73,19 @@ class StripeService:
             
             logger.info(f"Creating payment intent: amount={amount} {currency}, email={customer_email}")
             
+            request_options = {"idempotency_key": idempotency_key} if idempotency_key else {}
+            
             # Create payment intent in Stripe
-            payment_intent = stripe.PaymentIntent.create(
-                amount=int(amount),  # Ensure it's an integer for Stripe
-                currency=currency.lower(),
-                description=description or f"Order payment - {currency}",
-                metadata=intent_metadata,
-                # Enable all payment methods
-                automatic_payment_methods={"enabled": True},
-            )
+            with track_stripe_call("payment_intent_create"):
+                payment_intent = stripe.PaymentIntent.create(
+                    amount=int(amount),  # Ensure it's an integer for Stripe
+                    currency=currency.lower(),
+                    description=description or f"Order payment - {currency}",
+                    metadata=intent_metadata,
+                    # Enable all payment methods
+                    automatic_payment_methods={"enabled": True},
+                    **request_options,
+                )
             
             logger.info(f"Payment intent created: {payment_intent.id}")
             
@@ -153,7 +160,8 @@ class StripeService:
         try:
             logger.info(f"Confirming payment intent: {payment_intent_id}")
             
-            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            with track_stripe_call("payment_intent_retrieve"):
+                payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
             
             logger.info(f"Payment intent status: {payment_intent.status}")
             
@@ -197,7 +205,8 @@ class StripeService:
         try:
             logger.info(f"Getting payment intent status: {payment_intent_id}")
             
-            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            with track_stripe_call("payment_intent_retrieve"):
+                payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
             
             return {
                 'id': payment_intent.id,
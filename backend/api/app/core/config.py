@@ -31,6 +31,15 @@ class Settings(BaseSettings):
         """Construct SQL Server connection string"""
         return f"mssql+pyodbc://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_SERVER}:{self.DB_PORT}/{self.DB_NAME}?driver=ODBC+Driver+17+for+SQL+Server"
     
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """Same database through aioodbc (AsyncSession, read endpoints)"""
+        return f"mssql+aioodbc://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_SERVER}:{self.DB_PORT}/{self.DB_NAME}?driver=ODBC+Driver+17+for+SQL+Server"
+    
+    # Async engine pool (aioodbc)
+    ASYNC_DB_POOL_SIZE: int = 10
+    ASYNC_DB_MAX_OVERFLOW: int = 20
+    
     # RabbitMQ
     RABBITMQ_HOST: str = "localhost"
     RABBITMQ_PORT: int = 5672
@@ -92,6 +101,45 @@ class Settings(BaseSettings):
     STRIPE_PUBLISHABLE_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
     
+    # Public catalog response cache (0 disables it)
+    CATALOG_CACHE_TTL_SECONDS: int = 30
+    CATALOG_CACHE_MAX_ENTRIES: int = 256
+    
+    # Category tree snapshot: fingerprint check interval / max wait for worker writes
+    CATEGORY_TREE_CHECK_SECONDS: int = 15
+    CATEGORY_TREE_STALE_WINDOW_SECONDS: int = 60
+    
+    # Stock holds for orders pending payment (0 disables holds and the sweeper)
+    STOCK_HOLD_TTL_SECONDS: int = 900
+    # Only orders paid online (Stripe) are held; other methods never expire
+    STOCK_HOLD_PAYMENT_METHODS: List[str] = ["Tarjeta"]
+    STOCK_HOLD_SWEEP_SECONDS: int = 30
+    STOCK_HOLD_SWEEP_BATCH: int = 200
+    
+    # Idempotency-Key responses: stored for IDEMPOTENCY_TTL_SECONDS, with an in-process front cache
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_CACHE_TTL_SECONDS: int = 600
+    IDEMPOTENCY_CACHE_MAX_ENTRIES: int = 2048
+    
+    # Price range buckets (upper bounds, COP) for the catalog facets endpoint
+    FACET_PRICE_BOUNDARIES: List[int] = [25000, 50000, 100000, 200000]
+    
+    # In-memory product search index (full rebuild interval)
+    SEARCH_INDEX_REBUILD_SECONDS: int = 600
+    SUGGEST_INDEX_REFRESH_SECONDS: int = 300
+    
+    # Event loop stall detector (opt-in): heartbeat interval / stall threshold
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_MONITOR_INTERVAL_MS: int = 50
+    LOOP_MONITOR_THRESHOLD_MS: int = 100
+    
+    # Prometheus /metrics endpoint
+    METRICS_ENABLED: bool = True
+    
+    # Per-request SQL stats (Server-Timing header) and default statements-per-request budget
+    QUERY_STATS_ENABLED: bool = True
+    SQL_QUERY_BUDGET: int = 25
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -87,6 +87,9 @@ DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
 MIN_PAGE_SIZE = 1
 
+# Batch lookups (GET /api/productos?ids=...)
+MAX_BATCH_IDS = 300
+
 # File upload constants
 MAX_FILE_SIZE_BYTES = 10485760  # 10 MB
 
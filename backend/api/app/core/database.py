@@ -3,8 +3,10 @@ Database connection and session management using SQLAlchemy
 """
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
-from typing import Generator
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from typing import AsyncGenerator, Generator, Optional
 from app.core.config import settings
+from app.infrastructure.monitoring.metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
 import logging
 # Note: models are imported inside init_db() to avoid circular import issues
 
@@ -14,6 +16,7 @@ logger = logging.getLogger(__name__)
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
+    poolclass=InstrumentedQueuePool,  # checkout count / wait time for /metrics
     pool_pre_ping=True,  # Verify connection health before using
     pool_recycle=3600,   # Recycle connections after 1 hour
 )
@@ -36,6 +39,45 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+# Async engine (aioodbc) for read endpoints; created on first use so scripts
+# that only need the sync engine (worker, migrations) don't require aioodbc
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return the shared async engine, creating it on first call"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            settings.ASYNC_DATABASE_URL,
+            echo=settings.DEBUG,
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            pool_size=settings.ASYNC_DB_POOL_SIZE,
+            max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+        )
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+        if settings.METRICS_ENABLED:
+            instrument_engine(_async_engine.sync_engine, "async")
+    return _async_engine
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for FastAPI to inject an AsyncSession
+
+    Queries are awaited instead of blocking the event loop. Existing sync
+    repositories/services can be reused through `await db.run_sync(fn)`.
+    """
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+
 def init_db():
     """Initialize database by creating all tables"""
     try:
@@ -66,3 +108,13 @@ def close_db():
     """Close database engine connection"""
     engine.dispose()
     logger.info("Database connection closed")
+
+
+async def close_async_db():
+    """Close the async engine pool, if it was created"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+        logger.info("Async database connection closed")
@@ -2,7 +2,7 @@
 Message Broker Protocol - Interface for message queue abstraction
 Allows switching between RabbitMQ, Kafka, SQS without changing business logic
 """
-from typing import Dict, Any, Protocol
+from typing import Dict, Any, List, Protocol
 
 
 class MessageBroker(Protocol):
@@ -23,6 +23,15 @@ class MessageBroker(Protocol):
         """
         ...
     
+    def publish_many(self, queue_name: str, messages: List[Dict[str, Any]], durable: bool = True) -> int:
+        """
+        Publish several messages to one queue in a single round of I/O
+
+        Returns:
+            Number of messages published
+        """
+        ...
+    
     def close(self) -> None:
         """Close connection to message broker"""
         ...
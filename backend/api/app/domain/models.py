@@ -264,4 +264,18 @@ class EventoWebhookStripe(Base):
     procesado = Column(Boolean, default=False, nullable=False)
     resultado = Column(String(300), nullable=True)
     fecha_recibido = Column(DateTime(timezone=True), server_default=func.now(), index=True)
-    fecha_procesado = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
+    fecha_procesado = Column(DateTime(timezone=True), nullable=True)
+
+class ReservaStock(Base):
+    """
+    Modelo para la tabla ReservasStock
+    Reserva temporal de stock de un pedido pendiente de pago (vence en expira_en)
+    """
+    __tablename__ = 'ReservasStock'
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    pedido_id = Column(Integer, ForeignKey('Pedidos.id', ondelete='CASCADE'), nullable=False, index=True)
+    producto_id = Column(Integer, nullable=False)
+    cantidad = Column(Integer, nullable=False)
+    expira_en = Column(DateTime, nullable=False)
+    fecha_creacion = Column(DateTime, server_default=func.now())
@@ -0,0 +1,18 @@
+"""
+Order status state machine (Pedido.estado)
+Shared by OrderService and the bulk status endpoint
+"""
+from typing import Dict, List
+
+ORDER_STATUS_TRANSITIONS: Dict[str, List[str]] = {
+    "Pendiente": ["Pagado", "Cancelado"],  # Solo puede cambiar cuando se confirma el pago o se cancela
+    "Pagado": ["Enviado", "Cancelado"],     # Admin puede marcar como enviado o cancelar
+    "Enviado": ["Entregado", "Cancelado"],   # Admin puede marcar como entregado o cancelar
+    "Entregado": [],                         # Estado final - no se puede cambiar
+    "Cancelado": []                          # Estado final - no se puede cambiar
+}
+
+
+def is_valid_transition(estado_actual: str, estado_nuevo: str) -> bool:
+    """True if `estado_actual` → `estado_nuevo` is allowed"""
+    return estado_nuevo in ORDER_STATUS_TRANSITIONS.get(estado_actual, [])
@@ -0,0 +1,12 @@
+"""
+In-process caches
+"""
+from app.infrastructure.cache.ttl_cache import TTLCache, catalog_cache
+from app.infrastructure.cache.catalog_version import CatalogVersion, catalog_version
+
+__all__ = [
+    'TTLCache',
+    'catalog_cache',
+    'CatalogVersion',
+    'catalog_version',
+]
@@ -0,0 +1,54 @@
+"""
+Catalog version counter used to build ETags for catalog read endpoints
+Bumped by product, category, image and carousel writes
+"""
+import logging
+import threading
+import time
+import uuid
+from typing import Callable
+
+from app.core.config import settings
+from app.infrastructure.cache.ttl_cache import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogVersion:
+    """
+    Monotonically increasing, in-process catalog version.
+
+    The ETag also carries a per-process epoch (so a restart never reuses a
+    previous tag) and a time window of `window_seconds`. The window bounds how
+    long a client can keep a stale tag when the write itself is applied later
+    by the worker (the API only publishes the message).
+    """
+
+    def __init__(self, window_seconds: int = 30, clock: Callable[[], float] = time.time):
+        self.window_seconds = int(window_seconds)
+        self._clock = clock
+        self._epoch = uuid.uuid4().hex[:8]
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        return self._version
+
+    def bump(self) -> int:
+        """Register a catalog write: new version and drop cached responses"""
+        with self._lock:
+            self._version += 1
+            version = self._version
+        catalog_cache.invalidate()
+        logger.debug("Catalog version bumped to %s", version)
+        return version
+
+    def etag(self, scope: str) -> str:
+        """Strong ETag for a catalog representation (`scope` names the endpoint)"""
+        window = int(self._clock() // self.window_seconds) if self.window_seconds > 0 else 0
+        return f'"{scope}-{self._epoch}-{self._version}-{window}"'
+
+
+# Instancia global
+catalog_version = CatalogVersion(window_seconds=settings.CATALOG_CACHE_TTL_SECONDS)
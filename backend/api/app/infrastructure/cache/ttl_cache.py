@@ -0,0 +1,93 @@
+"""
+Bounded in-memory cache with TTL expiry and LRU eviction
+Used for hot public read endpoints (catalog browsing)
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe TTL + LRU cache.
+
+    - Entries expire `ttl_seconds` after being stored.
+    - When `max_entries` is reached the least recently used entry is evicted.
+    - `invalidate()` clears everything; called from the write paths that
+      change what the cached responses contain.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Incremented on every invalidation so a value computed before a
+        # write is not stored after it (see `set`)
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value or `default` if missing/expired"""
+        if self.ttl_seconds <= 0:
+            return default
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Store value. If `generation` is given and the cache was invalidated
+        since it was read, the value is stale and is discarded.
+        """
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (self._clock() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+        logger.debug("Cache invalidated (generation=%s)", self._generation)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+# Instancia global para respuestas del catálogo público
+catalog_cache = TTLCache(
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+)
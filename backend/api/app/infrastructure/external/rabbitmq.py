@@ -6,8 +6,13 @@ import pika
 import json
 import logging
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from app.core.config import settings
+from app.infrastructure.monitoring.metrics import (
+    RABBITMQ_PUBLISH_LATENCY,
+    RABBITMQ_PUBLISH_RESULTS,
+    RABBITMQ_PUBLISH_RETRIES,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +46,16 @@ class RabbitMQProducer:
             logger.error(f"Failed to ensure RabbitMQ connection: {str(e)}")
             raise
     
+    def _drop_connection(self):
+        """Forget the current connection so the next call reconnects"""
+        try:
+            if self.connection and not self.connection.is_closed:
+                self.connection.close()
+        except Exception:
+            pass
+        self.connection = None
+        self.channel = None
+    
     def connect(self):
         """Establish connection to RabbitMQ"""
         try:
@@ -88,6 +103,7 @@ class RabbitMQProducer:
             Exception: If all retry attempts fail and retry=False
         """
         last_error = None
+        started = time.perf_counter()
         
         for attempt in range(MAX_RETRY_ATTEMPTS if retry else 1):
             try:
@@ -104,6 +120,8 @@ class RabbitMQProducer:
                     )
                 )
                 logger.info(f"Message published to queue: {queue_name}, requestId: {message.get('requestId', 'N/A')}")
+                RABBITMQ_PUBLISH_LATENCY.observe(time.perf_counter() - started, (queue_name,))
+                RABBITMQ_PUBLISH_RESULTS.inc((queue_name, "ok"))
                 return True
                 
             except Exception as e:
@@ -111,19 +129,17 @@ class RabbitMQProducer:
                 logger.warning(f"Failed to publish message to {queue_name} (attempt {attempt + 1}/{MAX_RETRY_ATTEMPTS}): {str(e)}")
                 
                 # Close connection to force reconnect on next attempt
-                try:
-                    if self.connection and not self.connection.is_closed:
-                        self.connection.close()
-                    self.connection = None
-                    self.channel = None
-                except Exception:
-                    pass
+                self._drop_connection()
                 
                 # Wait before retry (exponential backoff)
                 if attempt < MAX_RETRY_ATTEMPTS - 1:
+                    if retry:
+                        RABBITMQ_PUBLISH_RETRIES.inc((queue_name,))
                     time.sleep(RETRY_DELAY_SECONDS * (attempt + 1))
         
         # All retries failed
+        RABBITMQ_PUBLISH_LATENCY.observe(time.perf_counter() - started, (queue_name,))
+        RABBITMQ_PUBLISH_RESULTS.inc((queue_name, "error"))
         error_msg = f"Failed to publish message to {queue_name} after {MAX_RETRY_ATTEMPTS} attempts"
         logger.error(f"{error_msg}: {str(last_error)}")
         
@@ -131,7 +147,59 @@ class RabbitMQProducer:
             raise last_error
         
         return False
-    
+
+    def publish_many(self, queue_name: str, messages: List[Dict[str, Any]], durable: bool = True) -> int:
+        """
+        Publish several messages to one queue over a single connection/channel
+
+        The queue is declared once for the whole batch. If the channel fails
+        midway, one reconnect is attempted for the remaining messages; if that
+        fails too, the rest are dropped (logged and counted as errors) instead
+        of retrying message by message with backoff.
+
+        Returns:
+            int: Number of messages published
+        """
+        if not messages:
+            return 0
+        started = time.perf_counter()
+        properties = pika.BasicProperties(
+            delivery_mode=2 if durable else 1,
+            content_type='application/json'
+        )
+        published = 0
+        for attempt in range(2):  # batch + one reconnect for the remainder
+            try:
+                self._ensure_connection()
+                self.declare_queue(queue_name, durable)
+                for message in messages[published:]:
+                    self.channel.basic_publish(
+                        exchange='',
+                        routing_key=queue_name,
+                        body=json.dumps(message),
+                        properties=properties
+                    )
+                    published += 1
+                break
+            except Exception as e:
+                logger.warning(
+                    f"Batch publish to {queue_name} interrupted after {published}/{len(messages)} "
+                    f"(attempt {attempt + 1}/2): {str(e)}"
+                )
+                self._drop_connection()
+                if attempt == 0:
+                    RABBITMQ_PUBLISH_RETRIES.inc((queue_name,))
+
+        RABBITMQ_PUBLISH_LATENCY.observe(time.perf_counter() - started, (queue_name,))
+        RABBITMQ_PUBLISH_RESULTS.inc((queue_name, "ok"), published)
+        unpublished = len(messages) - published
+        if unpublished:
+            RABBITMQ_PUBLISH_RESULTS.inc((queue_name, "error"), unpublished)
+            logger.error(f"Batch publish to {queue_name}: {unpublished}/{len(messages)} messages not published")
+        else:
+            logger.info(f"Batch published to queue: {queue_name}, messages: {published}")
+        return published
+
     def close(self):
         """Close connection (call on application shutdown)"""
         try:
@@ -174,6 +242,20 @@ def publish_message_safe(queue_name: str, message: dict, retry: bool = True) ->
         return False
 
 
+
+def publish_many_safe(queue_name: str, messages: List[dict]) -> int:
+    """
+    Batch counterpart of `publish_message_safe`.
+
+    Returns:
+        int: Number of messages published (0 on connection failure)
+    """
+    try:
+        return rabbitmq_producer.publish_many(queue_name, messages, durable=True)
+    except Exception as e:
+        logger.error(f"Failed to publish batch to {queue_name}: {str(e)}")
+        return 0
+
 async def send_email_notification(
     to_email: str,
     subject: str,
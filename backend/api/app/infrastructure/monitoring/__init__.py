@@ -0,0 +1,16 @@
+"""
+Runtime monitoring (event loop health)
+"""
+from app.infrastructure.monitoring.loop_monitor import EventLoopMonitor, event_loop_monitor
+from app.infrastructure.monitoring.metrics import registry as metrics_registry, instrument_engine
+from app.infrastructure.monitoring.query_stats import QueryStats, count_queries, query_budget
+
+__all__ = [
+    'EventLoopMonitor',
+    'event_loop_monitor',
+    'metrics_registry',
+    'instrument_engine',
+    'QueryStats',
+    'count_queries',
+    'query_budget',
+]
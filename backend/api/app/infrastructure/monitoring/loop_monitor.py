@@ -0,0 +1,202 @@
+"""
+Event loop stall detector
+
+A heartbeat task sleeps `interval` seconds and measures how late it wakes up
+(loop lag). A watchdog thread notices when the heartbeat is overdue by more
+than `threshold` and captures the stack of the loop thread while it is still
+blocked, together with the route of the task that was running. Stalls are
+attributed per route and logged.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_ROUTE = "desconocida"
+
+
+def _route_label(scope: dict) -> str:
+    """`METHOD /path/template` for an ASGI scope (falls back to the raw path)"""
+    method = scope.get("method", "")
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return f"{method} {route.path}"
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return f"{method} {getattr(endpoint, '__name__', endpoint)}"
+    return f"{method} {scope.get('path', '')}"
+
+
+class EventLoopMonitor:
+    """Samples event loop lag and records what blocked it"""
+
+    def __init__(
+        self,
+        interval_ms: int = 50,
+        threshold_ms: int = 100,
+        max_stalls: int = 50,
+        stack_limit: int = 25,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.interval = interval_ms / 1000.0
+        self.threshold = threshold_ms / 1000.0
+        self.stack_limit = stack_limit
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_beat: Optional[float] = None
+        # Stall captured by the watchdog, completed by the heartbeat once the loop resumes
+        self._pending: Optional[dict] = None
+        self._task_scopes: "weakref.WeakKeyDictionary[asyncio.Task, dict]" = weakref.WeakKeyDictionary()
+        self._stalls: deque = deque(maxlen=max_stalls)
+        self._routes: Dict[str, dict] = {}
+        self.samples = 0
+        self.total_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.stalls_total = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start sampling; must be called from the running event loop"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._last_beat = self._clock()
+        self._task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            "Event loop monitor started (interval=%sms, threshold=%sms)",
+            int(self.interval * 1000), int(self.threshold * 1000),
+        )
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def track_request(self, scope: dict) -> None:
+        """Associate the current task with a request scope (see LoopMonitorMiddleware)"""
+        task = asyncio.current_task()
+        if task is not None:
+            self._task_scopes[task] = scope
+
+    async def _heartbeat(self) -> None:
+        while True:
+            started = self._clock()
+            await asyncio.sleep(self.interval)
+            now = self._clock()
+            self._record_lag(max(0.0, now - started - self.interval), now)
+
+    def _record_lag(self, lag: float, now: float) -> None:
+        lag_ms = lag * 1000.0
+        with self._lock:
+            self._last_beat = now
+            pending, self._pending = self._pending, None
+            self.samples += 1
+            self.total_lag_ms += lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if lag < self.threshold:
+                return
+            stall = pending or {"route": UNKNOWN_ROUTE, "task": None, "stack": None}
+            stall["blocked_ms"] = round(lag_ms, 1)
+            stall["at"] = datetime.now(timezone.utc).isoformat()
+            self._stalls.append(stall)
+            self.stalls_total += 1
+            stats = self._routes.setdefault(stall["route"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += lag_ms
+            stats["max_ms"] = max(stats["max_ms"], lag_ms)
+
+        logger.warning(
+            "Event loop blocked for %.0fms by %s\n%s",
+            lag_ms, stall["route"], stall["stack"] or "(stack not captured)",
+        )
+
+    def _watch(self) -> None:
+        poll = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(poll):
+            with self._lock:
+                if self._pending is not None or self._last_beat is None:
+                    continue
+                overdue = self._clock() - self._last_beat - self.interval
+                if overdue >= self.threshold:
+                    self._pending = self._capture()
+
+    def _capture(self) -> dict:
+        """Stack and route of whatever is running on the (blocked) loop thread"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame, limit=self.stack_limit)) if frame else None
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        scope = self._task_scopes.get(task) if task is not None else None
+        return {
+            "route": _route_label(scope) if scope else UNKNOWN_ROUTE,
+            "task": task.get_name() if task is not None else None,
+            "stack": stack,
+        }
+
+    def snapshot(self) -> dict:
+        """Current statistics (admin endpoint)"""
+        with self._lock:
+            routes = [
+                {"route": route, "count": s["count"], "total_ms": round(s["total_ms"], 1), "max_ms": round(s["max_ms"], 1)}
+                for route, s in self._routes.items()
+            ]
+            routes.sort(key=lambda r: r["total_ms"], reverse=True)
+            return {
+                "running": self.running,
+                "interval_ms": int(self.interval * 1000),
+                "threshold_ms": int(self.threshold * 1000),
+                "samples": self.samples,
+                "avg_lag_ms": round(self.total_lag_ms / self.samples, 2) if self.samples else 0.0,
+                "max_lag_ms": round(self.max_lag_ms, 1),
+                "stalls_total": self.stalls_total,
+                "routes": routes,
+                "recent_stalls": [dict(s) for s in reversed(self._stalls)],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stalls.clear()
+            self._routes.clear()
+            self.samples = 0
+            self.total_lag_ms = 0.0
+            self.max_lag_ms = 0.0
+            self.stalls_total = 0
+
+
+# Instancia global (se inicia en el lifespan si LOOP_MONITOR_ENABLED)
+event_loop_monitor = EventLoopMonitor(
+    interval_ms=settings.LOOP_MONITOR_INTERVAL_MS,
+    threshold_ms=settings.LOOP_MONITOR_THRESHOLD_MS,
+)
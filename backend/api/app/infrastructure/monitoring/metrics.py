@@ -0,0 +1,245 @@
+"""
+Prometheus-compatible metrics (text exposition format 0.0.4)
+
+Each metric keeps one shard per thread. A thread only ever writes its own
+shard, so recording takes no lock; /metrics sums the shards when scraped.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base: per-thread shards of {labels: value}"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = self._local.values = {}
+            self._shards.append(shard)
+        return shard
+
+    def _merged(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for shard in list(self._shards):
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def _samples(self) -> Iterable[str]:
+        for labels, value in sorted(self._merged().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    """Additive gauge (in-flight counts); shards hold +/- deltas"""
+
+    type = "gauge"
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class CallbackGauge(_Metric):
+    """Gauge read at scrape time from `callback() -> [(labels, value), ...]`"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], callback: Callable[[], Iterable[Tuple[Labels, float]]]):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def _merged(self) -> Dict[Labels, float]:
+        try:
+            return dict(self.callback())
+        except Exception:
+            return {}
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # [count per bucket..., +Inf bucket, sum]
+            entry = shard[labels] = [0] * (len(self.buckets) + 2)
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    @contextmanager
+    def time(self, labels: Labels = ()):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, labels)
+
+    def _samples(self) -> Iterable[str]:
+        totals: Dict[Labels, List[float]] = {}
+        for shard in list(self._shards):
+            for labels, entry in list(shard.items()):
+                acc = totals.setdefault(labels, [0] * len(entry))
+                for i, v in enumerate(list(entry)):
+                    acc[i] += v
+        for labels, entry in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), entry[:-1]):
+                cumulative += count
+                names = self.labelnames + ("le",)
+                values = labels + (_format_value(bound),)
+                yield f"{self.name}_bucket{_format_labels(names, values)} {_format_value(cumulative)}"
+            label_str = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_str} {_format_value(entry[-1])}"
+            yield f"{self.name}_count{label_str} {_format_value(cumulative)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")))
+HTTP_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")))
+HTTP_IN_PROGRESS = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served", ("method",)))
+
+DB_POOL_CHECKOUTS = registry.register(Counter(
+    "db_pool_checkouts_total", "Connections checked out from the SQLAlchemy pool", ("engine",)))
+DB_POOL_WAIT = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time to obtain a connection from the SQLAlchemy pool", ("engine",),
+    buckets=POOL_WAIT_BUCKETS))
+
+RABBITMQ_PUBLISH_LATENCY = registry.register(Histogram(
+    "rabbitmq_publish_duration_seconds", "RabbitMQ publish latency (including retries)", ("queue",)))
+RABBITMQ_PUBLISH_RESULTS = registry.register(Counter(
+    "rabbitmq_publish_total", "RabbitMQ publishes by outcome", ("queue", "outcome")))
+RABBITMQ_PUBLISH_RETRIES = registry.register(Counter(
+    "rabbitmq_publish_retries_total", "Failed RabbitMQ publish attempts that were retried", ("queue",)))
+
+STRIPE_LATENCY = registry.register(Histogram(
+    "stripe_request_duration_seconds", "Stripe API call latency", ("operation", "outcome")))
+
+
+@contextmanager
+def track_stripe_call(operation: str):
+    """Time a Stripe API call, labelled ok/error"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        STRIPE_LATENCY.observe(time.perf_counter() - start, (operation, outcome))
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkouts and how long each one waited"""
+
+    engine_label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start, (self.engine_label,))
+            DB_POOL_CHECKOUTS.inc((self.engine_label,))
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """Same metrics for the async engine's pool (labelled engine="async")"""
+
+    engine_label = "async"
+
+
+_instrumented_engines: Dict[str, object] = {}
+
+
+def _pool_stats() -> List[Tuple[Labels, float]]:
+    stats = []
+    for label, engine in list(_instrumented_engines.items()):
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            stats += [
+                ((label, "size"), pool.size()),
+                ((label, "checked_out"), pool.checkedout()),
+                ((label, "overflow"), max(0, pool.overflow())),
+            ]
+    return stats
+
+
+DB_POOL_CONNECTIONS = registry.register(CallbackGauge(
+    "db_pool_connections", "SQLAlchemy pool connections by state", ("engine", "state"), _pool_stats))
+
+
+def instrument_engine(engine, label: str = "sync") -> None:
+    """Expose pool size / checked out / overflow gauges for `engine` (sync Engine, or AsyncEngine.sync_engine)"""
+    _instrumented_engines[label] = engine
@@ -0,0 +1,115 @@
+"""
+Per-request SQL statement counter
+
+Listeners on every SQLAlchemy Engine (sync and the async engine's sync core)
+add each statement's count and duration to the QueryStats bound to the
+current request context (see QueryStatsMiddleware). `count_queries()` collects
+process-wide instead, for tests and benchmarks.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MAX_RECORDED_STATEMENTS = 50
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    budget: Optional[int] = None
+    statements: Optional[List[str]] = None  # only kept when record_statements=True
+    route: Optional[str] = None  # "METHOD /template", set when the request ends
+
+    def add(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        if self.statements is not None and len(self.statements) < MAX_RECORDED_STATEMENTS:
+            self.statements.append(" ".join(statement.split()))
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_seconds * 1000.0
+
+    def over_budget(self, default_budget: Optional[int] = None) -> bool:
+        budget = self.budget if self.budget is not None else default_budget
+        return budget is not None and self.count > budget
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_global_collectors: List[QueryStats] = []
+_collectors_lock = threading.Lock()
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def begin_request_stats(record_statements: bool = False):
+    """Bind a fresh QueryStats to the current context; returns (stats, token)"""
+    stats = QueryStats(statements=[] if record_statements else None)
+    return stats, _current_stats.set(stats)
+
+
+def end_request_stats(token) -> None:
+    _current_stats.reset(token)
+
+
+@contextmanager
+def count_queries(record_statements: bool = True):
+    """Count every statement executed by any thread while the block runs"""
+    stats = QueryStats(statements=[] if record_statements else None)
+    with _collectors_lock:
+        _global_collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _global_collectors.remove(stats)
+
+
+def query_budget(max_queries: int):
+    """
+    Route dependency declaring the statement budget of an endpoint:
+    `dependencies=[Depends(query_budget(3))]`. Requests over it are logged,
+    and the `query_budget` pytest fixture fails the test.
+    """
+    async def _declare_budget():
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = max_queries
+
+    return _declare_budget
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_stats_start")
+    elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(statement, elapsed)
+    if _global_collectors:
+        for collector in list(_global_collectors):
+            collector.add(statement, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None:
+        starts = conn.info.get("query_stats_start")
+        if starts:
+            starts.pop()
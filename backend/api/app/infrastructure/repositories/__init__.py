@@ -2,6 +2,7 @@
 Repository implementations
 """
 from .product_repository import ProductRepository
+from .stock_repository import InsufficientStockError, StockRepository
 
-__all__ = ['ProductRepository']
+__all__ = ['ProductRepository', 'StockRepository', 'InsufficientStockError']
 
@@ -6,10 +6,15 @@ from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime
 import logging
+from app.infrastructure.repositories.sql_helpers import id_list_param, in_id_list, keyset_after_clause
+from app.infrastructure.repositories.stock_repository import available_stock_sql
 
 logger = logging.getLogger(__name__)
 
+KEYSET_AFTER_CLAUSE = keyset_after_clause("p")
+
 
 class ProductRepository:
     """Handles all database operations for products"""
@@ -37,14 +42,31 @@ class ProductRepository:
             logger.exception("Error querying product by id: %s", e)
             raise
 
-    def list_products(
-        self, 
-        categoria_id: Optional[int] = None,
-        subcategoria_id: Optional[int] = None,
-        skip: int = 0,
-        limit: int = 20
-    ) -> List[Any]:
-        """List products with optional filtering"""
+    def get_products_by_ids(self, producto_ids: List[int]) -> List[Any]:
+        """Get active products by IDs (order not guaranteed)"""
+        if not producto_ids:
+            return []
+
+        try:
+            query = text(f"""
+                SELECT id, nombre, descripcion, precio, peso_gramos, cantidad_disponible, 
+                       categoria_id, subcategoria_id, activo, fecha_creacion 
+                FROM Productos WHERE {in_id_list('id')} AND activo = 1
+            """)
+            return self.db.execute(query, {"ids": id_list_param(producto_ids)}).fetchall()
+        except Exception as e:
+            logger.exception("Error querying products by ids: %s", e)
+            raise
+
+    def _listing_filters(
+        self,
+        categoria_id: Optional[int],
+        subcategoria_id: Optional[int],
+        skip: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """WHERE clause and params shared by the product listing queries"""
         params = {"skip": int(skip), "limit": int(limit)}
         where_clauses = ["p.activo = 1"]
         
@@ -54,8 +76,28 @@ class ProductRepository:
         if subcategoria_id:
             where_clauses.append("p.subcategoria_id = :subcategoria_id")
             params["subcategoria_id"] = int(subcategoria_id)
+        if after is not None:
+            where_clauses.append(KEYSET_AFTER_CLAUSE)
+            params["after_fecha"], params["after_id"] = after[0], int(after[1])
+            params["skip"] = 0
+
+        return " AND ".join(where_clauses), params
+
+    def list_products(
+        self, 
+        categoria_id: Optional[int] = None,
+        subcategoria_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Any]:
+        """
+        List products with optional filtering.
 
-        where_sql = " AND ".join(where_clauses)
+        Offset mode by default; when `after` (fecha_creacion, id) of the last
+        row seen is given, uses keyset pagination instead and `skip` is ignored.
+        """
+        where_sql, params = self._listing_filters(categoria_id, subcategoria_id, skip, limit, after)
 
         try:
             query = text(f"""
@@ -64,7 +106,7 @@ class ProductRepository:
                        p.activo, p.fecha_creacion 
                 FROM Productos p 
                 WHERE {where_sql} 
-                ORDER BY p.fecha_creacion DESC 
+                ORDER BY p.fecha_creacion DESC, p.id DESC 
                 OFFSET :skip ROWS FETCH NEXT :limit ROWS ONLY
             """)
             return self.db.execute(query, params).fetchall()
@@ -72,22 +114,116 @@ class ProductRepository:
             logger.exception("Error querying products: %s", e)
             raise
 
+    def list_product_cards(
+        self,
+        categoria_id: Optional[int] = None,
+        subcategoria_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Any]:
+        """
+        Same page as `list_products`, already joined with category, subcategory,
+        rating stats and images (as a FOR JSON PATH array in `imagenes_json`).
+        One round trip instead of list + 4 enrichment queries.
+        """
+        where_sql, params = self._listing_filters(categoria_id, subcategoria_id, skip, limit, after)
+
+        try:
+            query = text(f"""
+                WITH page AS (
+                    SELECT p.id, p.nombre, p.descripcion, p.precio, p.peso_gramos, 
+                           p.cantidad_disponible, p.categoria_id, p.subcategoria_id, 
+                           p.activo, p.fecha_creacion 
+                    FROM Productos p 
+                    WHERE {where_sql} 
+                    ORDER BY p.fecha_creacion DESC, p.id DESC 
+                    OFFSET :skip ROWS FETCH NEXT :limit ROWS ONLY
+                )
+                SELECT pg.id, pg.nombre, pg.descripcion, pg.precio, pg.peso_gramos,
+                       pg.cantidad_disponible, pg.categoria_id, pg.subcategoria_id,
+                       pg.activo, pg.fecha_creacion,
+                       c.nombre AS cat_nombre, c.fecha_creacion AS cat_created_at,
+                       c.fecha_actualizacion AS cat_updated_at,
+                       s.categoria_id AS sub_categoria_id, s.nombre AS sub_nombre,
+                       s.fecha_creacion AS sub_created_at,
+                       ps.promedio_calificacion, ps.total_calificaciones,
+                       (SELECT pi.ruta_imagen FROM ProductoImagenes pi
+                        WHERE pi.producto_id = pg.id
+                        ORDER BY pi.orden ASC
+                        FOR JSON PATH) AS imagenes_json
+                FROM page pg
+                LEFT JOIN Categorias c ON c.id = pg.categoria_id
+                LEFT JOIN Subcategorias s ON s.id = pg.subcategoria_id
+                LEFT JOIN ProductoStats ps ON ps.producto_id = pg.id
+                ORDER BY pg.fecha_creacion DESC, pg.id DESC
+            """)
+            return self.db.execute(query, params).fetchall()
+        except Exception as e:
+            logger.exception("Error querying product cards: %s", e)
+            raise
+
+    def get_facet_counts(self, price_boundaries: List[int]) -> List[Any]:
+        """
+        Counts of active, in-stock products per category, per subcategory and
+        per price bucket, in one GROUPING SETS aggregation.
+
+        Rows carry `nivel`: 'categoria', 'subcategoria', 'precio' or 'total'.
+        """
+        params = {f"b_{i}": b for i, b in enumerate(price_boundaries)}
+        bucket_case = " ".join(
+            f"WHEN p.precio < :b_{i} THEN {i}" for i in range(len(price_boundaries))
+        )
+        bucket_expr = f"CASE {bucket_case} ELSE {len(price_boundaries)} END" if price_boundaries else "0"
+
+        try:
+            query = text(f"""
+                WITH agg AS (
+                    SELECT p.categoria_id, p.subcategoria_id, b.bucket, COUNT(*) AS total,
+                           GROUPING(p.categoria_id) AS g_cat,
+                           GROUPING(p.subcategoria_id) AS g_sub,
+                           GROUPING(b.bucket) AS g_bucket
+                    FROM Productos p
+                    CROSS APPLY (SELECT {bucket_expr} AS bucket) b
+                    WHERE p.activo = 1 AND {available_stock_sql('p')} > 0
+                    GROUP BY GROUPING SETS (
+                        (p.categoria_id, p.subcategoria_id),
+                        (p.categoria_id),
+                        (b.bucket),
+                        ()
+                    )
+                )
+                SELECT CASE
+                           WHEN agg.g_cat = 0 AND agg.g_sub = 0 THEN 'subcategoria'
+                           WHEN agg.g_cat = 0 THEN 'categoria'
+                           WHEN agg.g_bucket = 0 THEN 'precio'
+                           ELSE 'total'
+                       END AS nivel,
+                       agg.categoria_id, c.nombre AS categoria_nombre,
+                       agg.subcategoria_id, s.nombre AS subcategoria_nombre,
+                       agg.bucket, agg.total
+                FROM agg
+                LEFT JOIN Categorias c ON c.id = agg.categoria_id
+                LEFT JOIN Subcategorias s ON s.id = agg.subcategoria_id
+            """)
+            return self.db.execute(query, params).fetchall()
+        except Exception as e:
+            logger.exception("Error querying product facets: %s", e)
+            raise
+
     def get_categories_by_ids(self, cat_ids: set) -> Dict[int, Dict]:
         """Get categories by IDs"""
         if not cat_ids:
             return {}
         
         try:
-            cat_ids_list = [int(x) for x in cat_ids]
-            placeholders = ','.join([f':cat_id_{i}' for i in range(len(cat_ids_list))])
-            params = {f'cat_id_{i}': cat_id for i, cat_id in enumerate(cat_ids_list)}
             query = text(f"""
                 SELECT id, nombre, fecha_creacion AS created_at, fecha_actualizacion AS updated_at 
-                FROM Categorias WHERE id IN ({placeholders})
+                FROM Categorias WHERE {in_id_list('id')}
             """)
             
             cats = {}
-            for c in self.db.execute(query, params).fetchall():
+            for c in self.db.execute(query, {"ids": id_list_param(cat_ids)}).fetchall():
                 cats[c.id] = {
                     "id": c.id, 
                     "nombre": c.nombre, 
@@ -105,16 +241,13 @@ class ProductRepository:
             return {}
         
         try:
-            subcat_ids_list = [int(x) for x in subcat_ids]
-            placeholders = ','.join([f':subcat_id_{i}' for i in range(len(subcat_ids_list))])
-            params = {f'subcat_id_{i}': subcat_id for i, subcat_id in enumerate(subcat_ids_list)}
             query = text(f"""
                 SELECT id, categoria_id, nombre, fecha_creacion AS created_at 
-                FROM Subcategorias WHERE id IN ({placeholders})
+                FROM Subcategorias WHERE {in_id_list('id')}
             """)
             
             subcats = {}
-            for s in self.db.execute(query, params).fetchall():
+            for s in self.db.execute(query, {"ids": id_list_param(subcat_ids)}).fetchall():
                 subcats[s.id] = {
                     "id": s.id, 
                     "categoria_id": s.categoria_id, 
@@ -133,18 +266,15 @@ class ProductRepository:
             return {}
         
         try:
-            prod_ids_list = [int(x) for x in producto_ids]
-            placeholders = ','.join([f':prod_id_{i}' for i in range(len(prod_ids_list))])
-            params = {f'prod_id_{i}': prod_id for i, prod_id in enumerate(prod_ids_list)}
             query = text(f"""
                 SELECT producto_id, ruta_imagen 
                 FROM ProductoImagenes 
-                WHERE producto_id IN ({placeholders}) 
+                WHERE {in_id_list('producto_id')} 
                 ORDER BY orden ASC
             """)
             
             images_map = {}
-            for img in self.db.execute(query, params).fetchall():
+            for img in self.db.execute(query, {"ids": id_list_param(producto_ids)}).fetchall():
                 images_map.setdefault(img.producto_id, []).append(img.ruta_imagen)
             return images_map
         except SQLAlchemyError:
@@ -176,15 +306,20 @@ class ProductRepository:
             return None
 
     def resolve_category_id(self, value: Any) -> Optional[int]:
-        """Resolve category ID from either int or name string"""
+        """
+        Resolve category ID from either int or name string (DB lookup).
+        Request paths use category_tree_service, which also folds accents.
+        """
         try:
             return int(value)
         except Exception:
             pass
         
         try:
-            query = text("SELECT id FROM Categorias WHERE LOWER(nombre) = :name")
-            res = self.db.execute(query, {"name": str(value).strip().lower()}).fetchone()
+            # nombre uses a case-insensitive collation; comparing the bare column
+            # keeps idx_categoria_nombre usable (LOWER(nombre) forced a scan)
+            query = text("SELECT TOP 1 id FROM Categorias WHERE nombre = :name")
+            res = self.db.execute(query, {"name": str(value).strip()}).fetchone()
             if res:
                 return int(res.id)
         except Exception:
@@ -199,8 +334,8 @@ class ProductRepository:
             pass
         
         try:
-            query = text("SELECT id FROM Subcategorias WHERE LOWER(nombre) = :name")
-            res = self.db.execute(query, {"name": str(value).strip().lower()}).fetchone()
+            query = text("SELECT TOP 1 id FROM Subcategorias WHERE nombre = :name")
+            res = self.db.execute(query, {"name": str(value).strip()}).fetchone()
             if res:
                 return int(res.id)
         except Exception:
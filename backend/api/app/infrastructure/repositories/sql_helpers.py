@@ -0,0 +1,34 @@
+"""
+SQL helpers shared by repositories
+"""
+import json
+from typing import Iterable
+
+
+def id_list_param(ids: Iterable) -> str:
+    """
+    Encode ids as one JSON array parameter for `in_id_list`.
+
+    A single NVARCHAR parameter keeps the statement text identical for any
+    list length, so SQL Server reuses one cached plan instead of compiling a
+    new one per `IN (:id_0, ..., :id_n)` shape.
+    """
+    return json.dumps(sorted({int(x) for x in ids}))
+
+
+def in_id_list(column: str, param: str = "ids") -> str:
+    """`column IN (...)` predicate over an `id_list_param` JSON parameter"""
+    return f"{column} IN (SELECT CAST([value] AS INT) FROM OPENJSON(:{param}))"
+
+
+def keyset_after_clause(alias: str) -> str:
+    """
+    Keyset predicate for ORDER BY fecha_creacion DESC, id DESC (params
+    :after_fecha, :after_id). The CAST keeps the comparison in DATETIME
+    precision (a DATETIME2 parameter would not match DATETIME values ending
+    in .xx3/.xx7 ms).
+    """
+    return (
+        f"({alias}.fecha_creacion < CAST(:after_fecha AS DATETIME) "
+        f"OR ({alias}.fecha_creacion = CAST(:after_fecha AS DATETIME) AND {alias}.id < :after_id))"
+    )
@@ -0,0 +1,255 @@
+"""
+Stock repository - atomic multi-item stock reservation and time-limited holds
+One conditional statement per order: every line is reserved/held or none is
+
+Available stock = Productos.cantidad_disponible minus the active (unexpired)
+ReservasStock holds. Every write takes UPDLOCK/HOLDLOCK on the Productos rows
+it checks, so deductions and new holds for the same product serialize.
+"""
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.infrastructure.repositories.sql_helpers import id_list_param, in_id_list
+
+logger = logging.getLogger(__name__)
+
+# Pedido como JSON: [{"producto_id": 1, "cantidad": 2}, ...]
+ITEMS_SOURCE = """
+    SELECT producto_id, SUM(cantidad) AS cantidad
+    FROM OPENJSON(:items) WITH (producto_id INT '$.producto_id', cantidad INT '$.cantidad')
+    GROUP BY producto_id
+"""
+
+# Items ya guardados de un pedido
+ORDER_ITEMS_SOURCE = """
+    SELECT producto_id, SUM(cantidad) AS cantidad
+    FROM PedidoItems
+    WHERE pedido_id = :pedido_id
+    GROUP BY producto_id
+"""
+
+
+def active_holds_sql(producto_column: str, exclude_own: bool = False) -> str:
+    """Units held by unexpired reservations (optionally not counting :pedido_id's own)"""
+    own = " AND r.pedido_id <> :pedido_id" if exclude_own else ""
+    return (
+        f"COALESCE((SELECT SUM(r.cantidad) FROM ReservasStock r "
+        f"WHERE r.producto_id = {producto_column} AND r.expira_en > SYSUTCDATETIME(){own}), 0)"
+    )
+
+
+def available_stock_sql(alias: str, exclude_own: bool = False) -> str:
+    """`alias`.cantidad_disponible minus active holds"""
+    return f"({alias}.cantidad_disponible - {active_holds_sql(f'{alias}.id', exclude_own)})"
+
+
+def _shortage_guard(exclude_own: bool) -> str:
+    """
+    NOT EXISTS guard: true only if every requested line exists and fits in the
+    available stock. It makes the statement all-or-nothing, and the lock hints
+    keep the checked rows locked until commit.
+    """
+    return f"""
+        NOT EXISTS (
+            SELECT 1
+            FROM solicitado s2
+            LEFT JOIN Productos p2 WITH (UPDLOCK, HOLDLOCK) ON p2.id = s2.producto_id
+            WHERE p2.id IS NULL OR {available_stock_sql("p2", exclude_own)} < s2.cantidad
+        )
+    """
+
+
+def _reserve_sql(source: str, exclude_own: bool = False):
+    return text(f"""
+        WITH solicitado AS ({source})
+        UPDATE p
+        SET p.cantidad_disponible = p.cantidad_disponible - s.cantidad
+        OUTPUT inserted.id, inserted.cantidad_disponible
+        FROM Productos p
+        JOIN solicitado s ON s.producto_id = p.id
+        WHERE p.cantidad_disponible >= s.cantidad
+          AND {_shortage_guard(exclude_own)}
+    """)
+
+
+def _shortages_sql(source: str, exclude_own: bool = False):
+    available = available_stock_sql("p", exclude_own)
+    return text(f"""
+        WITH solicitado AS ({source})
+        SELECT s.producto_id, p.nombre, {available} AS cantidad_disponible, s.cantidad
+        FROM solicitado s
+        LEFT JOIN Productos p ON p.id = s.producto_id
+        WHERE p.id IS NULL OR {available} < s.cantidad
+        ORDER BY s.producto_id
+    """)
+
+
+RESERVE_ITEMS = _reserve_sql(ITEMS_SOURCE)
+SHORTAGES_ITEMS = _shortages_sql(ITEMS_SOURCE)
+# El pago de un pedido no compite con sus propias reservas
+RESERVE_ORDER_ITEMS = _reserve_sql(ORDER_ITEMS_SOURCE, exclude_own=True)
+SHORTAGES_ORDER_ITEMS = _shortages_sql(ORDER_ITEMS_SOURCE, exclude_own=True)
+
+HOLD_ITEMS = text(f"""
+    WITH solicitado AS ({ITEMS_SOURCE})
+    INSERT INTO ReservasStock (pedido_id, producto_id, cantidad, expira_en)
+    OUTPUT inserted.producto_id, inserted.cantidad
+    SELECT :pedido_id, s.producto_id, s.cantidad, DATEADD(SECOND, :ttl_seconds, SYSUTCDATETIME())
+    FROM solicitado s
+    WHERE {_shortage_guard(exclude_own=False)}
+""")
+
+RELEASE_ORDER_HOLDS = text("DELETE FROM ReservasStock WHERE pedido_id = :pedido_id")
+
+# Con el estado del pedido: el sweeper solo cancela pedidos en línea aún pendientes
+EXPIRED_HOLD_ORDERS = text("""
+    SELECT TOP (:limit) r.pedido_id, p.estado, p.estado_pago, p.metodo_pago
+    FROM ReservasStock r
+    JOIN Pedidos p ON p.id = r.pedido_id
+    WHERE r.expira_en <= SYSUTCDATETIME()
+    GROUP BY r.pedido_id, p.estado, p.estado_pago, p.metodo_pago
+    ORDER BY MIN(r.expira_en)
+""")
+
+RELEASE_EXPIRED_HOLDS = text(f"""
+    DELETE FROM ReservasStock
+    WHERE {in_id_list("pedido_id")} AND expira_en <= SYSUTCDATETIME()
+""")
+
+
+def stock_items_param(items: Iterable[Tuple[int, int]]) -> str:
+    """
+    Encode (producto_id, cantidad) pairs as the :items JSON parameter.
+    Repeated products are summed; sorted so equal orders produce equal text.
+    """
+    totals: Dict[int, int] = {}
+    for producto_id, cantidad in items:
+        if int(cantidad) <= 0:
+            raise ValueError(f"La cantidad del producto {producto_id} debe ser mayor a 0.")
+        totals[int(producto_id)] = totals.get(int(producto_id), 0) + int(cantidad)
+    return json.dumps([{"producto_id": pid, "cantidad": totals[pid]} for pid in sorted(totals)])
+
+
+class InsufficientStockError(Exception):
+    """Raised when at least one line of the order cannot be reserved"""
+
+    def __init__(self, faltantes: List[Dict[str, Any]]):
+        self.faltantes = faltantes
+        super().__init__(f"Stock insuficiente: {faltantes}")
+
+    @property
+    def first(self) -> Dict[str, Any]:
+        return self.faltantes[0]
+
+    def message(self) -> str:
+        """Mensaje para el cliente sobre la primera línea rechazada"""
+        f = self.first
+        if f["nombre"] is None:
+            return f"Producto con ID {f['producto_id']} no encontrado"
+        return f"Stock insuficiente para {f['nombre']}. Disponible: {f['disponible']}, Solicitado: {f['solicitado']}"
+
+
+class StockRepository:
+    """Handles stock reservation and holds for orders"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _shortages(self, shortages_sql, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "producto_id": row.producto_id,
+                "nombre": row.nombre,
+                "disponible": max(row.cantidad_disponible or 0, 0),
+                "solicitado": row.cantidad,
+            }
+            for row in self.db.execute(shortages_sql, params).fetchall()
+        ]
+
+    def _apply(self, write_sql, shortages_sql, params: Dict[str, Any]) -> List[Any]:
+        # El guard hace imposible una escritura parcial: o vuelven todas las filas o ninguna
+        rows = self.db.execute(write_sql, params).fetchall()
+        if rows:
+            return rows
+
+        # Solo en el camino de rechazo se consulta el detalle
+        faltantes = self._shortages(shortages_sql, params)
+        if not faltantes:
+            return []  # pedido sin items
+        logger.warning(f"Stock reservation rejected: {faltantes}")
+        raise InsufficientStockError(faltantes)
+
+    def reserve_items(self, items: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+        """
+        Deduct (producto_id, cantidad) pairs in one statement.
+
+        Returns:
+            Remaining cantidad_disponible per producto_id
+
+        Raises:
+            InsufficientStockError: if any product is missing or short (nothing is deducted)
+        """
+        param = stock_items_param(items)
+        if param == "[]":
+            return {}
+        rows = self._apply(RESERVE_ITEMS, SHORTAGES_ITEMS, {"items": param})
+        return {row.id: row.cantidad_disponible for row in rows}
+
+    def reserve_order(self, pedido_id: int) -> Dict[int, int]:
+        """
+        Deduct the stored items of a pedido in one statement (same contract as
+        reserve_items). The pedido's own holds do not count against it; release
+        them with `release_holds` in the same transaction.
+        """
+        rows = self._apply(RESERVE_ORDER_ITEMS, SHORTAGES_ORDER_ITEMS, {"pedido_id": pedido_id})
+        return {row.id: row.cantidad_disponible for row in rows}
+
+    def order_shortages(self, pedido_id: int) -> List[Dict[str, Any]]:
+        """Lines of a pedido that do not fit in the available stock (read only)"""
+        return self._shortages(SHORTAGES_ORDER_ITEMS, {"pedido_id": pedido_id})
+
+    def hold_items(self, pedido_id: int, items: Iterable[Tuple[int, int]], ttl_seconds: int) -> Dict[int, int]:
+        """
+        Hold (producto_id, cantidad) pairs for `pedido_id` during `ttl_seconds`
+        without touching cantidad_disponible.
+
+        Returns:
+            Held units per producto_id
+
+        Raises:
+            InsufficientStockError: if any product is missing or short (nothing is held)
+        """
+        param = stock_items_param(items)
+        if param == "[]":
+            return {}
+        rows = self._apply(
+            HOLD_ITEMS, SHORTAGES_ITEMS, {"items": param, "pedido_id": pedido_id, "ttl_seconds": int(ttl_seconds)}
+        )
+        return {row.producto_id: row.cantidad for row in rows}
+
+    def release_holds(self, pedido_id: int) -> int:
+        """Delete every hold of a pedido (paid or cancelled)"""
+        return self.db.execute(RELEASE_ORDER_HOLDS, {"pedido_id": pedido_id}).rowcount
+
+    def expired_hold_orders(self, limit: int) -> List[Dict[str, Any]]:
+        """Pedidos with expired holds (pedido_id, estado, estado_pago, metodo_pago), oldest expiry first"""
+        return [
+            {
+                "pedido_id": row.pedido_id,
+                "estado": row.estado,
+                "estado_pago": row.estado_pago,
+                "metodo_pago": row.metodo_pago,
+            }
+            for row in self.db.execute(EXPIRED_HOLD_ORDERS, {"limit": limit}).fetchall()
+        ]
+
+    def release_expired(self, pedido_ids: Iterable[int]) -> int:
+        """Delete the expired holds of the given pedidos in one statement"""
+        ids = id_list_param(pedido_ids)
+        if ids == "[]":
+            return 0
+        return self.db.execute(RELEASE_EXPIRED_HOLDS, {"ids": ids}).rowcount
@@ -0,0 +1,13 @@
+"""
+In-process search indexes
+"""
+from app.infrastructure.search.text import fold_text, tokenize
+from app.infrastructure.search.product_index import ProductSearchIndex
+from app.infrastructure.search.prefix_index import PrefixSuggestionIndex
+
+__all__ = [
+    'fold_text',
+    'tokenize',
+    'ProductSearchIndex',
+    'PrefixSuggestionIndex',
+]
@@ -0,0 +1,82 @@
+"""
+Immutable sorted-array prefix index for typeahead suggestions
+"""
+import heapq
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+from app.infrastructure.search.text import fold_text
+
+
+class PrefixSuggestionIndex:
+    """
+    Read-only snapshot built once and swapped in whole.
+
+    Every word start of a folded product name is a key ("comida humeda gato",
+    "humeda gato", "gato"), so prefixes match any word. Keys are kept in one
+    sorted list and a prefix lookup is a bisect plus a range scan. Prefixes of
+    up to `precomputed_len` chars (the widest ranges) have their top results
+    precomputed.
+    """
+
+    def __init__(
+        self,
+        products: Iterable[Tuple[int, str, int]],
+        max_results: int = 10,
+        precomputed_len: int = 2
+    ):
+        self.max_results = max_results
+        self.precomputed_len = precomputed_len
+        self._names: Dict[int, str] = {}
+        self._units: Dict[int, int] = {}
+        entries = []
+        for producto_id, nombre, unidades in products:
+            if not nombre:
+                continue
+            producto_id = int(producto_id)
+            self._names[producto_id] = nombre
+            self._units[producto_id] = int(unidades or 0)
+            words = fold_text(nombre).split()
+            for i in range(len(words)):
+                entries.append((" ".join(words[i:]), producto_id))
+        entries.sort()
+        self._keys = [k for k, _ in entries]
+        self._ids = [pid for _, pid in entries]
+
+        self._top: Dict[str, List[int]] = {}
+        if precomputed_len > 0:
+            buckets: Dict[str, set] = {}
+            for key, pid in entries:
+                for n in range(1, min(precomputed_len, len(key)) + 1):
+                    buckets.setdefault(key[:n], set()).add(pid)
+            for prefix, ids in buckets.items():
+                self._top[prefix] = self._rank(ids, max_results)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _rank(self, ids: Iterable[int], limit: int) -> List[int]:
+        return heapq.nsmallest(limit, ids, key=lambda pid: (-self._units[pid], self._names[pid], pid))
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, object]]:
+        """Top products whose name has a word starting with `prefix`, by units sold"""
+        folded = " ".join(fold_text(prefix).split())
+        if not folded:
+            return []
+        limit = min(limit, self.max_results)
+
+        if len(folded) <= self.precomputed_len:
+            ids = self._top.get(folded, [])[:limit]
+        else:
+            start = bisect_left(self._keys, folded)
+            matched = set()
+            for i in range(start, len(self._keys)):
+                if not self._keys[i].startswith(folded):
+                    break
+                matched.add(self._ids[i])
+            ids = self._rank(matched, limit)
+
+        return [
+            {"id": pid, "nombre": self._names[pid], "unidades_vendidas": self._units[pid]}
+            for pid in ids
+        ]
@@ -0,0 +1,110 @@
+"""
+Inverted index with BM25 ranking over product nombre/descripcion
+"""
+import heapq
+import math
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.infrastructure.search.text import tokenize
+
+
+class ProductSearchIndex:
+    """
+    Thread-safe in-memory inverted index.
+
+    Terms from `nombre` count `name_weight` times so name matches rank above
+    description-only matches. Supports incremental upsert/remove.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, name_weight: int = 2):
+        self.k1 = k1
+        self.b = b
+        self.name_weight = name_weight
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def __contains__(self, producto_id: int) -> bool:
+        return producto_id in self._doc_len
+
+    def _terms(self, nombre: Optional[str], descripcion: Optional[str]) -> Counter:
+        terms = Counter()
+        for tok in tokenize(nombre or ""):
+            terms[tok] += self.name_weight
+        for tok in tokenize(descripcion or ""):
+            terms[tok] += 1
+        return terms
+
+    def _remove_locked(self, producto_id: int) -> None:
+        terms = self._doc_terms.pop(producto_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(producto_id, None)
+                if not posting:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(producto_id, 0)
+
+    def upsert(self, producto_id: int, nombre: Optional[str], descripcion: Optional[str]) -> None:
+        """Add or replace a product document"""
+        producto_id = int(producto_id)
+        terms = self._terms(nombre, descripcion)
+        with self._lock:
+            self._remove_locked(producto_id)
+            if not terms:
+                return
+            self._doc_terms[producto_id] = terms
+            length = sum(terms.values())
+            self._doc_len[producto_id] = length
+            self._total_len += length
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[producto_id] = tf
+
+    def remove(self, producto_id: int) -> None:
+        """Remove a product document (no-op if absent)"""
+        with self._lock:
+            self._remove_locked(int(producto_id))
+
+    def rebuild(self, docs: Iterable[Tuple[int, Optional[str], Optional[str]]]) -> None:
+        """Replace the whole index with (id, nombre, descripcion) rows"""
+        fresh = ProductSearchIndex(self.k1, self.b, self.name_weight)
+        for producto_id, nombre, descripcion in docs:
+            fresh.upsert(producto_id, nombre, descripcion)
+        with self._lock:
+            self._postings = fresh._postings
+            self._doc_terms = fresh._doc_terms
+            self._doc_len = fresh._doc_len
+            self._total_len = fresh._total_len
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Tuple[int, float]]:
+        """Return [(producto_id, score)] ordered by BM25 score (desc), then id"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if n_docs == 0:
+                return []
+            avg_len = self._total_len / n_docs
+            scores: Dict[int, float] = {}
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for producto_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[producto_id] / avg_len)
+                    scores[producto_id] = scores.get(producto_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return top[offset:offset + limit]
@@ -0,0 +1,33 @@
+"""
+Text normalization for Spanish product search
+"""
+import re
+import unicodedata
+from typing import List
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset({
+    "a", "al", "con", "de", "del", "el", "en", "la", "las", "lo", "los",
+    "o", "para", "por", "sin", "su", "un", "una", "y",
+})
+
+
+def fold_text(value: str) -> str:
+    """Lowercase and strip accents/diacritics ("Ñandú Pequeño" -> "nandu pequeno")"""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def _stem(token: str) -> str:
+    """Minimal plural folding so "perros" matches "perro" """
+    if len(token) > 3 and token.endswith("s") and not token.isdigit():
+        return token[:-1]
+    return token
+
+
+def tokenize(value: str) -> List[str]:
+    """Folded, stemmed tokens without stopwords"""
+    return [_stem(t) for t in _TOKEN_RE.findall(fold_text(value)) if t not in STOPWORDS]
@@ -2,6 +2,9 @@
 Middleware package for FastAPI application
 """
 from app.presentation.middleware.error_handler import setup_error_handlers
+from app.presentation.middleware.loop_monitor import LoopMonitorMiddleware
+from app.presentation.middleware.metrics import MetricsMiddleware
+from app.presentation.middleware.query_stats import QueryStatsMiddleware
 
-__all__ = ['setup_error_handlers']
+__all__ = ['setup_error_handlers', 'LoopMonitorMiddleware', 'MetricsMiddleware', 'QueryStatsMiddleware']
 
@@ -0,0 +1,20 @@
+"""
+ASGI middleware that tags each request task for the event loop monitor
+"""
+from app.infrastructure.monitoring import EventLoopMonitor
+
+
+class LoopMonitorMiddleware:
+    """
+    Pure ASGI middleware (no extra task per request, unlike BaseHTTPMiddleware)
+    so the monitor can map the task blocking the loop back to its route.
+    """
+
+    def __init__(self, app, monitor: EventLoopMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            self.monitor.track_request(scope)
+        await self.app(scope, receive, send)
@@ -0,0 +1,44 @@
+"""
+ASGI middleware recording per-route request metrics for /metrics
+"""
+import time
+
+from app.infrastructure.monitoring.metrics import HTTP_IN_PROGRESS, HTTP_LATENCY, HTTP_REQUESTS
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: latency histogram and status counter per route
+    template (e.g. /api/admin/productos/{producto_id}), in-flight gauge per
+    method. Unmatched paths share one label to keep cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc((method,))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_PROGRESS.dec((method,))
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            HTTP_REQUESTS.inc((method, route, str(status_code)))
+            HTTP_LATENCY.observe(elapsed, (method, route))
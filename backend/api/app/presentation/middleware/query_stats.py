@@ -0,0 +1,62 @@
+"""
+ASGI middleware reporting per-request SQL statement count and DB time
+"""
+import logging
+from typing import Callable, List
+
+from app.core.config import settings
+from app.infrastructure.monitoring.query_stats import QueryStats, begin_request_stats, end_request_stats
+
+logger = logging.getLogger(__name__)
+
+_request_listeners: List[Callable[[QueryStats], None]] = []
+
+
+def add_request_listener(callback: Callable[[QueryStats], None]) -> None:
+    """Call `callback(stats)` after each request (used by the pytest fixture)"""
+    _request_listeners.append(callback)
+
+
+def remove_request_listener(callback: Callable[[QueryStats], None]) -> None:
+    if callback in _request_listeners:
+        _request_listeners.remove(callback)
+
+
+class QueryStatsMiddleware:
+    """
+    Adds `Server-Timing: db;dur=<ms>;desc="<n> queries"` to every response and
+    logs requests over their query budget (route `query_budget` dependency, or
+    SQL_QUERY_BUDGET by default). Statements run after the headers were sent
+    (streaming bodies) are only reflected in the log.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = begin_request_stats()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                timing = f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_request_stats(token)
+            stats.route = f'{scope.get("method")} {getattr(scope.get("route"), "path", None) or scope.get("path")}'
+            if stats.over_budget(settings.SQL_QUERY_BUDGET):
+                logger.warning(
+                    "Query budget exceeded: %s ran %d statements (budget %d, %.1fms in DB)",
+                    stats.route, stats.count,
+                    stats.budget if stats.budget is not None else settings.SQL_QUERY_BUDGET,
+                    stats.total_ms,
+                )
+            for callback in list(_request_listeners):
+                callback(stats)
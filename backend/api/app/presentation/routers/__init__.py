@@ -12,6 +12,7 @@ from app.presentation.routers.admin_users import router as admin_users_router
 from app.presentation.routers.home_products import router as home_products_router
 from app.presentation.routers.ratings import public_router as ratings_public_router, admin_router as ratings_admin_router
 from app.presentation.routers.addresses import router as addresses_router
+from app.presentation.routers.monitoring import router as monitoring_router
 
 __all__ = [
     'auth_router',
@@ -26,4 +27,5 @@ __all__ = [
     'ratings_public_router',
     'ratings_admin_router',
     'addresses_router',
+    'monitoring_router',
 ]
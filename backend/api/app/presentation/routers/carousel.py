@@ -2,15 +2,19 @@
 Carousel router: Manage homepage carousel images
 Handles HU_MANAGE_CAROUSEL
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Body
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Body, Request, Response
 from fastapi.responses import JSONResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.presentation.schemas import CarruselImagenCreate, CarruselImagenResponse, CarruselImagenUpdate
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 import app.domain.models as models
 from app.core.config import settings
 from app.infrastructure.external.rabbitmq import rabbitmq_producer
+from app.infrastructure.cache import catalog_version
+from app.shared.utils.http_cache import not_modified_or_tag
 import logging
 import os
 import uuid
@@ -27,7 +31,7 @@ UPLOAD_DIR = "backend/api/app/uploads/carrusel"
 
 
 @router.get("", response_model=List[CarruselImagenResponse])
-async def list_carousel_images(db: Session = Depends(get_db)):
+async def list_carousel_images(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     List all carousel images ordered by position
     
@@ -36,7 +40,10 @@ async def list_carousel_images(db: Session = Depends(get_db)):
     - Sorted by orden (1-5)
     - Include ruta_imagen and link_url
     - Only active images
+    - ETag from the catalog version; 304 if If-None-Match matches
     """
+    if not_modified := not_modified_or_tag(request, response, catalog_version.etag("admin-carrusel")):
+        return not_modified
     images = db.query(models.CarruselImagen).filter(models.CarruselImagen.activo == True).order_by(models.CarruselImagen.orden.asc()).limit(5).all()
     return images
 
@@ -150,6 +157,7 @@ async def add_carousel_image(
         db.add(new_img)
         db.commit()
         db.refresh(new_img)
+        catalog_version.bump()
             
     except Exception as e:
         logger.error(f"DB error creating carousel image: {str(e)}")
@@ -223,6 +231,7 @@ async def update_carousel_image(
         db.add(img)
         db.commit()
         db.refresh(img)
+        catalog_version.bump()
     except Exception as e:
         logger.error(f"DB error updating carousel image: {str(e)}")
         db.rollback()
@@ -292,6 +301,7 @@ async def delete_carousel_image(imagen_id: int, db: Session = Depends(get_db)):
         # Delete from database
         db.delete(img)
         db.commit()
+        catalog_version.bump()
     except Exception as e:
         logger.error(f"DB error deleting carousel image: {str(e)}")
         db.rollback()
@@ -305,6 +315,7 @@ async def delete_carousel_image(imagen_id: int, db: Session = Depends(get_db)):
                 item.orden = idx
                 db.add(item)
         db.commit()
+        catalog_version.bump()
     except Exception as e:
         logger.warning(f"Failed to reindex after delete: {str(e)}")
         db.rollback()
@@ -361,6 +372,7 @@ async def reorder_carousel(
         db.add(img)
         db.commit()
         db.refresh(img)
+        catalog_version.bump()
     except Exception as e:
         logger.error(f"DB error reordering carousel image: {str(e)}")
         db.rollback()
@@ -423,6 +435,7 @@ async def bulk_reorder(payload: dict = Body(...), db: Session = Depends(get_db))
                 item.orden = int(o["orden"])
                 db.add(item)
         db.commit()
+        catalog_version.bump()
     except Exception as e:
         logger.error(f"DB error bulk reordering: {str(e)}")
         db.rollback()
@@ -481,16 +494,23 @@ public_router = APIRouter(
 
 
 @public_router.get("/images", response_model=List[CarruselImagenResponse])
-async def public_list_images(db: Session = Depends(get_db)):
-    """Return active carousel images for frontend consumption (max 5)."""
-    images = db.query(models.CarruselImagen).filter(models.CarruselImagen.activo == True).order_by(models.CarruselImagen.orden.asc()).limit(5).all()
-    return images
+async def public_list_images(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Return active carousel images for frontend consumption (max 5). Supports If-None-Match."""
+    if not_modified := not_modified_or_tag(request, response, catalog_version.etag("carrusel")):
+        return not_modified
+    result = await db.execute(
+        select(models.CarruselImagen).where(models.CarruselImagen.activo == True).order_by(models.CarruselImagen.orden.asc()).limit(5)
+    )
+    return result.scalars().all()
 
 
 @public_router.get("/{imagen_id}", response_model=CarruselImagenResponse)
-async def public_get_image(imagen_id: int, db: Session = Depends(get_db)):
+async def public_get_image(imagen_id: int, db: AsyncSession = Depends(get_async_db)):
     """Return a single active carousel image by id for frontend."""
-    img = db.query(models.CarruselImagen).filter(models.CarruselImagen.id == imagen_id, models.CarruselImagen.activo == True).first()
+    result = await db.execute(
+        select(models.CarruselImagen).where(models.CarruselImagen.id == imagen_id, models.CarruselImagen.activo == True)
+    )
+    img = result.scalars().first()
     if not img:
         return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"status": "error", "message": "Imagen no encontrada."})
     return img
@@ -4,8 +4,9 @@ Handles HU_MANAGE_CATEGORIES - EXACT implementation per specifications
 """
 import uuid
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import List
 from app.presentation.schemas import (
@@ -18,8 +19,11 @@ from app.presentation.schemas import (
     SuccessResponse,
     ErrorResponse
 )
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.infrastructure.external.rabbitmq import rabbitmq_producer
+from app.infrastructure.cache import catalog_version
+from app.application.services.category_tree_service import category_tree_service
+from app.shared.utils.http_cache import not_modified_or_tag
 import logging
 
 logger = logging.getLogger(__name__)
@@ -79,6 +83,8 @@ async def create_category(request: CategoriaCreateRequest):
         
         # Publicar en cola categorias.crear
         rabbitmq_producer.publish("categorias.crear", message)
+        catalog_version.bump()
+        category_tree_service.invalidate()
         logger.info(f"Message published to categorias.crear: {message['requestId']}")
         
         # Retornar respuesta de éxito (el worker procesará y persistirá)
@@ -155,6 +161,8 @@ async def create_subcategory(request: SubcategoriaCreateRequest):
         }
         
         rabbitmq_producer.publish("subcategorias.crear", message)
+        catalog_version.bump()
+        category_tree_service.invalidate()
         logger.info(f"Message published to subcategorias.crear: {message['requestId']}")
         
         return SuccessResponse(
@@ -216,6 +224,8 @@ async def update_category(id: str, request: CategoriaUpdateRequest):
         }
         
         rabbitmq_producer.publish("categorias.actualizar", message)
+        catalog_version.bump()
+        category_tree_service.invalidate()
         logger.info(f"Message published to categorias.actualizar: {message['requestId']}")
         
         return SuccessResponse(
@@ -275,6 +285,8 @@ async def update_subcategory(id: str, request: SubcategoriaUpdateRequest):
         }
         
         rabbitmq_producer.publish("subcategorias.actualizar", message)
+        catalog_version.bump()
+        category_tree_service.invalidate()
         logger.info(f"Message published to subcategorias.actualizar: {message['requestId']}")
         
         return SuccessResponse(
@@ -291,7 +303,7 @@ async def update_subcategory(id: str, request: SubcategoriaUpdateRequest):
 
 
 @router.get("/categorias", response_model=List[CategoriaResponse])
-async def get_categories(db: Session = Depends(get_db)):
+async def get_categories(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Get complete category structure with subcategories - EXACT implementation per HU_MANAGE_CATEGORIES
     
@@ -299,75 +311,15 @@ async def get_categories(db: Session = Depends(get_db)):
     - GET /api/admin/categorias
     - Returns tree structure: categories with their subcategories
     - Producer can read directly from DB (synchronous read)
+    - ETag from the catalog version; 304 if If-None-Match matches
     """
+    if not_modified := not_modified_or_tag(request, response, catalog_version.etag("admin-categorias")):
+        return not_modified
+
     try:
-        # Query directa a la base de datos (lectura síncrona)
-        from sqlalchemy import text
-        
-        # Query para obtener todas las categorías con sus subcategorías
-        # The DB schema uses Spanish column names (fecha_creacion / fecha_actualizacion)
-        # Alias them to the English names expected by the Pydantic response models
-        query = text("""
-            SELECT
-                c.id,
-                c.nombre,
-                c.fecha_creacion AS fecha_creacion,
-                c.fecha_actualizacion AS fecha_actualizacion,
-                s.id AS subcategoria_id,
-                s.nombre AS subcategoria_nombre,
-                s.fecha_creacion AS subcategoria_fecha_creacion,
-                ISNULL(s.fecha_creacion, c.fecha_creacion) AS subcategoria_fecha_actualizacion
-            FROM Categorias c
-            LEFT JOIN Subcategorias s ON c.id = s.categoria_id
-            ORDER BY c.id, s.id
-        """)
-        
-        result = db.execute(query)
-        rows = result.fetchall()
-        
-        # Agrupar por categoría
-        categorias_dict = {}
-        for row in rows:
-            categoria_id = row.id
-            if categoria_id not in categorias_dict:
-                categorias_dict[categoria_id] = {
-                    "id": categoria_id,
-                    "nombre": row.nombre,
-                    "fecha_creacion": getattr(row, 'fecha_creacion', None),
-                    "fecha_actualizacion": getattr(row, 'fecha_actualizacion', None),
-                    "subcategorias": []
-                }
-            
-            # Agregar subcategoría si existe
-            if row.subcategoria_id:
-                # Some DB schemas may not have a separate fecha_actualizacion for subcategorias;
-                # fall back to fecha_creacion when fecha_actualizacion is absent.
-                sub_created = getattr(row, 'subcategoria_fecha_creacion', None)
-                sub_updated = getattr(row, 'subcategoria_fecha_actualizacion', None) or sub_created
-                categorias_dict[categoria_id]["subcategorias"].append({
-                    "id": row.subcategoria_id,
-                    "categoria_id": categoria_id,
-                    "nombre": row.subcategoria_nombre,
-                    "created_at": sub_created,
-                    "updated_at": sub_updated
-                })
-        
-        # Convertir a lista de CategoriaResponse
-        categorias_list = []
-        for cat_data in categorias_dict.values():
-            subcategorias = [
-                SubcategoriaResponse(**sub) for sub in cat_data["subcategorias"]
-            ]
-            categoria = CategoriaResponse(
-                id=cat_data["id"],
-                nombre=cat_data["nombre"],
-                created_at=cat_data["fecha_creacion"],
-                updated_at=(cat_data.get("fecha_actualizacion") or cat_data.get("fecha_creacion")),
-                subcategorias=subcategorias
-            )
-            categorias_list.append(categoria)
-        
-        return categorias_list
+        # Snapshot en memoria (se recarga cuando cambian Categorias/Subcategorias)
+        tree = await db.run_sync(category_tree_service.get_tree)
+        return list(tree.admin_response)
         
     except Exception as e:
         logger.error(f"Error fetching categories: {str(e)}")
@@ -398,12 +350,6 @@ async def delete_category(id: str, sync: bool = Query(True, description="Ejecuta
                                     detail={"status": "error", "message": "El id de categoría no es válido."})
 
             with db.begin():
-                exists_q = text("SELECT id FROM Categorias WHERE id = :id")
-                exists_res = db.execute(exists_q, {"id": categoria_id}).fetchall()
-                if not exists_res:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                        detail={"status": "error", "message": "La categoría especificada no existe."})
-
                 prod_q = text("SELECT COUNT(*) as total FROM Productos WHERE categoria_id = :id")
                 prod_res = db.execute(prod_q, {"id": categoria_id}).fetchone()
                 total_products = prod_res.total if prod_res is not None else 0
@@ -421,9 +367,15 @@ async def delete_category(id: str, sync: bool = Query(True, description="Ejecuta
                         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                                             detail={"status": "error", "message": "No se permite eliminar la categoría porque sus subcategorías tienen productos asociados."})
 
+                # Existencia según la BD, no el snapshot (puede estar segundos atrasado)
                 del_q = text("DELETE FROM Categorias WHERE id = :id")
                 res = db.execute(del_q, {"id": categoria_id})
+                if res.rowcount == 0:
+                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                        detail={"status": "error", "message": "La categoría especificada no existe."})
 
+            catalog_version.bump()
+            category_tree_service.invalidate()
             return SuccessResponse(status="success", message="Categoría eliminada correctamente (síncrono)")
         except HTTPException:
             raise
@@ -445,6 +397,8 @@ async def delete_category(id: str, sync: bool = Query(True, description="Ejecuta
         }
 
         rabbitmq_producer.publish("categorias.eliminar", message)
+        catalog_version.bump()
+        category_tree_service.invalidate()
         logger.info(f"Message published to categorias.eliminar: {message['requestId']}")
 
         return SuccessResponse(status="success", message="Solicitud de eliminación encolada; se procesará en background")
@@ -474,12 +428,6 @@ async def delete_subcategory(id: str, sync: bool = Query(True, description="Ejec
                                     detail={"status": "error", "message": "El id de subcategoría no es válido."})
 
             with db.begin():
-                exists_q = text("SELECT id FROM Subcategorias WHERE id = :id")
-                exists_res = db.execute(exists_q, {"id": sub_id}).fetchall()
-                if not exists_res:
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                        detail={"status": "error", "message": "La subcategoría especificada no existe."})
-
                 prod_q = text("SELECT COUNT(*) as total FROM Productos WHERE subcategoria_id = :id")
                 prod_res = db.execute(prod_q, {"id": sub_id}).fetchone()
                 total_products = prod_res.total if prod_res is not None else 0
@@ -487,9 +435,15 @@ async def delete_subcategory(id: str, sync: bool = Query(True, description="Ejec
                     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                                         detail={"status": "error", "message": "No se permite eliminar la subcategoría porque tiene productos asociados."})
 
+                # Existencia según la BD, no el snapshot (puede estar segundos atrasado)
                 del_q = text("DELETE FROM Subcategorias WHERE id = :id")
                 res = db.execute(del_q, {"id": sub_id})
+                if res.rowcount == 0:
+                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                        detail={"status": "error", "message": "La subcategoría especificada no existe."})
 
+            catalog_version.bump()
+            category_tree_service.invalidate()
             return SuccessResponse(status="success", message="Subcategoría eliminada correctamente (síncrono)")
         except HTTPException:
             raise
@@ -510,6 +464,8 @@ async def delete_subcategory(id: str, sync: bool = Query(True, description="Ejec
         }
 
         rabbitmq_producer.publish("subcategorias.eliminar", message)
+        catalog_version.bump()
+        category_tree_service.invalidate()
         logger.info(f"Message published to subcategorias.eliminar: {message['requestId']}")
 
         return SuccessResponse(status="success", message="Solicitud de eliminación encolada; se procesará en background")
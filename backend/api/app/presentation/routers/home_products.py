@@ -2,17 +2,29 @@
 Home/Products router: Public product browsing and cart management
 Handles HU_HOME_PRODUCTS
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.presentation.schemas import ProductoResponse, CartResponse, CartItemCreate, CartItemResponse
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.infrastructure.security.security import security_utils
 import logging
 from sqlalchemy import text
 import uuid
 from app.infrastructure.external.rabbitmq import rabbitmq_producer
+from app.infrastructure.cache import catalog_cache, catalog_version
+from app.core.config import settings
+from app.core.constants import MAX_BATCH_IDS
+from app.application.services.product_service import ProductService
+from app.application.services.category_tree_service import category_tree_service
+from app.application.services.search_service import product_search_service, product_suggestion_service
+from app.infrastructure.repositories.product_repository import ProductRepository, KEYSET_AFTER_CLAUSE
+from app.infrastructure.repositories.stock_repository import available_stock_sql
+from app.shared.utils.pagination import decode_cursor, next_cursor_from_rows
+from app.shared.utils.http_cache import not_modified_or_tag
+from app.infrastructure.monitoring.query_stats import query_budget
 import time
 
 logger = logging.getLogger(__name__)
@@ -23,44 +35,23 @@ router = APIRouter(
 )
 
 
-@router.get("/home/categorias", response_model=List[dict])
-async def get_categories_public(db: Session = Depends(get_db)):
+@router.get("/home/categorias", response_model=List[dict], dependencies=[Depends(query_budget(3))])
+async def get_categories_public(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Get all categories (public endpoint - no authentication required)
     
     Returns:
     - List of all categories with basic info
     - Only returns active categories
+    - ETag from the catalog version; 304 if If-None-Match matches
     """
+    if not_modified := not_modified_or_tag(request, response, catalog_version.etag("home-categorias")):
+        return not_modified
+
     try:
-        query = text("""
-            SELECT 
-                id,
-                nombre,
-                descripcion,
-                activo,
-                fecha_creacion,
-                fecha_actualizacion
-            FROM Categorias
-            WHERE activo = 1
-            ORDER BY nombre ASC
-        """)
-        
-        result = db.execute(query)
-        rows = result.fetchall()
-        
-        categories = []
-        for row in rows:
-            categories.append({
-                "id": int(row.id),
-                "nombre": row.nombre,
-                "descripcion": row.descripcion if row.descripcion else "",
-                "activo": bool(row.activo),
-                "fecha_creacion": row.fecha_creacion.isoformat() if row.fecha_creacion else None,
-                "fecha_actualizacion": row.fecha_actualizacion.isoformat() if row.fecha_actualizacion else None
-            })
-        
-        return categories
+        # Snapshot en memoria del árbol de categorías
+        tree = await db.run_sync(category_tree_service.get_tree)
+        return list(tree.public_response)
         
     except Exception as e:
         logger.exception("Error fetching public categories: %s", e)
@@ -70,13 +61,111 @@ async def get_categories_public(db: Session = Depends(get_db)):
         )
 
 
-@router.get("/home/productos", response_model=List[ProductoResponse])
+@router.get("/home/productos/buscar", response_model=List[ProductoResponse])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(12, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Full-text product search (nombre/descripcion)
+
+    - In-memory inverted index, BM25 ranking, accent/case-insensitive
+    - Only active products; results ordered by relevance
+    """
+    try:
+        def _search(sync_db: Session):
+            ids = product_search_service.search(sync_db, q, skip=skip, limit=limit)
+            return ProductService(sync_db).get_products_in_order(ids) if ids else []
+
+        return await db.run_sync(_search)
+    except Exception as e:
+        logger.exception("Error searching products: %s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al buscar productos.")
+
+
+@router.get("/productos", response_model=List[ProductoResponse], dependencies=[Depends(query_budget(5))])
+async def get_products_batch(
+    ids: str = Query(..., description="IDs separados por coma, ej. 1,2,3"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Batch product lookup by IDs (cart, order pages, recommendations)
+
+    - Up to MAX_BATCH_IDS ids; duplicates ignored, order preserved
+    - Only active products; unknown ids are omitted
+    - Fixed number of queries regardless of how many ids are requested
+    """
+    try:
+        producto_ids = list(dict.fromkeys(int(x) for x in ids.split(",") if x.strip()))
+    except ValueError:
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"status": "error", "message": "Los ids deben ser números enteros separados por coma."})
+
+    if not producto_ids or any(pid <= 0 for pid in producto_ids):
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"status": "error", "message": "Debe indicar al menos un id de producto válido."})
+    if len(producto_ids) > MAX_BATCH_IDS:
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"status": "error", "message": f"Máximo {MAX_BATCH_IDS} productos por solicitud."})
+
+    try:
+        return await db.run_sync(lambda s: ProductService(s).get_products_in_order(producto_ids))
+    except Exception as e:
+        logger.exception("Error fetching products batch: %s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al obtener productos.")
+
+
+@router.get("/home/productos/facetas", dependencies=[Depends(query_budget(1))])
+async def get_product_facets(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """
+    Product counts for storefront navigation
+
+    - Active, in-stock products per category and subcategory
+    - Price range buckets (FACET_PRICE_BOUNDARIES)
+    - Single grouped aggregation, cached and invalidated on catalog writes
+    """
+    if not_modified := not_modified_or_tag(request, response, catalog_version.etag("home-facetas")):
+        return not_modified
+
+    cache_key = ("home_facetas",)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    cache_generation = catalog_cache.generation
+
+    try:
+        facets = await db.run_sync(lambda s: ProductService(s).get_facets(settings.FACET_PRICE_BOUNDARIES))
+    except Exception as e:
+        logger.exception("Error computing product facets: %s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al obtener facetas.")
+
+    catalog_cache.set(cache_key, facets, generation=cache_generation)
+    return facets
+
+
+@router.get("/home/productos/sugerencias", response_model=List[dict])
+async def suggest_products(
+    prefix: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(8, ge=1, le=10)
+):
+    """
+    Typeahead suggestions for the storefront search box
+
+    - Matches the start of any word in the product name (accent-insensitive)
+    - Ranked by units sold; served from memory, never queries the database
+    """
+    return product_suggestion_service.suggest(prefix, limit)
+
+
+@router.get("/home/productos", response_model=List[ProductoResponse], dependencies=[Depends(query_budget(4))])
 async def browse_products(
+    request: Request,
+    response: Response,
     categoria_id: int = Query(None),
     subcategoria_id: int = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(12, ge=1, le=100),
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None, description="Cursor opaco (X-Next-Cursor de la página anterior)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Browse products by category/subcategory
@@ -85,30 +174,56 @@ async def browse_products(
     - Return hierarchical structure: Category -> Subcategory -> Products
     - Filter by categoria_id and/or subcategoria_id
     - Only return active products with stock > 0
-    - Pagination support
+    - Pagination support: offset (skip/limit) or keyset (after/limit);
+      next page cursor returned in X-Next-Cursor header
     - Default limit 12 (typical grid layout)
+    - Responses are cached (TTL + LRU) and invalidated on catalog writes
+    - ETag from the catalog version; 304 if If-None-Match matches
     """
+    try:
+        after_key = decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not_modified := not_modified_or_tag(request, response, catalog_version.etag("home-productos")):
+        return not_modified
+    if after_key is not None:
+        skip = 0
+
+    cache_key = ("home_productos", categoria_id or None, subcategoria_id or None, int(skip), int(limit), after_key)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        _set_next_cursor(response, cached, limit)
+        return cached
+    cache_generation = catalog_cache.generation
+
     params = {"skip": int(skip), "limit": int(limit)}
-    where = ["p.activo = 1", "p.cantidad_disponible > 0"]
+    # Stock minus active holds, like add-to-cart and checkout (a product fully
+    # held by pending online payments is not listed)
+    where = ["p.activo = 1", "s.disponible > 0"]
     if categoria_id:
         where.append("p.categoria_id = :categoria_id")
         params["categoria_id"] = int(categoria_id)
     if subcategoria_id:
         where.append("p.subcategoria_id = :subcategoria_id")
         params["subcategoria_id"] = int(subcategoria_id)
+    if after_key is not None:
+        where.append(KEYSET_AFTER_CLAUSE)
+        params["after_fecha"], params["after_id"] = after_key
 
     where_sql = " AND ".join(where)
     try:
         q = text(
-            f"SELECT p.id, p.nombre, p.descripcion, p.precio, p.peso_gramos, p.cantidad_disponible, p.categoria_id, p.subcategoria_id, p.activo, p.fecha_creacion FROM Productos p WHERE {where_sql} ORDER BY p.fecha_creacion DESC OFFSET :skip ROWS FETCH NEXT :limit ROWS ONLY"
+            f"SELECT p.id, p.nombre, p.descripcion, p.precio, p.peso_gramos, s.disponible AS cantidad_disponible, p.categoria_id, p.subcategoria_id, p.activo, p.fecha_creacion FROM Productos p CROSS APPLY (SELECT {available_stock_sql('p')} AS disponible) s WHERE {where_sql} ORDER BY p.fecha_creacion DESC, p.id DESC OFFSET :skip ROWS FETCH NEXT :limit ROWS ONLY"
         )
-        rows = db.execute(q, params).fetchall()
+        rows = (await db.execute(q, params)).fetchall()
     except Exception as e:
         logger.exception("Error querying home products: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al listar productos.")
 
     products = []
     if not rows:
+        catalog_cache.set(cache_key, [], generation=cache_generation)
         return []
 
     # collect ids for batch fetch
@@ -116,35 +231,18 @@ async def browse_products(
     cat_ids = set(r.categoria_id for r in rows if r.categoria_id)
     subcat_ids = set(r.subcategoria_id for r in rows if r.subcategoria_id)
 
-    cats = {}
-    subcats = {}
-    try:
-        if cat_ids:
-            qcat = text(
-                f"SELECT id, nombre FROM Categorias WHERE id IN ({', '.join([str(int(x)) for x in cat_ids])})"
-            )
-            for c in db.execute(qcat).fetchall():
-                cats[c.id] = {"id": c.id, "nombre": c.nombre}
-        if subcat_ids:
-            qsub = text(
-                f"SELECT id, nombre FROM Subcategorias WHERE id IN ({', '.join([str(int(x)) for x in subcat_ids])})"
-            )
-            for s in db.execute(qsub).fetchall():
-                subcats[s.id] = {"id": s.id, "nombre": s.nombre}
-    except Exception:
-        logger.exception("Error fetching category/subcategory names")
+    # batch lookups (one reusable plan each, see ProductRepository)
+    def _fetch_relations(sync_db: Session):
+        repository = ProductRepository(sync_db)
+        return (
+            repository.get_categories_by_ids(cat_ids),
+            repository.get_subcategories_by_ids(subcat_ids),
+            repository.get_product_images(prod_ids),
+        )
 
-    # images map
-    images_map = {}
-    try:
-        if prod_ids:
-            qimg = text(
-                f"SELECT producto_id, ruta_imagen FROM ProductoImagenes WHERE producto_id IN ({', '.join([str(int(x)) for x in prod_ids])}) ORDER BY orden ASC"
-            )
-            for img in db.execute(qimg).fetchall():
-                images_map.setdefault(img.producto_id, []).append(img.ruta_imagen)
-    except Exception:
-        logger.exception("Error fetching product images")
+    cat_rows, subcat_rows, images_map = await db.run_sync(_fetch_relations)
+    cats = {cid: {"id": c["id"], "nombre": c["nombre"]} for cid, c in cat_rows.items()}
+    subcats = {sid: {"id": sc["id"], "nombre": sc["nombre"]} for sid, sc in subcat_rows.items()}
 
     for r in rows:
         products.append(
@@ -165,9 +263,18 @@ async def browse_products(
             }
         )
 
+    catalog_cache.set(cache_key, products, generation=cache_generation)
+    _set_next_cursor(response, products, limit)
     return products
 
 
+def _set_next_cursor(response: Response, products: list, limit: int) -> None:
+    """Expose the keyset cursor for the next page, if any"""
+    next_cursor = next_cursor_from_rows(products, limit)
+    if next_cursor and response is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+
 @router.get("/cart")
 async def get_cart(
     session_id: Optional[str] = Header(None),
@@ -247,7 +354,7 @@ async def add_to_cart(
 
     # 1. Validate producto exists and stock
     try:
-        p = db.execute(text("SELECT id, precio, cantidad_disponible FROM Productos WHERE id = :id AND activo = 1"), {"id": producto_id}).first()
+        p = db.execute(text(f"SELECT p.id, p.precio, {available_stock_sql('p')} AS cantidad_disponible FROM Productos p WHERE p.id = :id AND p.activo = 1"), {"id": producto_id}).first()
     except Exception as e:
         logger.exception("Error querying producto for cart add: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al validar producto.")
@@ -412,7 +519,7 @@ async def update_cart_item(
 
     # Fetch cart item and product stock
     try:
-        q = text("SELECT ci.id, ci.cantidad, ci.producto_id, p.cantidad_disponible, p.precio FROM CartItems ci JOIN Productos p ON p.id = ci.producto_id WHERE ci.id = :item_id AND ci.cart_id = :cart_id")
+        q = text(f"SELECT ci.id, ci.cantidad, ci.producto_id, {available_stock_sql('p')} AS cantidad_disponible, p.precio FROM CartItems ci JOIN Productos p ON p.id = ci.producto_id WHERE ci.id = :item_id AND ci.cart_id = :cart_id")
         row = db.execute(q, {"item_id": item_id, "cart_id": cart_id}).first()
     except Exception as e:
         logger.exception("Error querying cart item for update: %s", e)
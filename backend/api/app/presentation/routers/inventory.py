@@ -9,6 +9,7 @@ from sqlalchemy import text
 from typing import List
 from app.presentation.schemas import ReabastecimientoRequest, InventarioHistorialResponse
 from app.core.database import get_db
+from app.infrastructure.cache import catalog_version
 import logging
 import uuid
 
@@ -73,6 +74,7 @@ async def restock_product(
         db.execute(ins, {"producto_id": producto_id, "cantidad_anterior": cantidad_anterior, "cantidad_nueva": cantidad_nueva, "referencia": request.referencia})
 
         db.commit()
+        catalog_version.bump()
     except Exception as e:
         logger.exception("Error performing restock transaction: %s", e)
         db.rollback()
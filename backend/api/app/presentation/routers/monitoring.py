@@ -0,0 +1,32 @@
+"""
+Monitoring router: runtime diagnostics for administrators
+"""
+from fastapi import APIRouter, Depends
+from app.core.config import settings
+from app.infrastructure.monitoring import event_loop_monitor
+from app.presentation.routers.auth import require_admin
+
+router = APIRouter(
+    prefix="/api/admin/monitor",
+    tags=["monitoring"],
+    dependencies=[Depends(require_admin)]
+)
+
+
+@router.get("/event-loop")
+async def get_event_loop_stats():
+    """
+    Event loop lag and blocking time per route
+
+    - Enabled with LOOP_MONITOR_ENABLED
+    - `routes`: stalls above LOOP_MONITOR_THRESHOLD_MS per route (count / total / max ms)
+    - `recent_stalls`: latest stalls with the stack of the blocking code
+    """
+    return {"enabled": settings.LOOP_MONITOR_ENABLED, **event_loop_monitor.snapshot()}
+
+
+@router.delete("/event-loop")
+async def reset_event_loop_stats():
+    """Reset the collected statistics"""
+    event_loop_monitor.reset()
+    return {"status": "success", "message": "Estadísticas reiniciadas."}
@@ -2,19 +2,31 @@
 Orders router: View and manage orders for admin
 Handles HU_MANAGE_ORDERS
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from sqlalchemy import desc, text
+from datetime import date
+from sqlalchemy import DateTime, and_, cast, desc, or_, text
 from app.presentation.schemas import (
     PedidoCreate,
     PedidoResponse,
+    PedidoResumenResponse,
     PedidoItemResponse,
     PedidoEstadoUpdate,
+    PedidoEstadoLoteUpdate,
+    PedidoEstadoLoteResponse,
+    UsuarioPublicResponse,
 )
 from app.core.database import get_db
 from app.infrastructure.external.rabbitmq import RabbitMQProducer
-from app.presentation.routers.auth import get_current_user
+from app.presentation.routers.auth import get_current_user, require_admin
+from app.application.services.order_serializer import order_serializer
+from app.application.services.order_export import order_export_service
+from app.application.services.order_status_batch import order_status_batch_service
+from app.infrastructure.monitoring.query_stats import query_budget
+from app.shared.utils.pagination import decode_cursor, next_cursor_from_rows
 import app.domain.models as models
 import logging
 
@@ -27,76 +39,29 @@ router = APIRouter(
 
 
 def _pedido_to_response(db, pedido: models.Pedido):
-    items = db.query(models.PedidoItem).filter(models.PedidoItem.pedido_id == pedido.id).all()
-    items_resp = []
-    
-    for item in items:
-        # Get product details including main image
-        producto = db.execute(
-            text("""
-                SELECT p.id, p.nombre, 
-                       (SELECT TOP 1 ruta_imagen FROM ProductoImagenes 
-                        WHERE producto_id = p.id ORDER BY orden ASC) as imagen
-                FROM Productos p 
-                WHERE p.id = :producto_id
-            """),
-            {"producto_id": item.producto_id}
-        ).fetchone()
-        
-        item_data = {
-            "id": item.id,
-            "producto_id": item.producto_id,
-            "cantidad": item.cantidad,
-            "precio_unitario": float(item.precio_unitario),
-        }
-        
-        # Add product details if found
-        if producto:
-            item_data["producto_nombre"] = producto.nombre
-            item_data["producto_imagen"] = producto.imagen
-        
-        items_resp.append(item_data)
-    
-    # Get user information
-    usuario = db.query(models.Usuario).filter(models.Usuario.id == pedido.usuario_id).first()
-    cliente_nombre = usuario.nombre_completo if usuario else f"Cliente #{pedido.usuario_id}"
-
-    # Get user information
-    usuario = db.query(models.Usuario).filter(models.Usuario.id == pedido.usuario_id).first()
-    cliente_nombre = usuario.nombre_completo if usuario else f"Usuario ID: {pedido.usuario_id}"
-    cliente_id = pedido.usuario_id
-
-    # Format fecha_creacion to ISO string if it exists
-    fecha_creacion_str = None
-    if pedido.fecha_creacion:
-        if hasattr(pedido.fecha_creacion, 'isoformat'):
-            fecha_creacion_str = pedido.fecha_creacion.isoformat()
-        else:
-            fecha_creacion_str = str(pedido.fecha_creacion)
-
-    return {
-        "id": pedido.id,
-        "usuario_id": pedido.usuario_id,
-        "clienteNombre": cliente_nombre,
-        "estado": pedido.estado,
-        "total": float(pedido.total),
-        "metodo_pago": pedido.metodo_pago or 'Efectivo',
-        "direccion_entrega": pedido.direccion_entrega,
-        "municipio": pedido.municipio,
-        "departamento": pedido.departamento,
-        "pais": pedido.pais or 'Colombia',
-        "telefono_contacto": pedido.telefono_contacto,
-        "fecha_creacion": pedido.fecha_creacion,
-        "items": items_resp,
-    }
-
-
-@router.get("/", response_model=List[PedidoResponse])
+    return order_serializer.serialize(db, pedido)
+
+
+def _pedidos_to_response(db, pedidos: List[models.Pedido]):
+    """Serialize a page of orders with a fixed number of queries"""
+    return order_serializer.serialize_many(db, pedidos)
+
+
+@router.get(
+    "/",
+    response_model=List[PedidoResponse],
+    responses={200: {"description": "List[PedidoResumenResponse] con view=summary"}},
+    dependencies=[Depends(query_budget(3))]
+)
 async def list_orders(
+    response: Response,
     estado: str = Query(None, regex="^(Pendiente|Enviado|Entregado|Cancelado)$"),
+    estado_pago: str = Query(None, regex="^(Pendiente de Pago|Pagado|Fallido)$"),
     usuario_id: int = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Cursor opaco (X-Next-Cursor de la página anterior)"),
+    view: str = Query("full", regex="^(full|summary)$"),
     db: Session = Depends(get_db)
 ):
     """
@@ -104,19 +69,107 @@ async def list_orders(
     
     Requirements (HU_MANAGE_ORDERS):
     - Filter by estado (Pendiente, Enviado, Entregado, Cancelado)
-    - Filter by usuario_id
-    - Sort by fecha_creacion DESC (newest first)
+    - Filter by estado_pago and/or usuario_id
+    - Sort by fecha_creacion DESC, id DESC (newest first)
     - Return order with items and total
-    - Pagination support
+    - Pagination support: offset (skip/limit) or keyset (after/limit);
+      next page cursor returned in X-Next-Cursor header
+    - view=summary: only grid columns (id, cliente, estado, estado_pago, total,
+      fecha, items_count) in a single query, without items
     """
+    try:
+        after_key = decode_cursor(after) if after else None
+    except ValueError as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"status": "error", "message": str(e)}
+        )
+
+    if view == "summary":
+        resumen = order_serializer.list_summaries(
+            db, estado=estado, estado_pago=estado_pago, usuario_id=usuario_id,
+            skip=skip, limit=limit, after=after_key
+        )
+        next_cursor = next_cursor_from_rows(resumen, limit)
+        # Bypasses response_model (PedidoResponse) on purpose
+        return JSONResponse(
+            jsonable_encoder([PedidoResumenResponse(**row) for row in resumen]),
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else None
+        )
+
     q = db.query(models.Pedido)
     if estado:
         q = q.filter(models.Pedido.estado == estado)
+    if estado_pago:
+        q = q.filter(models.Pedido.estado_pago == estado_pago)
     if usuario_id:
         q = q.filter(models.Pedido.usuario_id == usuario_id)
+    if after_key:
+        # Mismo predicado que keyset_after_clause (comparación en precisión DATETIME)
+        after_fecha = cast(after_key[0], DateTime)
+        q = q.filter(or_(
+            models.Pedido.fecha_creacion < after_fecha,
+            and_(models.Pedido.fecha_creacion == after_fecha, models.Pedido.id < after_key[1])
+        ))
+        skip = 0
+
+    pedidos = (
+        q.order_by(desc(models.Pedido.fecha_creacion), desc(models.Pedido.id))
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    next_cursor = next_cursor_from_rows(pedidos, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return _pedidos_to_response(db, pedidos)
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+def export_orders(
+    desde: date = Query(..., description="Fecha inicial (inclusive)"),
+    hasta: date = Query(..., description="Fecha final (inclusive)"),
+    formato: str = Query("csv", regex="^(csv|ndjson)$"),
+):
+    """
+    Export orders created between desde and hasta for accounting.
+
+    - One line per order item, with the order columns repeated
+    - Streamed from the database in fixed-size batches (constant memory for any range)
+    - formato=csv (with header) or ndjson (one JSON object per line)
+    """
+    if hasta < desde:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'hasta' debe ser posterior a 'desde'")
+
+    if formato == "csv":
+        body, media_type = order_export_service.iter_csv(desde, hasta), "text/csv; charset=utf-8"
+    else:
+        body, media_type = order_export_service.iter_ndjson(desde, hasta), "application/x-ndjson"
+    filename = f"pedidos_{desde.isoformat()}_{hasta.isoformat()}.{formato}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/estado/lote", response_model=PedidoEstadoLoteResponse)
+def update_orders_status_batch(
+    request: PedidoEstadoLoteUpdate,
+    db: Session = Depends(get_db),
+    current_user: UsuarioPublicResponse = Depends(require_admin),
+):
+    """
+    Apply one estado to many orders (e.g. mark a shipping batch as Enviado)
+
+    - Each order is validated with the same state machine as the single update
+    - Orders not found or with an invalid transition are skipped and listed in `rechazados`
+    - Valid ones get their PedidosHistorialEstado rows and estado in one transaction
+    - pedido.estado.cambiado events are published as one batch after commit
+    """
+    return order_status_batch_service.apply(
+        db, request.pedido_ids, request.estado, nota=request.nota, usuario_id=current_user.id
+    )
 
-    pedidos = q.order_by(desc(models.Pedido.fecha_creacion)).offset(skip).limit(limit).all()
-    return [_pedido_to_response(db, p) for p in pedidos]
 
 @router.post("/", response_model=PedidoResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(payload: PedidoCreate, db: Session = Depends(get_db)):
@@ -370,7 +423,7 @@ async def get_order_history(pedido_id: int, db: Session = Depends(get_db)):
     
 
 
-@router.get("/user/{usuario_id}", response_model=List[PedidoResponse])
+@router.get("/user/{usuario_id}", response_model=List[PedidoResponse], dependencies=[Depends(query_budget(3))])
 async def get_user_orders(
     usuario_id: int,
     skip: int = Query(0, ge=0),
@@ -385,13 +438,14 @@ async def get_user_orders(
     - Pagination support
     - Return orders with items
     """
+    # skip/limit are accepted but not applied: existing clients expect every order
     pedidos = (
         db.query(models.Pedido)
         .filter(models.Pedido.usuario_id == usuario_id)
         .order_by(desc(models.Pedido.fecha_creacion))
         .all()
     )
-    return [_pedido_to_response(db, p) for p in pedidos]
+    return _pedidos_to_response(db, pedidos)
 
 
 # ==================== PUBLIC ROUTER FOR CUSTOMER ORDERS ====================
@@ -400,110 +454,7 @@ public_router = APIRouter(
     tags=["pedidos-public"]
 )
 
-@public_router.post("/", response_model=PedidoResponse, status_code=status.HTTP_201_CREATED)
-async def create_customer_order(
-    payload: dict,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
-):
-    """
-    Create order for authenticated user with flexible payload keys.
-    Supports address by id (`direccion_id`) or raw string (`direccionEnvio`/`direccion_entrega`),
-    and product items with multiple key formats.
-    """
-    try:
-        # Validate products
-        productos = payload.get("productos") or payload.get("items") or []
-        if not productos:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El carrito está vacío.")
-
-        # Resolve address
-        direccion_entrega = payload.get("direccionEnvio") or payload.get("direccion_entrega")
-        direccion_id = payload.get("direccion_id") or payload.get("direccionId")
-        if direccion_id and not direccion_entrega:
-            direccion = (
-                db.query(models.Direccion)
-                .filter(models.Direccion.id == int(direccion_id), models.Direccion.usuario_id == current_user.id)
-                .first()
-            )
-            if not direccion:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="La dirección seleccionada no existe.")
-            direccion_entrega = direccion.direccion_completa
-        if not direccion_entrega or len(str(direccion_entrega).strip()) < 10:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Selecciona una dirección de entrega válida.")
-
-        # Resolve phone and payment
-        usuario = db.query(models.Usuario).filter(models.Usuario.id == current_user.id).first()
-        telefono_contacto = payload.get("telefonoContacto") or payload.get("telefono_contacto") or (usuario.telefono if usuario else None)
-        if not telefono_contacto:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Debes proporcionar un número de teléfono de contacto.")
-        metodo_pago = payload.get("metodoPago") or payload.get("metodo_pago") or "Efectivo"
-        nota_especial = payload.get("notaEspecial") or payload.get("nota_especial")
-
-        # Create pedido
-        pedido = models.Pedido(
-            usuario_id=current_user.id,
-            estado='Pendiente',
-            direccion_entrega=direccion_entrega,
-            telefono_contacto=str(telefono_contacto).replace("+", "").replace("-", "").replace(" ", ""),
-            metodo_pago=metodo_pago,
-            nota_especial=nota_especial,
-        )
-        db.add(pedido)
-        db.flush()
-
-        # Items and total
-        total = 0.0
-        for it in productos:
-            producto_id = int(it.get("sku") or it.get("producto_id") or it.get("id"))
-            cantidad = int(it.get("cantidad") or it.get("quantity") or 1)
-            precio = float(it.get("precioUnitario") or it.get("precio_unitario") or it.get("precio") or 0.0)
-
-            # Stock checks
-            query_producto = text("""
-                SELECT id, nombre, cantidad_disponible 
-                FROM Productos 
-                WHERE id = :producto_id
-            """)
-            result = db.execute(query_producto, {"producto_id": producto_id})
-            producto = result.fetchone()
-            if not producto:
-                db.rollback()
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Producto con ID {producto_id} no encontrado")
-            if producto.cantidad_disponible < cantidad:
-                db.rollback()
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Stock insuficiente para {producto.nombre}. Disponible: {producto.cantidad_disponible}, Solicitado: {cantidad}")
-
-            db.execute(text("""
-                UPDATE Productos 
-                SET cantidad_disponible = cantidad_disponible - :cantidad 
-                WHERE id = :producto_id
-            """), {"cantidad": cantidad, "producto_id": producto_id})
-
-            total += cantidad * precio
-            db.add(models.PedidoItem(
-                pedido_id=pedido.id,
-                producto_id=producto_id,
-                cantidad=cantidad,
-                precio_unitario=precio,
-            ))
-
-        pedido.total = total
-        db.add(pedido)
-        db.commit()
-        db.refresh(pedido)
-
-        logger.info(f"Order created: pedido_id={pedido.id}, usuario_id={current_user.id}, total={total}")
-        return _pedido_to_response(db, pedido)
-    except HTTPException:
-        raise
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Error creating public order: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno al procesar el pedido.")
-
-
-@public_router.get("/mis-pedidos", response_model=List[PedidoResponse])
+@public_router.get("/mis-pedidos", response_model=List[PedidoResponse], dependencies=[Depends(query_budget(4))])
 async def get_my_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
@@ -528,4 +479,4 @@ async def get_my_orders(
         .all()
     )
     
-    return [_pedido_to_response(db, p) for p in pedidos]
+    return _pedidos_to_response(db, pedidos)
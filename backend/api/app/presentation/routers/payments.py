@@ -2,9 +2,9 @@
 Payments Router: REST endpoints for payment processing with Stripe
 Handles creation of payment intents, confirmation, and status checks
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Header
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import logging
 
 from app.core.database import get_db
@@ -20,6 +20,7 @@ from app.presentation.schemas import (
 )
 from app.application.services.stripe_service import stripe_service
 from app.application.services.payment_service import payment_service
+from app.application.services.idempotency_service import IDEMPOTENCY_HEADER, idempotency_service
 import app.domain.models as models
 
 logger = logging.getLogger(__name__)
@@ -40,7 +41,8 @@ router = APIRouter(
 async def create_payment_intent(
     request: CreatePaymentIntentRequest,
     current_user: models.Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
 ):
     """
     Create a Stripe Payment Intent for an order
@@ -51,9 +53,18 @@ async def create_payment_intent(
     - Order must be in "Pendiente de Pago" status
     - All items must have sufficient stock
     
+    With an Idempotency-Key header, a retry with the same key and body returns
+    the intent created by the first request without calling Stripe again.
+    
     Returns Payment Intent with client_secret for frontend
     """
     try:
+        claim, replay = idempotency_service.begin(
+            db, current_user.id, "POST /api/pagos/create-payment-intent", idempotency_key, request
+        )
+        if replay is not None:
+            return replay
+        
         logger.info(f"Creating payment intent for order {request.pedido_id}, user {current_user.id}")
         
         # Get the order
@@ -97,7 +108,9 @@ async def create_payment_intent(
                 "pedido_id": str(request.pedido_id),
                 "usuario_id": str(current_user.id),
                 "email": current_user.email
-            }
+            },
+            # Same key on Stripe's side in case our commit fails after the intent exists
+            idempotency_key=f"pi-{current_user.id}-{claim.clave_hash.hex()}" if claim else None
         )
         
         # Register transaction in database (initial pending state)
@@ -112,11 +125,7 @@ async def create_payment_intent(
             metodo_pago=None  # Not known until payment processed
         )
         
-        db.commit()
-        
-        logger.info(f"Payment intent created: {intent['id']}, transaction: {transaccion.id}")
-        
-        return PaymentIntentResponse(
+        response = PaymentIntentResponse(
             id=intent['id'],
             client_secret=intent['client_secret'],
             amount=intent['amount'],
@@ -124,6 +133,13 @@ async def create_payment_intent(
             status=intent['status'],
             stripe_public_key=intent['publishable_key']
         )
+        idempotency_service.complete(db, claim, response, status.HTTP_201_CREATED)
+        db.commit()
+        idempotency_service.remember(claim)
+        
+        logger.info(f"Payment intent created: {intent['id']}, transaction: {transaccion.id}")
+        
+        return response
         
     except HTTPException:
         raise
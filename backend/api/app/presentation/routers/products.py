@@ -3,12 +3,13 @@ Products router: Create, Read, Update products for admin
 Handles HU_CREATE_PRODUCT
 Refactored to follow SOLID principles with separated concerns
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Body, Request, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Body, Request, Form, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.presentation.schemas import ProductoCreate, ProductoResponse, ProductoUpdate, ProductoImagenResponse
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 import logging
 import base64
 import json
@@ -16,8 +17,13 @@ import os
 from app.core.config import settings
 from app.application.services.product_service import ProductService
 from app.application.services.image_service import ImageService
+from app.application.services.search_service import product_search_service
+from app.application.services.category_tree_service import category_tree_service
 from app.application.validators.product_validator import ProductValidator
 from app.infrastructure.repositories.product_repository import ProductRepository
+from app.infrastructure.cache import catalog_version
+from app.shared.utils.pagination import decode_cursor, next_cursor_from_rows
+from app.infrastructure.monitoring.query_stats import query_budget
 from app.core.constants import (
     MIN_PRODUCT_NAME_LENGTH,
     MIN_PRODUCT_DESCRIPTION_LENGTH,
@@ -151,40 +157,44 @@ async def create_product(
     )
 
 
-@router.get("", response_model=List[ProductoResponse])
+@router.get("", response_model=List[ProductoResponse], dependencies=[Depends(query_budget(1))])
 async def list_products(
+    response: Response,
     categoria_id: int = Query(None, ge=1),
     subcategoria_id: int = Query(None, ge=1),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None, description="Cursor opaco (X-Next-Cursor de la página anterior)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List products with optional filtering by category/subcategory
     
     Requirements:
     - Filter by category_id and/or subcategory_id
-    - Pagination support
+    - Pagination support: offset (skip/limit) or keyset (after/limit)
     - Return active products
+    - Next page cursor returned in X-Next-Cursor header
     """
-    # Initialize services
-    product_service = ProductService(db)
-    repository = ProductRepository(db)
+    try:
+        after_key = decode_cursor(after) if after else None
+    except ValueError as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"status": "error", "message": str(e)}
+        )
     
     try:
-        # Fetch products from repository
-        rows = repository.list_products(categoria_id, subcategoria_id, skip, limit)
-        if not rows:
+        # Fetch enriched product cards (relations + images + ratings) in one query
+        products = await db.run_sync(
+            lambda s: ProductService(s).list_product_cards(categoria_id, subcategoria_id, skip, limit, after=after_key)
+        )
+        if not products:
             return []
 
-        # Build product response objects
-        products = [product_service.build_product_response(r) for r in rows]
-        
-        # Enrich with relations (categories, subcategories, images)
-        products = product_service.enrich_products_with_relations(products)
-        
-        # Enrich with ratings
-        products = product_service.enrich_products_with_ratings(products)
+        next_cursor = next_cursor_from_rows(products, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
 
         return products
         
@@ -197,37 +207,34 @@ async def list_products(
 
 
 @router.get("/{producto_id}", response_model=ProductoResponse)
-async def get_product(producto_id: int, include_inactive: bool = Query(False), db: Session = Depends(get_db)):
+async def get_product(producto_id: int, include_inactive: bool = Query(False), db: AsyncSession = Depends(get_async_db)):
     """
     Get product details
 
     - Returns full product information including images, category and subcategory
     - By default only active products are returned (activo = 1). Set `include_inactive=true` to allow fetching inactive products for admin purposes.
     """
-    # Initialize services
-    validator = ProductValidator()
-    product_service = ProductService(db)
-    repository = ProductRepository(db)
-    
     # Validate product exists
-    if error := validator.validate_product_exists(db, producto_id, include_inactive):
+    validator = ProductValidator()
+    if error := await db.run_sync(validator.validate_product_exists, producto_id, include_inactive):
         return error
 
-    try:
-        # Fetch product
-        row = repository.get_product_by_id(producto_id, include_inactive)
+    def _load_product(sync_db: Session):
+        product_service = ProductService(sync_db)
+        row = ProductRepository(sync_db).get_product_by_id(producto_id, include_inactive)
         if not row:
+            return None
+        # Build product response and enrich with relations
+        return product_service.enrich_product_with_relations(product_service.build_product_response(row))
+
+    try:
+        producto = await db.run_sync(_load_product)
+        if not producto:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={"status": "error", "message": "Producto no encontrado."}
             )
 
-        # Build product response
-        producto = product_service.build_product_response(row)
-        
-        # Enrich with relations
-        producto = product_service.enrich_product_with_relations(producto)
-
         return producto
         
     except Exception as e:
@@ -299,11 +306,8 @@ async def update_product(
     
     if 'categoria_id' in data:
         try:
-            cat = db.execute(
-                text("SELECT id FROM Categorias WHERE id = :id AND activo = 1"),
-                {"id": int(data['categoria_id'])}
-            ).first()
-            if not cat:
+            cat = category_tree_service.get_categoria(db, int(data['categoria_id']))
+            if not cat or not cat.activo:
                 return JSONResponse(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     content={"status": "error", "message": "Categoría no encontrada."}
@@ -317,11 +321,8 @@ async def update_product(
 
     if 'subcategoria_id' in data:
         try:
-            sub = db.execute(
-                text("SELECT id, categoria_id FROM Subcategorias WHERE id = :id AND activo = 1"),
-                {"id": int(data['subcategoria_id'])}
-            ).first()
-            if not sub:
+            sub = category_tree_service.get_subcategoria(db, int(data['subcategoria_id']))
+            if not sub or not sub.activo:
                 return JSONResponse(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     content={"status": "error", "message": "Subcategoría no encontrada."}
@@ -832,7 +833,10 @@ async def delete_product(producto_id: int, db: Session = Depends(get_db)):
     product_service.publish_product_deleted(producto_id)
 
     # Soft delete
-    repository.soft_delete_product(producto_id)
+    if repository.soft_delete_product(producto_id):
+        product_search_service.remove_product(producto_id)
+    # The message is published before the UPDATE, so drop cached pages again
+    catalog_version.bump()
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -2,16 +2,20 @@
 Public orders router: Create and view orders for authenticated users
 Handles user order creation and retrieval
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from typing import List
+from typing import List, Optional
 from app.presentation.schemas import (
     PedidoResponse,
 )
+from app.core.config import settings
 from app.core.database import get_db
+from app.application.services.idempotency_service import IDEMPOTENCY_HEADER, idempotency_service
+from app.infrastructure.repositories.stock_repository import InsufficientStockError, StockRepository
 from app.presentation.routers.auth import get_current_user
-from app.presentation.routers.orders import _pedido_to_response
+from app.presentation.routers.orders import _pedido_to_response, _pedidos_to_response
+from app.infrastructure.monitoring.query_stats import query_budget
 from app.presentation.routers.auth import UsuarioPublicResponse
 import app.domain.models as models
 import logging
@@ -28,11 +32,15 @@ router = APIRouter(
 async def create_user_order(
     payload: dict,
     current_user: UsuarioPublicResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
 ):
     """
     Create a new order for the authenticated user
     
+    With an Idempotency-Key header, a retry with the same key and payload
+    returns the order created by the first request.
+    
     Expected payload format:
     {
         "productos": [
@@ -49,6 +57,10 @@ async def create_user_order(
     }
     """
     try:
+        claim, replay = idempotency_service.begin(db, current_user.id, "POST /api/pedidos", idempotency_key, payload)
+        if replay is not None:
+            return replay
+        
         # Validate required fields
         if not payload.get("productos") or len(payload.get("productos", [])) == 0:
             raise HTTPException(
@@ -124,6 +136,7 @@ async def create_user_order(
         # Process items and calculate subtotal
         subtotal = 0
         productos = payload.get("productos", [])
+        lineas = []
         
         for item in productos:
             # Support both formats: sku/producto_id
@@ -146,6 +159,7 @@ async def create_user_order(
                 )
             
             subtotal += cantidad * precio_unitario
+            lineas.append((producto_id, cantidad))
             
             pedido_item = models.PedidoItem(
                 pedido_id=pedido.id,
@@ -159,6 +173,18 @@ async def create_user_order(
         costo_envio = float(payload.get("costoEnvio") or payload.get("costo_envio") or 0.0)
         metodo_pago = payload.get("metodoPago") or payload.get("metodo_pago") or "No especificado"
         
+        # Online payments: hold the stock until payment or expiry (all lines or none); deducted in process_payment.
+        # Other methods are not held: nothing would ever convert or expire their hold
+        if settings.STOCK_HOLD_TTL_SECONDS > 0 and metodo_pago in settings.STOCK_HOLD_PAYMENT_METHODS:
+            try:
+                StockRepository(db).hold_items(pedido.id, lineas, settings.STOCK_HOLD_TTL_SECONDS)
+            except InsufficientStockError as e:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={"status": "error", "message": e.message(), "code": "INSUFFICIENT_STOCK"}
+                )
+        
         # Calculate total
         total = subtotal + costo_envio
         
@@ -167,12 +193,18 @@ async def create_user_order(
         pedido.costo_envio = costo_envio
         pedido.metodo_pago = metodo_pago
         pedido.total = total
-        db.commit()
+        db.flush()
         db.refresh(pedido)
         
+        # Respuesta armada antes del commit para guardarla con la clave de idempotencia
+        response = _pedido_to_response(db, pedido)
+        idempotency_service.complete(db, claim, response, status.HTTP_201_CREATED)
+        db.commit()
+        idempotency_service.remember(claim)
+        
         logger.info(f"Order created: pedido_id={pedido.id}, usuario_id={current_user.id}, total={total}")
         
-        return _pedido_to_response(db, pedido)
+        return response
         
     except HTTPException:
         raise
@@ -207,7 +239,7 @@ async def get_user_orders(
             .order_by(desc(models.Pedido.fecha_creacion))
             .all()
         )
-        return [_pedido_to_response(db, p) for p in pedidos]
+        return _pedidos_to_response(db, pedidos)
     except Exception as e:
         logger.error(f"Error fetching user orders: {str(e)}")
         raise HTTPException(
@@ -216,7 +248,7 @@ async def get_user_orders(
         )
 
 
-@router.get("/mis-pedidos", response_model=List[PedidoResponse])
+@router.get("/mis-pedidos", response_model=List[PedidoResponse], dependencies=[Depends(query_budget(4))])
 async def get_my_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
@@ -242,7 +274,7 @@ async def get_my_orders(
             .all()
         )
         
-        return [_pedido_to_response(db, p) for p in pedidos]
+        return _pedidos_to_response(db, pedidos)
     except Exception as e:
         logger.error(f"Error fetching user orders: {str(e)}")
         raise HTTPException(
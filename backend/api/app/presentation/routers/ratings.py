@@ -4,10 +4,11 @@ Endpoints para gestionar calificaciones de productos
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.presentation.schemas import (
     CalificacionCreate,
     CalificacionUpdate,
@@ -21,6 +22,7 @@ from app.presentation.schemas import (
 from app.application.services.ratings_service import RatingsService
 from app.domain.models import Usuario, Calificacion
 from app.presentation.routers.auth import get_current_user, require_admin
+from app.infrastructure.monitoring.query_stats import query_budget
 
 # Router público (clientes)
 public_router = APIRouter(prefix="/api/calificaciones")
@@ -77,39 +79,49 @@ def get_my_ratings(
     return result
 
 
-@public_router.get("/producto/{producto_id}", response_model=List[CalificacionResponse])
-def get_product_ratings(
+@public_router.get("/producto/{producto_id}", response_model=List[CalificacionResponse], dependencies=[Depends(query_budget(2))])
+async def get_product_ratings(
     producto_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtener todas las calificaciones visibles de un producto"""
-    calificaciones = RatingsService.get_product_ratings(
-        db, 
-        producto_id, 
-        visible_only=True,
-        skip=skip, 
-        limit=limit
-    )
+    def _load(sync_db: Session):
+        calificaciones = RatingsService.get_product_ratings(
+            sync_db, 
+            producto_id, 
+            visible_only=True,
+            skip=skip, 
+            limit=limit
+        )
+        # Nombres de usuario en una sola consulta
+        usuario_ids = {cal.usuario_id for cal in calificaciones}
+        nombres = {}
+        if usuario_ids:
+            nombres = dict(
+                sync_db.query(Usuario.id, Usuario.nombre_completo).filter(Usuario.id.in_(usuario_ids)).all()
+            )
+        return calificaciones, nombres
+
+    calificaciones, nombres = await db.run_sync(_load)
     
     result = []
     for cal in calificaciones:
-        usuario = db.query(Usuario).filter(Usuario.id == cal.usuario_id).first()
         response = CalificacionResponse.from_orm(cal)
-        response.usuario_nombre = usuario.nombre_completo if usuario else "Usuario"
+        response.usuario_nombre = nombres.get(cal.usuario_id) or "Usuario"
         result.append(response)
     
     return result
 
 
-@public_router.get("/producto/{producto_id}/stats", response_model=ProductoStatsResponse)
-def get_product_stats(
+@public_router.get("/producto/{producto_id}/stats", response_model=ProductoStatsResponse, dependencies=[Depends(query_budget(1))])
+async def get_product_stats(
     producto_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtener estadísticas de calificaciones de un producto"""
-    stats = RatingsService.get_product_stats(db, producto_id)
+    stats = await db.run_sync(RatingsService.get_product_stats, producto_id)
     
     if not stats:
         # Retornar stats vacías si no hay calificaciones
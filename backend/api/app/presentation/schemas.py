@@ -330,6 +330,38 @@ class PedidoResponse(BaseModel):
         from_attributes = False  # Changed to False to allow dict construction
 
 
+class PedidoResumenResponse(BaseModel):
+    """Fila del listado admin (?view=summary): sin items ni dirección"""
+    id: int
+    usuario_id: int
+    clienteNombre: Optional[str] = None
+    estado: str
+    estado_pago: Optional[str] = None
+    total: float
+    fecha_creacion: datetime
+    items_count: int = 0
+
+
+class PedidoEstadoLoteUpdate(BaseModel):
+    """Mismo estado para muchos pedidos (p. ej. un lote de despacho)"""
+    pedido_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    estado: str = Field(..., pattern="^(Enviado|Entregado|Cancelado)$")
+    nota: Optional[str] = Field(None, max_length=300)
+
+
+class PedidoEstadoLoteRechazo(BaseModel):
+    pedido_id: int
+    estado_actual: Optional[str] = None
+    motivo: str
+
+
+class PedidoEstadoLoteResponse(BaseModel):
+    estado: str
+    actualizados: List[int]
+    rechazados: List[PedidoEstadoLoteRechazo]
+    eventos_publicados: int
+
+
 # Carousel Schemas
 class CarruselImagenCreate(BaseModel):
     orden: int = Field(..., ge=1, le=5)
@@ -0,0 +1,34 @@
+"""
+HTTP conditional request helpers (ETag / If-None-Match)
+"""
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def not_modified_or_tag(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Set ETag on the outgoing response; if the client already has this
+    representation return a 304 to send instead (no body, no DB work).
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,42 @@
+"""
+Keyset (cursor) pagination helpers
+Cursors are opaque to clients: urlsafe base64 of "<fecha_creacion ISO>,<id>"
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def encode_cursor(fecha_creacion: datetime, row_id: int) -> str:
+    """Build an opaque cursor from the last row of a page"""
+    raw = f"{fecha_creacion.isoformat()},{int(row_id)}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Parse a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        fecha_str, id_str = raw.rsplit(",", 1)
+        return datetime.fromisoformat(fecha_str), int(id_str)
+    except (ValueError, UnicodeError, binascii.Error) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+
+
+def next_cursor_from_rows(rows, limit: int) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when there are no more rows"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    fecha = last["fecha_creacion"] if isinstance(last, dict) else last.fecha_creacion
+    row_id = last["id"] if isinstance(last, dict) else last.id
+    if fecha is None:
+        return None
+    return encode_cursor(fecha, row_id)
@@ -0,0 +1,3 @@
+"""
+Benchmarks (run manually against a real database, not part of pytest)
+"""
@@ -0,0 +1,256 @@
+"""
+Benchmark: hot API endpoints through the ASGI app
+
+Seeds (or reuses) the synthetic dataset from benchmarks.synthetic_data, then
+drives each scenario in-process with httpx against `main.app`, so routing,
+validation, dependencies, serialization and every SQL round trip are measured
+without network noise. Requests within a scenario are random but seeded, so
+two runs against the same dataset issue the same requests.
+
+Usage (from backend/api, with DB_* env vars pointing at a disposable SQL Server database):
+    python -m benchmarks.bench_api --requests 500 --concurrency 8
+    python -m benchmarks.bench_api --scenarios catalog_browse,my_orders --output results/before.json
+    python -m benchmarks.bench_api --compare results/before.json results/after.json
+
+Each result has throughput (req/s), mean/p50/p95/p99 latency (ms), errors,
+and SQL statements per request. JSON results are written to
+benchmarks/results/<UTC timestamp>-<git sha>.json by default.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks.synthetic_data import BENCH_PREFIX, BENCH_USER_EMAIL, DatasetSize, ensure_dataset
+from app.core.database import close_async_db, engine
+from app.infrastructure.monitoring.query_stats import count_queries
+from app.infrastructure.security.security import SecurityUtils
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BASE_URL = "http://localhost"  # must be in ALLOWED_HOSTS (TrustedHostMiddleware)
+
+Request = Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+class BenchContext:
+    """Ids and credentials the scenarios need, read once from the seeded data"""
+
+    def __init__(self):
+        with engine.connect() as conn:
+            bounds = conn.execute(text(
+                "SELECT MIN(id) AS lo, MAX(id) AS hi FROM Productos WHERE nombre LIKE :prefix"
+            ), {"prefix": f"{BENCH_PREFIX} %"}).first()
+            self.categoria_ids = [r.id for r in conn.execute(text(
+                "SELECT id FROM Categorias WHERE nombre LIKE :prefix ORDER BY id"
+            ), {"prefix": f"{BENCH_PREFIX} %"})]
+            self.user_id = conn.execute(text(
+                "SELECT id FROM Usuarios WHERE email = :email"
+            ), {"email": BENCH_USER_EMAIL}).scalar_one()
+        self.product_lo, self.product_hi = int(bounds.lo), int(bounds.hi)
+        self.headers = {"Authorization": f"Bearer {SecurityUtils.create_access_token({'sub': str(self.user_id)})}"}
+
+    def product_id(self, rng: random.Random) -> int:
+        return rng.randint(self.product_lo, self.product_hi)
+
+
+def build_scenarios(ctx: BenchContext) -> Dict[str, Request]:
+    async def catalog_browse(client, rng):
+        params = {"categoria_id": rng.choice(ctx.categoria_ids), "skip": 12 * rng.randint(0, 20), "limit": 12}
+        return await client.get("/api/home/productos", params=params)
+
+    async def product_detail(client, rng):
+        return await client.get(f"/api/admin/productos/{ctx.product_id(rng)}")
+
+    async def cart_add(client, rng):
+        payload = {"producto_id": ctx.product_id(rng), "cantidad": 1}
+        return await client.post("/api/cart/add", json=payload, headers=ctx.headers)
+
+    async def cart_get(client, rng):
+        return await client.get("/api/cart", headers=ctx.headers)
+
+    async def order_create(client, rng):
+        payload = {
+            "productos": [
+                {"sku": ctx.product_id(rng), "cantidad": 1, "precioUnitario": 10000}
+                for _ in range(3)
+            ],
+            "direccionEnvio": "Calle sintética 123 # 45-67",
+            "telefonoContacto": "3000000000",
+        }
+        return await client.post("/api/pedidos/", json=payload, headers=ctx.headers)
+
+    async def my_orders(client, rng):
+        return await client.get("/api/pedidos/mis-pedidos", headers=ctx.headers)
+
+    async def ratings_list(client, rng):
+        return await client.get(f"/api/calificaciones/producto/{ctx.product_id(rng)}")
+
+    return {
+        "catalog_browse": catalog_browse,
+        "product_detail": product_detail,
+        "cart_add": cart_add,
+        "cart_get": cart_get,
+        "order_create": order_create,
+        "my_orders": my_orders,
+        "ratings_list": ratings_list,
+    }
+
+
+async def run_scenario(app, name: str, request: Request, total: int, concurrency: int, warmup: int, seed: int) -> Dict:
+    """`total` requests from `concurrency` workers sharing one seeded RNG"""
+    rng = random.Random(f"{seed}:{name}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url=BASE_URL, timeout=60) as client:
+        for _ in range(warmup):
+            await request(client, rng)
+
+        latencies: List[float] = []
+        status_codes: Dict[str, int] = {}
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                response = await request(client, rng)
+                latencies.append((time.perf_counter() - start) * 1000)
+                key = str(response.status_code)
+                status_codes[key] = status_codes.get(key, 0) + 1
+
+        with count_queries(record_statements=False) as stats:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+    errors = sum(n for code, n in status_codes.items() if not code.startswith("2"))
+    return {
+        "scenario": name,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "status_codes": status_codes,
+        "throughput_rps": round(total / elapsed, 2),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "statements_per_request": round(stats.count / total, 2),
+        "db_ms_per_request": round(stats.total_ms / total, 3),
+    }
+
+
+def _git_sha() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """Print per-scenario deltas between two result files"""
+    before = {r["scenario"]: r for r in json.loads(Path(before_path).read_text())["results"]}
+    after = {r["scenario"]: r for r in json.loads(Path(after_path).read_text())["results"]}
+    metrics = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "statements_per_request")
+    print(f"{'scenario':<16}" + "".join(f"{m:>26}" for m in metrics))
+    for name in sorted(before.keys() & after.keys()):
+        cells = []
+        for m in metrics:
+            old, new = before[name][m], after[name][m]
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            cells.append(f"{old:>9} -> {new:<9} {change:>6}")
+        print(f"{name:<16}" + "".join(f"{c:>26}" for c in cells))
+
+
+async def _main(args) -> Dict:
+    from main import app  # after settings/env are loaded
+
+    size = DatasetSize(products=args.products, users=args.users, order_items=args.order_items, ratings=args.ratings)
+    rows = ensure_dataset(size, reseed=args.reseed)
+    ctx = BenchContext()
+    scenarios = build_scenarios(ctx)
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    unknown = set(selected) - scenarios.keys()
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = []
+    try:
+        for name in selected:
+            logger.info("Running %s", name)
+            results.append(await run_scenario(
+                app, name, scenarios[name], args.requests, args.concurrency, args.warmup, args.seed
+            ))
+    finally:
+        await close_async_db()
+
+    return {
+        "meta": {
+            "git_sha": _git_sha(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "dataset": {"size": asdict(size), "rows": rows},
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    defaults = DatasetSize()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenarios", default=None, help="Comma-separated subset (default: all)")
+    parser.add_argument("--products", type=int, default=defaults.products)
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--order-items", type=int, default=defaults.order_items)
+    parser.add_argument("--ratings", type=int, default=defaults.ratings)
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/<timestamp>-<sha>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Diff two result files and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = asyncio.run(_main(args))
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{report['meta']['git_sha'] or 'nogit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    print(json.dumps(report["results"], indent=2))
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
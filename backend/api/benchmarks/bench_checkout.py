@@ -0,0 +1,293 @@
+"""
+Load scenario: full checkout through the ASGI app with fake Stripe/RabbitMQ/SMTP
+
+Each virtual user loops over a complete checkout as a brand new customer:
+register -> verify email -> login -> cart add -> order create -> payment
+intent -> (Stripe.js confirms the card) -> confirm payment -> webhook.
+Stripe, the message broker and SMTP are replaced in-process by the fakes in
+benchmarks.fakes, with configurable latency and failure injection; the
+database is real (SQL Server, bench products from benchmarks.synthetic_data).
+
+The scenario runs once per concurrency level for --duration seconds. A level
+is "sustainable" when its checkout p95 stays under --slo-p95-ms and its error
+rate under --max-error-rate; the report gives the best sustainable orders/s
+and, per step, where the time went (DB from Server-Timing, time inside each
+fake, and the rest: Python, hashing, serialization, waiting on the loop).
+
+Usage (from backend/api, with DB_* env vars pointing at a disposable SQL Server database):
+    python -m benchmarks.bench_checkout --levels 1,2,4,8,16 --duration 20
+    python -m benchmarks.bench_checkout --stripe-latency-ms 400 --stripe-failure-rate 0.02 --broker-failure-rate 0.05
+
+Users are created under the load.bench.local domain; `python -m
+benchmarks.synthetic_data --drop` removes them with the rest of the bench rows.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.bench_api import BASE_URL, RESULTS_DIR, BenchContext, _git_sha, _percentile
+from benchmarks.fakes import FakeEmailService, FakeMessageBroker, FakeStripeService, Fault, install_fakes, track_time_spent
+from benchmarks.synthetic_data import LOAD_EMAIL_DOMAIN, DatasetSize, ensure_dataset
+from app.core.database import close_async_db
+
+logger = logging.getLogger(__name__)
+
+STEPS = (
+    "register", "verify_email", "login", "cart_add", "order_create",
+    "payment_intent", "confirm_payment", "webhook",
+)
+PASSWORD = "Bench-Checkout-2026!"
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+)(?:;desc="(\d+) queries")?')
+
+
+class CheckoutFailed(Exception):
+    def __init__(self, step: str, status_code: int):
+        super().__init__(f"{step}: HTTP {status_code}")
+        self.step = step
+        self.status_code = status_code
+
+
+class StepStats:
+    """Latency and time breakdown samples of one checkout step"""
+
+    def __init__(self):
+        self.latency_ms: List[float] = []
+        self.spent_ms: Dict[str, float] = {}
+        self.queries = 0
+
+    def add(self, latency_ms: float, db_ms: float, queries: int, fakes: Dict[str, float]) -> None:
+        self.latency_ms.append(latency_ms)
+        self.queries += queries
+        self.spent_ms["db"] = self.spent_ms.get("db", 0.0) + db_ms
+        for component, seconds in fakes.items():
+            self.spent_ms[component] = self.spent_ms.get(component, 0.0) + seconds * 1000
+
+    def summary(self) -> Dict:
+        n = len(self.latency_ms)
+        if not n:
+            return {"requests": 0}
+        total = sum(self.latency_ms)
+        spent = {k: round(v / n, 3) for k, v in sorted(self.spent_ms.items())}
+        spent["other"] = round((total - sum(self.spent_ms.values())) / n, 3)
+        return {
+            "requests": n,
+            "mean_ms": round(total / n, 3),
+            "p50_ms": round(_percentile(self.latency_ms, 50), 3),
+            "p95_ms": round(_percentile(self.latency_ms, 95), 3),
+            "p99_ms": round(_percentile(self.latency_ms, 99), 3),
+            "queries_per_request": round(self.queries / n, 2),
+            "mean_breakdown_ms": spent,
+        }
+
+
+class Checkout:
+    """One customer going through the whole flow"""
+
+    def __init__(self, client: httpx.AsyncClient, ctx: BenchContext, stripe: FakeStripeService,
+                 email: FakeEmailService, stats: Dict[str, StepStats], items: int, rng):
+        self.client = client
+        self.ctx = ctx
+        self.stripe = stripe
+        self.email = email
+        self.stats = stats
+        self.items = items
+        self.rng = rng
+        self.headers: Dict[str, str] = {}
+
+    async def _step(self, step: str, method: str, url: str, **kwargs) -> httpx.Response:
+        with track_time_spent() as fakes:
+            started = time.perf_counter()
+            response = await self.client.request(method, url, **kwargs)
+            latency_ms = (time.perf_counter() - started) * 1000
+        db_ms, queries = 0.0, 0
+        match = SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+        if match:
+            db_ms, queries = float(match.group(1)), int(match.group(2) or 0)
+        self.stats[step].add(latency_ms, db_ms, queries, fakes)
+        if response.status_code >= 400:
+            raise CheckoutFailed(step, response.status_code)
+        return response
+
+    async def run(self) -> None:
+        email = f"load-{uuid.uuid4().hex[:16]}@{LOAD_EMAIL_DOMAIN}"
+        await self._step("register", "POST", "/api/auth/register", json={
+            "email": email, "password": PASSWORD, "nombre": "Cliente Carga", "telefono": "3000000000",
+        })
+        await self._step("verify_email", "POST", "/api/auth/verify-email", json={
+            "email": email, "code": self.email.codes.pop(email.lower(), "000000"),
+        })
+        login = await self._step("login", "POST", "/api/auth/login", json={"email": email, "password": PASSWORD})
+        self.headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        producto_ids = [self.ctx.product_id(self.rng) for _ in range(self.items)]
+        for producto_id in producto_ids:
+            await self._step("cart_add", "POST", "/api/cart/add",
+                             json={"producto_id": producto_id, "cantidad": 1}, headers=self.headers)
+
+        pedido = (await self._step("order_create", "POST", "/api/pedidos/", headers=self.headers, json={
+            "productos": [{"sku": pid, "cantidad": 1, "precioUnitario": 25000} for pid in producto_ids],
+            "direccionEnvio": "Calle de carga 123 # 45-67",
+            "telefonoContacto": "3000000000",
+        })).json()
+
+        intent = (await self._step("payment_intent", "POST", "/api/pagos/create-payment-intent", headers=self.headers, json={
+            "pedido_id": pedido["id"], "amount": round(pedido["total"] * 100), "currency": "USD",
+        })).json()
+        self.stripe.complete_payment(intent["id"])
+
+        await self._step("confirm_payment", "POST", "/api/pagos/confirm-payment", headers=self.headers, json={
+            "payment_intent_id": intent["id"], "pedido_id": pedido["id"],
+        })
+        event = self.stripe.webhook_event(intent["id"])
+        await self._step("webhook", "POST", "/api/webhooks/stripe", content=json.dumps(event),
+                         headers={"stripe-signature": "t=0,v1=bench", "content-type": "application/json"})
+
+
+async def run_level(app, ctx: BenchContext, fakes: Dict, concurrency: int, duration: float, items: int, seed: int) -> Dict:
+    """Checkouts from `concurrency` virtual users for `duration` seconds"""
+    rng = random.Random(f"{seed}:{concurrency}")
+    stats = {step: StepStats() for step in STEPS}
+    checkout_ms: List[float] = []
+    failures: Dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=BASE_URL, timeout=120) as client:
+        async def virtual_user():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    await Checkout(client, ctx, fakes["stripe"], fakes["email"], stats, items, rng).run()
+                    checkout_ms.append((time.perf_counter() - started) * 1000)
+                except CheckoutFailed as e:
+                    key = f"{e.step}:{e.status_code}"
+                    failures[key] = failures.get(key, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    completed, failed = len(checkout_ms), sum(failures.values())
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "checkouts": completed,
+        "failed": failed,
+        "failures": failures,
+        "error_rate": round(failed / (completed + failed), 4) if completed + failed else 0.0,
+        "orders_per_second": round(completed / elapsed, 3),
+        "checkout_mean_ms": round(statistics.mean(checkout_ms), 3) if checkout_ms else None,
+        "checkout_p50_ms": round(_percentile(checkout_ms, 50), 3) if checkout_ms else None,
+        "checkout_p95_ms": round(_percentile(checkout_ms, 95), 3) if checkout_ms else None,
+        "checkout_p99_ms": round(_percentile(checkout_ms, 99), 3) if checkout_ms else None,
+        "steps": {step: stats[step].summary() for step in STEPS},
+    }
+
+
+def sustainable(levels: List[Dict], slo_p95_ms: float, max_error_rate: float) -> Optional[Dict]:
+    """Highest-throughput level that meets the SLO"""
+    ok = [
+        level for level in levels
+        if level["checkouts"] and level["checkout_p95_ms"] <= slo_p95_ms and level["error_rate"] <= max_error_rate
+    ]
+    return max(ok, key=lambda level: level["orders_per_second"], default=None)
+
+
+async def _main(args) -> Dict:
+    from main import app  # after settings/env are loaded
+
+    ensure_dataset(DatasetSize(products=args.products, users=args.users, order_items=args.order_items, ratings=args.ratings))
+    ctx = BenchContext()
+    fakes = {
+        "stripe": FakeStripeService(Fault(args.stripe_latency_ms, args.stripe_jitter_ms, args.stripe_failure_rate, args.seed)),
+        "broker": FakeMessageBroker(Fault(args.broker_latency_ms, args.broker_jitter_ms, args.broker_failure_rate, args.seed)),
+        "email": FakeEmailService(Fault(args.email_latency_ms, 0.0, 0.0, args.seed)),
+    }
+
+    levels = []
+    try:
+        with install_fakes(stripe=fakes["stripe"], broker=fakes["broker"], email=fakes["email"]):
+            for concurrency in (int(c) for c in args.levels.split(",")):
+                logger.info("Checkout load: %d virtual users for %ss", concurrency, args.duration)
+                level = await run_level(app, ctx, fakes, concurrency, args.duration, args.items, args.seed)
+                logger.info("  %.2f orders/s, p95 %s ms, error rate %.2f%%",
+                            level["orders_per_second"], level["checkout_p95_ms"], level["error_rate"] * 100)
+                levels.append(level)
+    finally:
+        await close_async_db()
+
+    best = sustainable(levels, args.slo_p95_ms, args.max_error_rate)
+    return {
+        "meta": {
+            "git_sha": _git_sha(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "duration_s": args.duration,
+            "items_per_order": args.items,
+            "slo": {"checkout_p95_ms": args.slo_p95_ms, "max_error_rate": args.max_error_rate},
+            "fakes": {
+                "stripe": {"latency_ms": args.stripe_latency_ms, "jitter_ms": args.stripe_jitter_ms,
+                           "failure_rate": args.stripe_failure_rate, "calls": dict(fakes["stripe"].calls)},
+                "broker": {"latency_ms": args.broker_latency_ms, "jitter_ms": args.broker_jitter_ms,
+                           "failure_rate": args.broker_failure_rate, "published": dict(fakes["broker"].published),
+                           "failed": dict(fakes["broker"].failed)},
+                "email": {"latency_ms": args.email_latency_ms},
+            },
+        },
+        "sustainable": {
+            "concurrency": best["concurrency"] if best else None,
+            "orders_per_second": best["orders_per_second"] if best else 0.0,
+        },
+        "levels": levels,
+    }
+
+
+def main() -> None:
+    defaults = DatasetSize()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,2,4,8,16", help="Comma-separated virtual user counts")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per level")
+    parser.add_argument("--items", type=int, default=2, help="Products per order")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--slo-p95-ms", type=float, default=3000.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--stripe-latency-ms", type=float, default=250.0)
+    parser.add_argument("--stripe-jitter-ms", type=float, default=80.0)
+    parser.add_argument("--stripe-failure-rate", type=float, default=0.0)
+    parser.add_argument("--broker-latency-ms", type=float, default=2.0)
+    parser.add_argument("--broker-jitter-ms", type=float, default=1.0)
+    parser.add_argument("--broker-failure-rate", type=float, default=0.0)
+    parser.add_argument("--email-latency-ms", type=float, default=0.0)
+    # Solo se usa si falta el dataset (o si su tamaño difiere)
+    parser.add_argument("--products", type=int, default=defaults.products)
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--order-items", type=int, default=defaults.order_items)
+    parser.add_argument("--ratings", type=int, default=defaults.ratings)
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/checkout-<timestamp>-<sha>.json)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    report = asyncio.run(_main(args))
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"checkout-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{report['meta']['git_sha'] or 'nogit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    print(json.dumps({"sustainable": report["sustainable"], "levels": [
+        {k: level[k] for k in ("concurrency", "orders_per_second", "checkout_p95_ms", "error_rate")}
+        for level in report["levels"]
+    ]}, indent=2))
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: enriched product listing page
+
+Compares the five-query path (list_products + categories + subcategories +
+images + ProductoStats) with the single-statement ProductRepository.list_product_cards.
+
+Usage (from backend/api, with DB_* env vars pointing at SQL Server):
+    python -m benchmarks.bench_product_cards --iterations 200 --limit 20
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, engine
+from app.application.services.product_service import ProductService
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def _run(name: str, fn: Callable[[], list], iterations: int, warmup: int) -> Dict:
+    statements = {"count": 0}
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements["count"] += 1
+
+    for _ in range(warmup):
+        fn()
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        samples = []
+        rows = 0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            rows = len(fn())
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    return {
+        "path": name,
+        "iterations": iterations,
+        "rows_per_page": rows,
+        "statements_per_page": statements["count"] / iterations,
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(_percentile(samples, 50), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--skip", type=int, default=0)
+    parser.add_argument("--categoria-id", type=int, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        service = ProductService(db)
+
+        def five_queries() -> list:
+            rows = service.repository.list_products(args.categoria_id, None, args.skip, args.limit)
+            products = [service.build_product_response(r) for r in rows]
+            products = service.enrich_products_with_relations(products)
+            return service.enrich_products_with_ratings(products)
+
+        def single_statement() -> list:
+            return service.list_product_cards(args.categoria_id, None, args.skip, args.limit)
+
+        results = [
+            _run("five_queries", five_queries, args.iterations, args.warmup),
+            _run("single_statement", single_statement, args.iterations, args.warmup),
+        ]
+    finally:
+        db.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+In-process stand-ins for Stripe, RabbitMQ and SMTP (load tests only)
+
+The fakes keep the public surface of the real singletons (`stripe_service`,
+`rabbitmq_producer`, `email_service`) so routers and services run unchanged,
+and add configurable latency and failure injection. Calls block the caller
+exactly like the real SDKs do (`time.sleep`), so event loop stalls caused by
+sync calls inside async routes show up in the numbers.
+
+    stripe = FakeStripeService(Fault(latency_ms=250, failure_rate=0.01))
+    with install_fakes(stripe=stripe, broker=FakeMessageBroker(Fault(latency_ms=3))):
+        ...  # drive `main.app`
+
+Time spent inside the fakes is added to the dict set with `track_time_spent`,
+keyed by component ("stripe", "rabbitmq", "email").
+"""
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+FAKE_ID_PREFIX = "bench"
+
+_time_spent: ContextVar[Optional[Dict[str, float]]] = ContextVar("fake_time_spent", default=None)
+
+
+@contextmanager
+def track_time_spent() -> Iterator[Dict[str, float]]:
+    """Collect seconds spent in the fakes by the code running inside the block"""
+    spent: Dict[str, float] = {}
+    token = _time_spent.set(spent)
+    try:
+        yield spent
+    finally:
+        _time_spent.reset(token)
+
+
+class InjectedFailure(ConnectionError):
+    """Raised by a fake when failure injection fires"""
+
+
+@dataclass
+class Fault:
+    """Latency (normal, clipped at 0) and failure rate of a fake dependency"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    failure_rate: float = 0.0
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def apply(self, component: str) -> None:
+        with self._lock:
+            delay = max(0.0, self._rng.gauss(self.latency_ms, self.jitter_ms)) / 1000 if self.jitter_ms else self.latency_ms / 1000
+            failed = self._rng.random() < self.failure_rate
+        if delay:
+            time.sleep(delay)
+        spent = _time_spent.get()
+        if spent is not None:
+            spent[component] = spent.get(component, 0.0) + delay
+        if failed:
+            raise InjectedFailure(f"{component}: falla inyectada")
+
+
+class FakeStripeService:
+    """Same methods and HTTPExceptions as StripeService; intents live in memory"""
+
+    def __init__(self, fault: Optional[Fault] = None):
+        self.fault = fault or Fault()
+        self.publishable_key = "pk_test_fake"
+        self.calls: Counter = Counter()
+        self._intents: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _call(self, op: str) -> None:
+        self.calls[op] += 1
+        try:
+            self.fault.apply("stripe")
+        except InjectedFailure:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Error en la pasarela de pago. Por favor, intente más tarde."
+            )
+
+    def _get(self, payment_intent_id: str) -> Dict[str, Any]:
+        intent = self._intents.get(payment_intent_id)
+        if intent is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payment intent not found")
+        return intent
+
+    def create_payment_intent(
+        self,
+        amount: float,
+        currency: str = "USD",
+        customer_email: str = "",
+        description: str = "",
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        if amount <= 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Amount must be greater than 0")
+        self._call("payment_intent_create")
+        intent_id = f"pi_{FAKE_ID_PREFIX}_{uuid.uuid4().hex[:24]}"
+        intent = {
+            "id": intent_id,
+            "client_secret": f"{intent_id}_secret_{uuid.uuid4().hex[:12]}",
+            "status": "requires_payment_method",
+            "amount": int(amount),
+            "currency": currency.lower(),
+            "metadata": dict(metadata or {}),
+        }
+        with self._lock:
+            self._intents[intent_id] = intent
+        return {**intent, "publishable_key": self.publishable_key}
+
+    def confirm_payment_intent(self, payment_intent_id: str) -> Dict[str, Any]:
+        self._call("payment_intent_retrieve")
+        intent = self._get(payment_intent_id)
+        return {k: intent[k] for k in ("id", "status", "amount", "currency", "client_secret")}
+
+    def get_payment_intent_status(self, payment_intent_id: str) -> Dict[str, Any]:
+        self._call("payment_intent_retrieve")
+        intent = self._get(payment_intent_id)
+        return {
+            "id": intent["id"],
+            "status": intent["status"],
+            "amount": intent["amount"],
+            "currency": intent["currency"],
+            "charges_count": 1 if intent["status"] == "succeeded" else 0,
+        }
+
+    def construct_webhook_event(self, body: bytes, sig_header: str, webhook_secret: str) -> Dict[str, Any]:
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid payload")
+
+    # Lo que haría Stripe.js / Stripe del lado del cliente
+
+    def complete_payment(self, payment_intent_id: str, succeed: bool = True) -> Dict[str, Any]:
+        """Simulate the browser confirming the card payment"""
+        intent = self._get(payment_intent_id)
+        intent["status"] = "succeeded" if succeed else "requires_payment_method"
+        return intent
+
+    def webhook_event(self, payment_intent_id: str, event_type: str = "payment_intent.succeeded") -> Dict[str, Any]:
+        """Event body Stripe would POST to /api/webhooks/stripe"""
+        intent = self._get(payment_intent_id)
+        return {
+            "id": f"evt_{FAKE_ID_PREFIX}_{uuid.uuid4().hex[:24]}",
+            "type": event_type,
+            "data": {"object": {k: intent[k] for k in ("id", "status", "amount", "currency", "metadata")}},
+        }
+
+
+class FakeMessageBroker:
+    """MessageBroker (plus the RabbitMQProducer extras the routers touch) that keeps messages in memory"""
+
+    def __init__(self, fault: Optional[Fault] = None, max_attempts: int = 3, keep_last: int = 1000):
+        self.fault = fault or Fault()
+        self.max_attempts = max_attempts
+        self.published: Counter = Counter()
+        self.failed: Counter = Counter()
+        self.messages: Deque[Tuple[str, Dict[str, Any]]] = deque(maxlen=keep_last)
+        self.connection = SimpleNamespace(is_closed=False)
+        self.channel = SimpleNamespace(is_closed=False)
+        self._declared_queues = set()
+
+    def connect(self) -> None:
+        self.connection.is_closed = False
+
+    def declare_queue(self, queue_name: str, durable: bool = True) -> None:
+        self._declared_queues.add(queue_name)
+
+    def publish(self, queue_name: str, message: Dict[str, Any], durable: bool = True, retry: bool = True) -> bool:
+        last_error = None
+        for _ in range(self.max_attempts if retry else 1):
+            try:
+                self.fault.apply("rabbitmq")
+            except InjectedFailure as e:
+                last_error = e
+                continue
+            self.published[queue_name] += 1
+            self.messages.append((queue_name, message))
+            return True
+        self.failed[queue_name] += 1
+        if not retry:
+            raise last_error
+        return False
+
+    def publish_many(self, queue_name: str, messages: List[Dict[str, Any]], durable: bool = True) -> int:
+        return sum(1 for message in messages if self.publish(queue_name, message, durable=durable))
+
+    def close(self) -> None:
+        # Las rutas cierran tras cada publish; la conexión falsa sigue "abierta"
+        pass
+
+
+class FakeEmailService:
+    """Captures verification codes instead of sending mail"""
+
+    def __init__(self, fault: Optional[Fault] = None):
+        self.fault = fault or Fault()
+        self.codes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _send_email(self, to_email: str, subject: str, html_content: str) -> bool:
+        self.fault.apply("email")
+        return True
+
+    def send_verification_code(self, to_email: str, code: str) -> bool:
+        with self._lock:
+            self.codes[to_email.lower()] = code
+        return self._send_email(to_email, "", "")
+
+    def send_welcome_email(self, to_email: str, nombre: str) -> bool:
+        return self._send_email(to_email, "", "")
+
+
+def _rebind(original: Any, replacement: Any) -> list:
+    """Point every `app.*` / `main` module global bound to `original` at `replacement`"""
+    swapped = []
+    for name, module in list(sys.modules.items()):
+        if module is None or not (name == "main" or name.startswith("app.")):
+            continue
+        for attr, value in list(vars(module).items()):
+            if value is original:
+                setattr(module, attr, replacement)
+                swapped.append((module, attr))
+    return swapped
+
+
+@contextmanager
+def install_fakes(stripe=None, broker=None, email=None):
+    """
+    Swap the real singletons for fakes in all loaded app modules.
+    Import `main` (or the routers) before entering so every reference is found.
+    """
+    from app.application.services.stripe_service import stripe_service
+    from app.infrastructure.external.email_service import email_service
+    from app.infrastructure.external.rabbitmq import rabbitmq_producer
+
+    swapped = []
+    try:
+        for original, fake in ((stripe_service, stripe), (rabbitmq_producer, broker), (email_service, email)):
+            if fake is not None:
+                swapped.extend((module, attr, original) for module, attr in _rebind(original, fake))
+        yield
+    finally:
+        for module, attr, original in swapped:
+            setattr(module, attr, original)
@@ -0,0 +1,188 @@
+"""
+Concurrency stress test for StockRepository.reserve_items (no overselling)
+
+Creates a few bench products with a small stock, then runs many threads that
+each reserve random multi-line orders against them in their own sessions
+and transactions, until demand far exceeds supply. Afterwards, for every
+product, the stock left plus the units reserved by committed orders must
+equal the initial stock. Stock must never go below zero, and each order is
+either fully reserved or not reserved at all.
+
+Usage (from backend/api, with DB_* env vars pointing at a disposable SQL Server database):
+    python -m benchmarks.stress_stock --threads 15 --orders 200 --products 5 --stock 50
+
+Exit status is 1 if any invariant is violated. Products are created under the
+bench prefix and deleted at the end (`python -m benchmarks.synthetic_data --drop`
+also removes leftovers).
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.database import SessionLocal, engine
+from app.infrastructure.repositories.sql_helpers import id_list_param, in_id_list
+from app.infrastructure.repositories.stock_repository import InsufficientStockError, StockRepository
+from benchmarks.synthetic_data import BENCH_PREFIX
+
+logger = logging.getLogger(__name__)
+
+STRESS_NAME = f"{BENCH_PREFIX} stress stock"
+
+
+def create_products(count: int, stock: int) -> List[int]:
+    with engine.begin() as conn:
+        categoria_id = conn.execute(text(
+            "INSERT INTO Categorias (nombre, descripcion, activo) OUTPUT inserted.id VALUES (:n, N'Stress', 1)"
+        ), {"n": STRESS_NAME}).scalar_one()
+        subcategoria_id = conn.execute(text(
+            "INSERT INTO Subcategorias (categoria_id, nombre, activo) OUTPUT inserted.id VALUES (:c, :n, 1)"
+        ), {"c": categoria_id, "n": STRESS_NAME}).scalar_one()
+        return [
+            conn.execute(text("""
+                INSERT INTO Productos (nombre, precio, peso_gramos, cantidad_disponible, categoria_id, subcategoria_id, activo)
+                OUTPUT inserted.id
+                VALUES (:n, 1000, 100, :stock, :c, :s, 1)
+            """), {"n": f"{STRESS_NAME} {i}", "stock": stock, "c": categoria_id, "s": subcategoria_id}).scalar_one()
+            for i in range(count)
+        ]
+
+
+def read_stock(producto_ids: List[int]) -> Dict[int, int]:
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(f"SELECT id, cantidad_disponible FROM Productos WHERE {in_id_list('id')}"),
+            {"ids": id_list_param(producto_ids)}
+        ).fetchall()
+    return {row.id: row.cantidad_disponible for row in rows}
+
+
+def drop_products() -> None:
+    with engine.begin() as conn:
+        for sql in (
+            "DELETE FROM Productos WHERE nombre LIKE :prefix",
+            "DELETE FROM Subcategorias WHERE nombre = :name",
+            "DELETE FROM Categorias WHERE nombre = :name",
+        ):
+            conn.execute(text(sql), {"prefix": f"{STRESS_NAME} %", "name": STRESS_NAME})
+
+
+class Worker(threading.Thread):
+    def __init__(self, producto_ids: List[int], orders: int, max_lines: int, max_qty: int, seed: int,
+                 start_gate: threading.Event):
+        super().__init__(daemon=True)
+        self.producto_ids = producto_ids
+        self.orders = orders
+        self.max_lines = max_lines
+        self.max_qty = max_qty
+        self.rng = random.Random(seed)
+        self.start_gate = start_gate
+        self.reserved: Counter = Counter()
+        self.outcomes: Counter = Counter()
+        self.violations: List[str] = []
+
+    def run(self) -> None:
+        self.start_gate.wait()
+        for _ in range(self.orders):
+            lines = [
+                (pid, self.rng.randint(1, self.max_qty))
+                for pid in self.rng.sample(self.producto_ids, self.rng.randint(1, self.max_lines))
+            ]
+            db = SessionLocal()
+            try:
+                restante = StockRepository(db).reserve_items(lines)
+                db.commit()
+            except InsufficientStockError:
+                db.rollback()
+                self.outcomes["rejected"] += 1
+                continue
+            except DBAPIError as e:
+                db.rollback()
+                # 1205 = deadlock victim; the order is simply not placed
+                self.outcomes["deadlock" if "1205" in str(e.orig) else "error"] += 1
+                continue
+            finally:
+                db.close()
+
+            self.outcomes["reserved"] += 1
+            if set(restante) != {pid for pid, _ in lines}:
+                self.violations.append(f"partial reservation: asked {lines}, got {restante}")
+            for pid, cantidad in lines:
+                self.reserved[pid] += cantidad
+                if restante.get(pid, 0) < 0:
+                    self.violations.append(f"negative stock for {pid}: {restante[pid]}")
+
+
+def run(threads: int, orders: int, products: int, stock: int, max_lines: int, max_qty: int, seed: int) -> Dict:
+    drop_products()
+    producto_ids = create_products(products, stock)
+    try:
+        gate = threading.Event()
+        workers = [
+            Worker(producto_ids, orders, min(max_lines, products), max_qty, seed + n, gate)
+            for n in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        started = time.perf_counter()
+        gate.set()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        final = read_stock(producto_ids)
+        reserved: Counter = Counter()
+        outcomes: Counter = Counter()
+        violations: List[str] = []
+        for worker in workers:
+            reserved.update(worker.reserved)
+            outcomes.update(worker.outcomes)
+            violations.extend(worker.violations)
+        for pid in producto_ids:
+            if final[pid] < 0:
+                violations.append(f"product {pid} oversold: stock {final[pid]}")
+            if final[pid] + reserved[pid] != stock:
+                violations.append(
+                    f"product {pid}: initial {stock} != left {final[pid]} + reserved {reserved[pid]}"
+                )
+
+        return {
+            "threads": threads,
+            "orders_attempted": threads * orders,
+            "outcomes": dict(outcomes),
+            "orders_per_s": round(threads * orders / elapsed, 1),
+            "stock": {str(pid): {"initial": stock, "reserved": reserved[pid], "left": final[pid]} for pid in producto_ids},
+            "violations": violations,
+        }
+    finally:
+        drop_products()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    # Default pool: 5 + 10 overflow; more threads just queue for a connection
+    parser.add_argument("--threads", type=int, default=15)
+    parser.add_argument("--orders", type=int, default=200, help="Orders per thread")
+    parser.add_argument("--products", type=int, default=5)
+    parser.add_argument("--stock", type=int, default=50, help="Initial stock per product")
+    parser.add_argument("--max-lines", type=int, default=3, help="Max products per order")
+    parser.add_argument("--max-qty", type=int, default=3, help="Max units per line")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    result = run(args.threads, args.orders, args.products, args.stock, args.max_lines, args.max_qty, args.seed)
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if result["violations"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Synthetic catalog/orders dataset for the API benchmarks
+
+Rows are generated set-based in SQL Server from row numbers, so the same
+sizes always produce the same data (names, prices, which products each order
+and rating points to). All rows are tagged with the "Bench" prefix / bench
+email domain so they can be detected, and removed with --drop.
+
+Usage (from backend/api, with DB_* env vars pointing at a disposable database):
+    python -m benchmarks.synthetic_data --products 100000 --order-items 1000000 --ratings 200000
+    python -m benchmarks.synthetic_data --drop
+"""
+import argparse
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+BENCH_PREFIX = "Bench"
+BENCH_EMAIL_DOMAIN = "bench.local"
+BENCH_USER_EMAIL = f"bench-user-0@{BENCH_EMAIL_DOMAIN}"
+# Users registered by load scenarios; not part of the seeded dataset but removed by --drop
+LOAD_EMAIL_DOMAIN = f"load.{BENCH_EMAIL_DOMAIN}"
+CHUNK_ROWS = 200_000
+
+# Row numbers 0..:count-1 shifted by :start (enough rows for tens of millions)
+NUMBERS_CTE = """
+    WITH n AS (
+        SELECT TOP (:count) CAST(:start + ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1 AS BIGINT) AS i
+        FROM sys.all_objects a CROSS JOIN sys.all_objects b CROSS JOIN sys.all_objects c
+    )
+"""
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    categories: int = 20
+    subcategories_per_category: int = 10
+    products: int = 100_000
+    users: int = 20_000
+    order_items: int = 1_000_000
+    items_per_order: int = 4
+    ratings: int = 200_000
+
+    @property
+    def subcategories(self) -> int:
+        return self.categories * self.subcategories_per_category
+
+    @property
+    def orders(self) -> int:
+        return self.order_items // self.items_per_order
+
+
+def _insert_numbered(conn: Connection, sql: str, total: int, params: dict = None) -> None:
+    """Run an INSERT ... SELECT over NUMBERS_CTE in chunks of CHUNK_ROWS"""
+    for start in range(0, total, CHUNK_ROWS):
+        conn.execute(text(NUMBERS_CTE + sql), {"start": start, "count": min(CHUNK_ROWS, total - start), **(params or {})})
+
+
+def existing_size(conn: Connection) -> dict:
+    row = conn.execute(text("""
+        SELECT
+            (SELECT COUNT(*) FROM Productos WHERE nombre LIKE :prefix) AS products,
+            (SELECT COUNT(*) FROM Usuarios WHERE email LIKE :email) AS users,
+            (SELECT COUNT(*) FROM Pedidos p JOIN Usuarios u ON u.id = p.usuario_id WHERE u.email LIKE :email) AS orders,
+            (SELECT COUNT(*) FROM Calificaciones c JOIN Usuarios u ON u.id = c.usuario_id WHERE u.email LIKE :email) AS ratings
+    """), {"prefix": f"{BENCH_PREFIX} %", "email": f"%@{BENCH_EMAIL_DOMAIN}"}).first()
+    return dict(row._mapping)
+
+
+def drop(conn: Connection) -> None:
+    """Delete every bench row (children first)"""
+    params = {"prefix": f"{BENCH_PREFIX} %", "email": f"%{BENCH_EMAIL_DOMAIN}"}
+    bench_users = "SELECT id FROM Usuarios WHERE email LIKE :email"
+    bench_products = "SELECT id FROM Productos WHERE nombre LIKE :prefix"
+    for sql in (
+        f"DELETE FROM Calificaciones WHERE usuario_id IN ({bench_users}) OR producto_id IN ({bench_products})",
+        f"DELETE FROM ProductoStats WHERE producto_id IN ({bench_products})",
+        f"DELETE FROM CartItems WHERE producto_id IN ({bench_products})",
+        f"DELETE FROM Carts WHERE usuario_id IN ({bench_users})",
+        f"DELETE FROM PedidoItems WHERE pedido_id IN (SELECT id FROM Pedidos WHERE usuario_id IN ({bench_users}))",
+        f"DELETE FROM PedidoItems WHERE producto_id IN ({bench_products})",
+        f"DELETE FROM PedidosHistorialEstado WHERE pedido_id IN (SELECT id FROM Pedidos WHERE usuario_id IN ({bench_users}))",
+        f"DELETE FROM Pedidos WHERE usuario_id IN ({bench_users})",
+        f"DELETE FROM ProductoImagenes WHERE producto_id IN ({bench_products})",
+        "DELETE FROM Productos WHERE nombre LIKE :prefix",
+        "DELETE FROM Subcategorias WHERE nombre LIKE :prefix",
+        "DELETE FROM Categorias WHERE nombre LIKE :prefix",
+        "DELETE FROM EventoWebhookStripe WHERE event_id LIKE 'evt[_]bench[_]%'",
+        "DELETE FROM Usuarios WHERE email LIKE :email",
+    ):
+        conn.execute(text(sql), params)
+
+
+def seed(conn: Connection, size: DatasetSize) -> None:
+    """Insert the dataset; expects no bench rows (see `drop`)"""
+    prefix = {"prefix": f"{BENCH_PREFIX} %"}
+    steps = []
+
+    def step(name):
+        steps.append((name, time.perf_counter()))
+        logger.info("Seeding %s", name)
+
+    step("categorias")
+    _insert_numbered(conn, """
+        INSERT INTO Categorias (nombre, descripcion, activo)
+        SELECT CONCAT(N'Bench categoria ', i), N'Categoría sintética', 1 FROM n
+    """, size.categories)
+
+    step("subcategorias")
+    _insert_numbered(conn, """
+        , c AS (SELECT id, ROW_NUMBER() OVER (ORDER BY id) - 1 AS rk FROM Categorias WHERE nombre LIKE :prefix)
+        INSERT INTO Subcategorias (categoria_id, nombre, activo)
+        SELECT c.id, CONCAT(N'Bench subcategoria ', n.i), 1
+        FROM n JOIN c ON c.rk = n.i / :per_category
+    """, size.subcategories, {**prefix, "per_category": size.subcategories_per_category})
+
+    step("productos")
+    _insert_numbered(conn, """
+        , s AS (SELECT id, categoria_id, ROW_NUMBER() OVER (ORDER BY id) - 1 AS rk FROM Subcategorias WHERE nombre LIKE :prefix)
+        INSERT INTO Productos (nombre, descripcion, precio, peso_gramos, cantidad_disponible, categoria_id, subcategoria_id, activo, fecha_creacion)
+        SELECT
+            CONCAT(N'Bench producto ', n.i, CASE n.i % 4 WHEN 0 THEN N' perro' WHEN 1 THEN N' gato' WHEN 2 THEN N' cachorro' ELSE N' adulto' END),
+            CONCAT(N'Alimento sintético número ', n.i, N' para mascotas'),
+            1000 + (n.i * 7919) % 300000,
+            100 + (n.i * 31) % 20000,
+            1000000,
+            s.categoria_id, s.id, 1,
+            DATEADD(SECOND, -CAST(n.i AS INT), '2026-01-01')
+        FROM n JOIN s ON s.rk = n.i % :subcategories
+    """, size.products, {**prefix, "subcategories": size.subcategories})
+
+    # Rank -> id lookups so children can point at deterministic parents
+    conn.execute(text("""
+        IF OBJECT_ID('tempdb..#bench_products') IS NOT NULL DROP TABLE #bench_products;
+        SELECT ROW_NUMBER() OVER (ORDER BY id) - 1 AS rk, id, precio
+        INTO #bench_products FROM Productos WHERE nombre LIKE :prefix;
+        CREATE UNIQUE CLUSTERED INDEX ix_rk ON #bench_products (rk);
+    """), prefix)
+
+    step("imagenes")
+    _insert_numbered(conn, """
+        INSERT INTO ProductoImagenes (producto_id, ruta_imagen, es_principal, orden)
+        SELECT p.id, CONCAT(N'/app/uploads/bench/', n.i, N'.webp'), 1, 0
+        FROM n JOIN #bench_products p ON p.rk = n.i
+    """, size.products)
+
+    step("usuarios")
+    _insert_numbered(conn, """
+        INSERT INTO Usuarios (nombre_completo, email, cedula, password_hash, es_admin, is_active, telefono)
+        SELECT CONCAT(N'Bench usuario ', i), CONCAT(N'bench-user-', i, N'@', :domain), CONCAT(N'B', i),
+               N'!', 0, 1, N'3000000000'
+        FROM n
+    """, size.users, {"domain": BENCH_EMAIL_DOMAIN})
+    conn.execute(text("""
+        IF OBJECT_ID('tempdb..#bench_users') IS NOT NULL DROP TABLE #bench_users;
+        SELECT ROW_NUMBER() OVER (ORDER BY id) - 1 AS rk, id
+        INTO #bench_users FROM Usuarios WHERE email LIKE :email;
+        CREATE UNIQUE CLUSTERED INDEX ix_rk ON #bench_users (rk);
+    """), {"email": f"%@{BENCH_EMAIL_DOMAIN}"})
+
+    step("pedidos")
+    _insert_numbered(conn, """
+        INSERT INTO Pedidos (usuario_id, estado, estado_pago, total, subtotal, costo_envio, metodo_pago,
+                             direccion_entrega, pais, telefono_contacto, fecha_creacion)
+        SELECT u.id,
+               CASE n.i % 10 WHEN 0 THEN N'Cancelado' WHEN 1 THEN N'Pendiente' WHEN 2 THEN N'Enviado' ELSE N'Entregado' END,
+               CASE n.i % 10 WHEN 1 THEN 'Pendiente de Pago' ELSE 'Pagado' END,
+               0, 0, 0, N'Efectivo', N'Calle sintética 123 # 45-67', N'Colombia', N'3000000000',
+               DATEADD(MINUTE, -CAST(n.i AS INT), '2026-01-01')
+        FROM n JOIN #bench_users u ON u.rk = n.i % :users
+    """, size.orders, {"users": size.users})
+    conn.execute(text("""
+        IF OBJECT_ID('tempdb..#bench_orders') IS NOT NULL DROP TABLE #bench_orders;
+        SELECT ROW_NUMBER() OVER (ORDER BY p.id) - 1 AS rk, p.id
+        INTO #bench_orders FROM Pedidos p JOIN #bench_users u ON u.id = p.usuario_id;
+        CREATE UNIQUE CLUSTERED INDEX ix_rk ON #bench_orders (rk);
+    """))
+
+    step("pedido_items")
+    _insert_numbered(conn, """
+        INSERT INTO PedidoItems (pedido_id, producto_id, cantidad, precio_unitario)
+        SELECT o.id, p.id, 1 + n.i % 3, p.precio
+        FROM n
+        JOIN #bench_orders o ON o.rk = n.i / :per_order
+        JOIN #bench_products p ON p.rk = (n.i * 7919) % :products
+    """, size.orders * size.items_per_order, {"per_order": size.items_per_order, "products": size.products})
+    conn.execute(text("""
+        UPDATE pe SET subtotal = t.total, total = t.total
+        FROM Pedidos pe
+        JOIN (SELECT pi.pedido_id, SUM(pi.cantidad * pi.precio_unitario) AS total
+              FROM PedidoItems pi JOIN #bench_orders o ON o.id = pi.pedido_id
+              GROUP BY pi.pedido_id) t ON t.pedido_id = pe.id
+    """))
+
+    step("calificaciones")
+    _insert_numbered(conn, """
+        INSERT INTO Calificaciones (producto_id, usuario_id, puntuacion, comentario, aprobado, visible)
+        SELECT p.id, u.id, 1 + (n.i * 13) % 5, CONCAT(N'Comentario sintético ', n.i), 1, 1
+        FROM n
+        JOIN #bench_products p ON p.rk = (n.i * 31) % :products
+        JOIN #bench_users u ON u.rk = n.i % :users
+    """, size.ratings, {"products": size.products, "users": size.users})
+
+    step("producto_stats")
+    conn.execute(text("""
+        INSERT INTO ProductoStats (producto_id, promedio_calificacion, total_calificaciones,
+                                   total_5_estrellas, total_4_estrellas, total_3_estrellas, total_2_estrellas, total_1_estrella)
+        SELECT c.producto_id, AVG(CAST(c.puntuacion AS DECIMAL(5, 2))), COUNT(*),
+               SUM(CASE WHEN c.puntuacion = 5 THEN 1 ELSE 0 END), SUM(CASE WHEN c.puntuacion = 4 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN c.puntuacion = 3 THEN 1 ELSE 0 END), SUM(CASE WHEN c.puntuacion = 2 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN c.puntuacion = 1 THEN 1 ELSE 0 END)
+        FROM Calificaciones c JOIN #bench_products p ON p.id = c.producto_id
+        GROUP BY c.producto_id
+    """))
+    step("done")
+
+    for (name, started), (_, ended) in zip(steps, steps[1:]):
+        logger.info("  %-16s %.1fs", name, ended - started)
+
+
+def ensure_dataset(size: DatasetSize, reseed: bool = False) -> dict:
+    """Seed `size` unless a bench dataset of that size already exists"""
+    with engine.begin() as conn:
+        current = existing_size(conn)
+        wanted = {"products": size.products, "users": size.users, "orders": size.orders, "ratings": size.ratings}
+        # Los benchmarks crean pedidos sobre el dataset; solo cuentan los que faltan
+        present = {**current, "orders": min(current["orders"], wanted["orders"])}
+        if present == wanted and not reseed:
+            logger.info("Bench dataset already present: %s", current)
+            return current
+        if any(current.values()):
+            logger.info("Dropping bench dataset %s", current)
+            drop(conn)
+        seed(conn, size)
+        return existing_size(conn)
+
+
+def main() -> None:
+    defaults = DatasetSize()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=defaults.products)
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--order-items", type=int, default=defaults.order_items)
+    parser.add_argument("--ratings", type=int, default=defaults.ratings)
+    parser.add_argument("--reseed", action="store_true", help="Drop and seed again even if the sizes match")
+    parser.add_argument("--drop", action="store_true", help="Only delete the bench rows")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.drop:
+        with engine.begin() as conn:
+            drop(conn)
+        return
+
+    size = DatasetSize(products=args.products, users=args.users, order_items=args.order_items, ratings=args.ratings)
+    print(json.dumps({"size": asdict(size), "rows": ensure_dataset(size, reseed=args.reseed)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
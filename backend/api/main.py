@@ -8,14 +8,19 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Depends
+from fastapi.responses import PlainTextResponse
 from fastapi.routing import APIRouter
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
-from app.core.database import init_db, close_db, get_db
+from app.core.database import init_db, close_db, close_async_db, get_db, engine
 from app.presentation.middleware.error_handler import setup_error_handlers
+from app.presentation.middleware.loop_monitor import LoopMonitorMiddleware
+from app.presentation.middleware.metrics import MetricsMiddleware
+from app.presentation.middleware.query_stats import QueryStatsMiddleware
+from app.infrastructure.monitoring import event_loop_monitor, metrics_registry, instrument_engine
 from app.infrastructure.external.rabbitmq import rabbitmq_producer
 
 # Configure logging
@@ -37,6 +42,7 @@ from app.presentation.routers import (
 )
 from app.presentation.routers import public_orders
 from app.presentation.routers import addresses_router
+from app.presentation.routers import monitoring_router
 
 # Optional file logging if BACKEND_LOG_FILE or APP_LOG_FILE is set
 _log_file = os.getenv("BACKEND_LOG_FILE") or os.getenv("APP_LOG_FILE")
@@ -91,13 +97,29 @@ async def lifespan(app: FastAPI):
         print(f"Warning: Could not initialize database connection: {str(e)}")
         print("Application will continue without database connection")
         # Don't raise - allow app to start for development
+
+    # Índice de sugerencias (typeahead) en segundo plano
+    from app.application.services.search_service import product_suggestion_service
+    product_suggestion_service.start()
+
+    # Liberación de reservas de stock vencidas
+    from app.application.services.stock_hold_sweeper import stock_hold_sweeper
+    if settings.STOCK_HOLD_TTL_SECONDS > 0:
+        stock_hold_sweeper.start()
+
+    if settings.LOOP_MONITOR_ENABLED:
+        event_loop_monitor.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down API")
+    await product_suggestion_service.stop()
+    await stock_hold_sweeper.stop()
+    await event_loop_monitor.stop()
     try:
         close_db()
+        await close_async_db()
         logger.info("Database connections closed")
     except Exception as e:
         logger.error(f"Error closing database: {str(e)}")
@@ -152,6 +174,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
 # Middleware para hosts de confianza
@@ -160,6 +183,19 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
+# Atribución de bloqueos del event loop por ruta (opt-in)
+if settings.LOOP_MONITOR_ENABLED:
+    app.add_middleware(LoopMonitorMiddleware, monitor=event_loop_monitor)
+
+# Métricas Prometheus por ruta (latencia, estado, en curso)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+
+# Consultas SQL y tiempo de BD por request (Server-Timing, presupuesto)
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
 # Setup error handlers
 setup_error_handlers(app)
 
@@ -169,6 +205,14 @@ setup_error_handlers(app)
 def health():
     return {"status": "ok"}
 
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (text exposition format)"""
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("", status_code=404)
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Minimal admin read-only endpoints for tests
 from sqlalchemy.orm import Session
 from app.domain.models import Usuario
@@ -211,6 +255,7 @@ app.include_router(home_products_router, tags=["home-products"])
 app.include_router(ratings_public_router, tags=["ratings"])
 app.include_router(ratings_admin_router, tags=["admin-ratings"])
 app.include_router(addresses_router, tags=["user-addresses"])
+app.include_router(monitoring_router, tags=["monitoring"])
 app.include_router(payments_router, tags=["payments"])
 app.include_router(webhooks_router, tags=["webhooks"])
 
@@ -963,6 +963,41 @@ def test_product_low_stock(test_db: Session):
     )
 
 
+@pytest.fixture(scope="function")
+def query_budget():
+    """
+    Fails the test if any request exceeds the query budget declared on its
+    route (`query_budget` dependency). The fixture value also limits a block:
+
+        with query_budget(3):
+            client.get("/api/home/productos")
+    """
+    from contextlib import contextmanager
+    from app.infrastructure.monitoring.query_stats import count_queries
+    from app.presentation.middleware.query_stats import add_request_listener, remove_request_listener
+
+    violations = []
+
+    def _check(stats):
+        if stats.over_budget():
+            violations.append(f"{stats.route}: {stats.count} consultas (presupuesto {stats.budget})")
+
+    @contextmanager
+    def _limit(max_queries: int):
+        with count_queries() as stats:
+            yield stats
+        if stats.count > max_queries:
+            pytest.fail(
+                f"{stats.count} consultas SQL (máximo {max_queries}):\n" + "\n".join(stats.statements or [])
+            )
+
+    add_request_listener(_check)
+    yield _limit
+    remove_request_listener(_check)
+    if violations:
+        pytest.fail("Presupuesto de consultas excedido:\n" + "\n".join(violations))
+
+
 @pytest.fixture(scope="function")
 def capture_logs(caplog):
     """
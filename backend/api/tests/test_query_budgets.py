@@ -0,0 +1,95 @@
+"""
+Tests de presupuesto de consultas en listados
+Una ruta que ejecuta más sentencias de las declaradas con `query_budget`
+hace fallar el test (fixture `query_budget` de conftest)
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Añadir directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from main import app
+from app.application.services import order_serializer as order_serializer_module
+from app.core.database import Base, get_db
+from app.domain.models import Pedido, Usuario
+
+NUM_PEDIDOS = 5
+
+
+def _sqlite_in_id_list(column: str, param: str = "ids") -> str:
+    """OPENJSON es de SQL Server; en SQLite la misma lista se lee con json_each"""
+    return f"{column} IN (SELECT CAST(value AS INT) FROM json_each(:{param}))"
+
+
+@pytest.fixture(scope="function")
+def orders_client(monkeypatch):
+    """TestClient con una BD SQLite compartida entre hilos y varios pedidos de varios usuarios"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    ahora = datetime.utcnow()
+    usuarios = []
+    for i in range(NUM_PEDIDOS):
+        usuario = Usuario(
+            email=f"cliente{i}@example.com",
+            nombre_completo=f"Cliente {i}",
+            cedula=f"1000{i}",
+            password_hash="hashed_password_123",
+            es_admin=False,
+            is_active=True,
+            fecha_registro=ahora,
+            created_at=ahora,
+            updated_at=ahora,
+        )
+        db.add(usuario)
+        usuarios.append(usuario)
+    db.flush()
+    for i, usuario in enumerate(usuarios):
+        db.add(Pedido(
+            usuario_id=usuario.id,
+            estado="Pendiente",
+            estado_pago="Pendiente de Pago",
+            total=10000 + i,
+            metodo_pago="Efectivo",
+            direccion_entrega="Calle 1",
+            municipio="Bogotá",
+            departamento="Cundinamarca",
+            pais="Colombia",
+            telefono_contacto="3000000000",
+            fecha_creacion=ahora - timedelta(minutes=i),
+        ))
+    db.commit()
+
+    monkeypatch.setattr(order_serializer_module, "in_id_list", _sqlite_in_id_list)
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    db.close()
+    engine.dispose()
+
+
+@pytest.mark.integration
+@pytest.mark.orders
+class TestListingQueryBudgets:
+    """El listado de pedidos no debe crecer en consultas con el tamaño de la página"""
+
+    def test_listado_admin_de_pedidos(self, orders_client, query_budget):
+        """Una página de pedidos de varios clientes respeta el presupuesto de la ruta"""
+        response = orders_client.get("/api/admin/pedidos/", params={"limit": NUM_PEDIDOS})
+        assert response.status_code == 200
+        assert len(response.json()) == NUM_PEDIDOS
+        assert {p["clienteNombre"] for p in response.json()} == {f"Cliente {i}" for i in range(NUM_PEDIDOS)}
+
@@ -0,0 +1,134 @@
+"""
+Pruebas unitarias para el snapshot en memoria del árbol de categorías
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.application.services.category_tree_service import CategoryTreeService
+
+
+def make_db(state):
+    """Sesión mock que responde según el SQL ejecutado"""
+    db = Mock(spec=Session)
+
+    def execute(query, params=None):
+        sql = str(query)
+        result = Mock()
+        if "CHECKSUM_AGG" in sql:
+            state["fingerprint_calls"] += 1
+            result.first.return_value = SimpleNamespace(
+                cat_count=len(state["cats"]), cat_checksum=state["checksum"],
+                sub_count=len(state["subs"]), sub_checksum=state["checksum"]
+            )
+        elif "FROM Categorias" in sql:
+            state["loads"] += 1
+            result.fetchall.return_value = state["cats"]
+        else:
+            result.fetchall.return_value = state["subs"]
+        return result
+
+    db.execute.side_effect = execute
+    return db
+
+
+@pytest.fixture
+def state():
+    now = datetime(2025, 1, 1)
+    return {
+        "checksum": 1,
+        "loads": 0,
+        "fingerprint_calls": 0,
+        "cats": [
+            SimpleNamespace(id=1, nombre="Perros", descripcion=None, activo=True, fecha_creacion=now, fecha_actualizacion=now),
+            SimpleNamespace(id=2, nombre="Gatos", descripcion="Felinos", activo=False, fecha_creacion=now, fecha_actualizacion=None),
+        ],
+        "subs": [
+            SimpleNamespace(id=10, categoria_id=1, nombre="Alimento", activo=True, fecha_creacion=now),
+        ],
+    }
+
+
+@pytest.mark.unit
+class TestCategoryTreeService:
+    """Pruebas de carga, verificación de versión y consultas en memoria"""
+
+    def test_snapshot_serves_lookups_without_reloading(self, state):
+        """Mientras la huella no cambie no se recarga el árbol"""
+        service = CategoryTreeService()
+        db = make_db(state)
+        tree = service.get_tree(db)
+        assert [c.nombre for c in tree.admin_response] == ["Perros", "Gatos"]
+        assert [c["nombre"] for c in tree.public_response] == ["Perros"]
+        assert service.resolve_categoria_id(db, "  perros ") == 1
+        assert service.resolve_subcategoria_id(db, 10) == 10
+        assert state["loads"] == 1
+
+    def test_invalidate_reloads_when_fingerprint_changes(self, state):
+        """Tras publicar un cambio, la siguiente consulta detecta la nueva versión"""
+        service = CategoryTreeService()
+        db = make_db(state)
+        first = service.get_tree(db)
+        state["cats"].append(SimpleNamespace(id=3, nombre="Aves", descripcion=None, activo=True,
+                                             fecha_creacion=None, fecha_actualizacion=None))
+        state["checksum"] = 2
+        service.invalidate()
+        second = service.get_tree(db)
+        assert second.version == first.version + 1
+        assert service.get_categoria(db, 3).nombre == "Aves"
+
+    def test_name_resolution_folds_accents_and_scopes_by_category(self, state):
+        """Nombres sin tildes/mayúsculas resuelven al id, priorizando la categoría"""
+        state["subs"].append(SimpleNamespace(id=11, categoria_id=2, nombre="Alimento Húmedo", activo=True, fecha_creacion=None))
+        state["subs"].append(SimpleNamespace(id=12, categoria_id=1, nombre="Alimento  HUMEDO", activo=True, fecha_creacion=None))
+        service = CategoryTreeService()
+        db = make_db(state)
+        assert service.resolve_subcategoria_id(db, "alimento humedo") == 11
+        assert service.resolve_subcategoria_id(db, "alimento humedo", categoria_id=1) == 12
+
+    def test_unknown_id_returns_none(self, state):
+        """Un id inexistente devuelve None desde el snapshot, sin otra consulta de huella"""
+        service = CategoryTreeService()
+        db = make_db(state)
+        assert service.get_subcategoria(db, 999) is None
+        assert service.resolve_categoria_id(db, "No existe") is None
+        assert state["loads"] == 1
+        assert state["fingerprint_calls"] == 1
+
+    def test_consulta_sin_lock_tomado(self, state):
+        """
+        Con run_sync la consulta cede el event loop: otra solicitud puede entrar
+        en get_tree en el mismo hilo mientras la primera espera la BD
+        """
+        service = CategoryTreeService()
+        db = make_db(state)
+        execute = db.execute.side_effect
+        reentrantes = []
+
+        def cold_start(query, params=None):
+            if "CHECKSUM_AGG" in str(query) and state["fingerprint_calls"] == 0:
+                assert not service._lock.locked()
+                state["fingerprint_calls"] += 1
+                reentrantes.append(service.get_tree(db))  # arranque en frío: carga por su cuenta
+                state["fingerprint_calls"] -= 1
+            return execute(query, params)
+
+        db.execute.side_effect = cold_start
+        tree = service.get_tree(db)
+        assert reentrantes[0].categorias_by_id.keys() == tree.categorias_by_id.keys()
+
+        # Con snapshot y un chequeo en curso, la segunda solicitud usa el actual
+        service.invalidate()
+        vistos = []
+
+        def during_check(query, params=None):
+            if "CHECKSUM_AGG" in str(query):
+                vistos.append(service.get_tree(db))
+            return execute(query, params)
+
+        db.execute.side_effect = during_check
+        service.get_tree(db)
+        assert vistos == [tree]
@@ -0,0 +1,37 @@
+"""
+Pruebas unitarias para ETags del catálogo (CatalogVersion + If-None-Match)
+"""
+import pytest
+
+from app.infrastructure.cache.catalog_version import CatalogVersion
+from app.shared.utils.http_cache import etag_matches
+
+
+@pytest.mark.unit
+class TestCatalogETag:
+    """Pruebas de versionado y comparación de ETags"""
+
+    def test_bump_changes_etag(self):
+        """Una escritura en el catálogo debe generar un ETag distinto"""
+        version = CatalogVersion(window_seconds=30, clock=lambda: 100.0)
+        before = version.etag("home-productos")
+        assert version.etag("home-productos") == before
+        version.bump()
+        assert version.etag("home-productos") != before
+
+    def test_etag_rotates_with_time_window(self):
+        """El ETag cambia al pasar la ventana de tiempo"""
+        now = {"t": 0.0}
+        version = CatalogVersion(window_seconds=30, clock=lambda: now["t"])
+        first = version.etag("carrusel")
+        now["t"] = 31.0
+        assert version.etag("carrusel") != first
+
+    def test_if_none_match_parsing(self):
+        """Debe aceptar listas, prefijo W/ y comodín"""
+        etag = '"carrusel-abc-1-0"'
+        assert etag_matches(etag, etag)
+        assert etag_matches('"otro", W/"carrusel-abc-1-0"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"carrusel-abc-2-0"', etag)
+        assert not etag_matches(None, etag)
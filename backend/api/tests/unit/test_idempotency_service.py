@@ -0,0 +1,143 @@
+"""
+Tests para Idempotency-Key: reclamo, respuesta guardada y repetición
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from app.application.services.idempotency_service import (
+    REPLAYED_HEADER,
+    IdempotencyService,
+    request_hash,
+)
+from app.infrastructure.cache.ttl_cache import TTLCache
+
+ENDPOINT = "POST /api/pedidos"
+PAYLOAD = {"productos": [{"sku": 1, "cantidad": 2}], "direccionEnvio": "Calle 1 # 2-3"}
+
+
+class FakeSession:
+    """Tabla ClavesIdempotencia en un dict; las filas sin commit se descartan en rollback"""
+
+    def __init__(self, filas=None):
+        self.filas = filas if filas is not None else {}
+        self.pendientes = {}
+        self.statements = []
+        self.rolled_back = False
+
+    def execute(self, statement, params):
+        sql = str(statement)
+        self.statements.append(sql)
+        clave = (params.get("usuario_id"), params.get("clave_hash"))
+        if sql.lstrip().startswith("SELECT"):
+            fila = self.filas.get(clave) or self.pendientes.get(clave)
+            return SimpleNamespace(first=lambda: SimpleNamespace(**fila) if fila else None)
+        if sql.lstrip().startswith("INSERT"):
+            if clave in self.filas or clave in self.pendientes:
+                raise IntegrityError(sql, params, Exception("PK_ClavesIdempotencia"))
+            self.pendientes[clave] = {
+                "solicitud_hash": params["solicitud_hash"], "status_code": None, "respuesta": None
+            }
+        elif sql.lstrip().startswith("UPDATE"):
+            self.pendientes[clave].update(status_code=params["status_code"], respuesta=params["respuesta"])
+        return SimpleNamespace(rowcount=0)
+
+    def commit(self):
+        self.filas.update(self.pendientes)
+        self.pendientes = {}
+
+    def rollback(self):
+        self.rolled_back = True
+        self.pendientes = {}
+
+
+@pytest.mark.unit
+class TestIdempotencyService:
+    """Un reintento con la misma clave devuelve la respuesta del primero sin repetir el trabajo"""
+
+    def setup_method(self):
+        self.service = IdempotencyService(cache=TTLCache(max_entries=16, ttl_seconds=60), ttl_seconds=3600)
+
+    def _primera(self, db, respuesta):
+        claim, replay = self.service.begin(db, 7, ENDPOINT, "abc-123", PAYLOAD)
+        assert replay is None and claim is not None
+        self.service.complete(db, claim, respuesta, 201)
+        db.commit()
+        self.service.remember(claim)
+        return claim
+
+    def test_sin_clave(self):
+        db = FakeSession()
+        assert self.service.begin(db, 7, ENDPOINT, None, PAYLOAD) == (None, None)
+        assert db.statements == []
+
+    def test_repeticion_desde_cache(self):
+        db = FakeSession()
+        self._primera(db, {"id": 55, "total": 1000.0})
+        db.statements.clear()
+
+        claim, replay = self.service.begin(db, 7, ENDPOINT, "abc-123", dict(reversed(list(PAYLOAD.items()))))
+        assert claim is None
+        assert replay.status_code == 201
+        assert json.loads(replay.body) == {"id": 55, "total": 1000.0}
+        assert replay.headers[REPLAYED_HEADER] == "true"
+        assert db.statements == []
+
+    def test_repeticion_desde_tabla(self):
+        """Otro proceso (cache vacía) encuentra la respuesta en la tabla"""
+        db = FakeSession()
+        self._primera(db, {"id": 55})
+        otro = IdempotencyService(cache=TTLCache(max_entries=16, ttl_seconds=60), ttl_seconds=3600)
+
+        claim, replay = otro.begin(FakeSession(db.filas), 7, ENDPOINT, "abc-123", PAYLOAD)
+        assert claim is None and json.loads(replay.body) == {"id": 55}
+        assert len(otro.cache) == 1
+
+    def test_clave_con_otro_cuerpo(self):
+        db = FakeSession()
+        self._primera(db, {"id": 55})
+        with pytest.raises(HTTPException) as exc_info:
+            self.service.begin(db, 7, ENDPOINT, "abc-123", {**PAYLOAD, "direccionEnvio": "Otra dirección 123"})
+        assert exc_info.value.status_code == 422
+        assert exc_info.value.detail["code"] == "IDEMPOTENCY_KEY_REUSED"
+
+    def test_clave_por_usuario_y_endpoint(self):
+        db = FakeSession()
+        self._primera(db, {"id": 55})
+        assert self.service.begin(db, 8, ENDPOINT, "abc-123", PAYLOAD)[0] is not None
+        db.rollback()
+        assert self.service.begin(db, 7, "POST /api/pagos/create-payment-intent", "abc-123", PAYLOAD)[0] is not None
+
+    def test_error_libera_la_clave(self):
+        """Si la primera solicitud hace rollback, el reintento vuelve a ejecutarse"""
+        db = FakeSession()
+        claim, _ = self.service.begin(db, 7, ENDPOINT, "abc-123", PAYLOAD)
+        db.rollback()
+
+        claim, replay = self.service.begin(db, 7, ENDPOINT, "abc-123", PAYLOAD)
+        assert claim is not None and replay is None
+
+    def test_solicitud_concurrente(self):
+        """El INSERT choca con la fila que otra solicitud confirmó después de la lectura"""
+        db = FakeSession()
+        original_execute = db.execute
+
+        def execute(statement, params):
+            if str(statement).lstrip().startswith("INSERT") and not db.filas:
+                db.filas[(params["usuario_id"], params["clave_hash"])] = {
+                    "solicitud_hash": request_hash(PAYLOAD), "status_code": 201, "respuesta": '{"id":99}'
+                }
+            return original_execute(statement, params)
+
+        db.execute = execute
+        claim, replay = self.service.begin(db, 7, ENDPOINT, "abc-123", PAYLOAD)
+        assert claim is None and json.loads(replay.body) == {"id": 99}
+        assert db.rolled_back
+
+    def test_clave_invalida(self):
+        with pytest.raises(HTTPException) as exc_info:
+            self.service.begin(FakeSession(), 7, ENDPOINT, "x" * 256, PAYLOAD)
+        assert exc_info.value.status_code == 400
@@ -0,0 +1,75 @@
+"""
+Tests para el detector de bloqueos del event loop
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.infrastructure.monitoring.loop_monitor import EventLoopMonitor, UNKNOWN_ROUTE
+
+
+class _Route:
+    path = "/api/home/productos"
+
+
+def _blocking_handler():
+    time.sleep(0.3)
+
+
+@pytest.mark.unit
+class TestEventLoopMonitor:
+    """Atribución de bloqueos por ruta"""
+
+    def test_registra_bloqueo_con_ruta_y_stack(self):
+        monitor = EventLoopMonitor(interval_ms=20, threshold_ms=100)
+
+        async def request():
+            monitor.track_request({"type": "http", "method": "GET", "route": _Route()})
+            _blocking_handler()
+
+        async def main():
+            monitor.start()
+            await asyncio.sleep(0.05)
+            await asyncio.create_task(request())
+            await asyncio.sleep(0.1)
+            await monitor.stop()
+
+        asyncio.run(main())
+        stats = monitor.snapshot()
+
+        assert stats["stalls_total"] == 1
+        assert stats["routes"][0]["route"] == "GET /api/home/productos"
+        assert stats["routes"][0]["max_ms"] >= 200
+        assert "_blocking_handler" in stats["recent_stalls"][0]["stack"]
+
+    def test_sin_bloqueos(self):
+        monitor = EventLoopMonitor(interval_ms=10, threshold_ms=100)
+
+        async def main():
+            monitor.start()
+            await asyncio.sleep(0.1)
+            await monitor.stop()
+
+        asyncio.run(main())
+        stats = monitor.snapshot()
+        assert stats["samples"] > 0
+        assert stats["stalls_total"] == 0
+        assert not stats["running"]
+
+    def test_bloqueo_fuera_de_request(self):
+        monitor = EventLoopMonitor(interval_ms=20, threshold_ms=100)
+
+        async def main():
+            monitor.start()
+            await asyncio.sleep(0.05)
+            time.sleep(0.3)
+            await asyncio.sleep(0.1)
+            await monitor.stop()
+
+        asyncio.run(main())
+        stats = monitor.snapshot()
+        assert stats["routes"][0]["route"] == UNKNOWN_ROUTE
+
+        monitor.reset()
+        assert monitor.snapshot()["stalls_total"] == 0
@@ -0,0 +1,88 @@
+"""
+Tests para las métricas Prometheus
+"""
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from app.infrastructure.monitoring.metrics import (
+    Counter, Gauge, Histogram, MetricsRegistry, HTTP_REQUESTS, HTTP_LATENCY,
+    DB_POOL_CHECKOUTS, DB_POOL_CONNECTIONS, InstrumentedAsyncQueuePool, InstrumentedQueuePool,
+)
+from app.presentation.middleware.metrics import MetricsMiddleware
+
+
+class _Route:
+    path = "/api/productos/{producto_id}"
+
+
+@pytest.mark.unit
+class TestMetrics:
+    """Contadores por hilo y formato de exposición"""
+
+    def test_contador_suma_hilos(self):
+        counter = Counter("pruebas_total", "Pruebas", ("tipo",))
+
+        def worker():
+            for _ in range(1000):
+                counter.inc(("a",))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert 'pruebas_total{tipo="a"} 4000' in counter.render()
+
+    def test_histograma_acumulado(self):
+        hist = Histogram("latencia_seconds", "Latencia", ("ruta",), buckets=(0.1, 1.0))
+        for v in (0.05, 0.1, 0.5, 2.0):
+            hist.observe(v, ("/x",))
+        text = hist.render()
+        assert 'latencia_seconds_bucket{ruta="/x",le="0.1"} 2' in text
+        assert 'latencia_seconds_bucket{ruta="/x",le="1"} 3' in text
+        assert 'latencia_seconds_bucket{ruta="/x",le="+Inf"} 4' in text
+        assert 'latencia_seconds_count{ruta="/x"} 4' in text
+        assert 'latencia_seconds_sum{ruta="/x"} 2.65' in text
+
+    def test_registro_y_gauge(self):
+        registry = MetricsRegistry()
+        gauge = registry.register(Gauge("en_curso", "En curso", ("metodo",)))
+        gauge.inc(("GET",))
+        gauge.inc(("GET",))
+        gauge.dec(("GET",))
+        text = registry.render()
+        assert "# TYPE en_curso gauge" in text
+        assert 'en_curso{metodo="GET"} 1' in text
+
+    def test_middleware_usa_plantilla_de_ruta(self):
+        async def app(scope, receive, send):
+            scope["route"] = _Route()
+            await send({"type": "http.response.start", "status": 404, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        scope = {"type": "http", "method": "GET", "path": "/api/productos/7"}
+        asyncio.run(MetricsMiddleware(app)(scope, None, send))
+
+        assert 'route="/api/productos/{producto_id}",status="404"} 1' in HTTP_REQUESTS.render()
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/productos/{producto_id}"} 1' in HTTP_LATENCY.render()
+
+    def test_pools_sync_y_async_etiquetados(self):
+        """Los checkouts del pool async se cuentan aparte de los del sync"""
+        def checkouts(engine):
+            return DB_POOL_CHECKOUTS._merged().get((engine,), 0)
+
+        antes = {engine: checkouts(engine) for engine in ("sync", "async")}
+        for pool_class in (InstrumentedQueuePool, InstrumentedAsyncQueuePool, InstrumentedAsyncQueuePool):
+            pool = pool_class(creator=lambda: sqlite3.connect(":memory:"))
+            pool.connect().close()
+
+        assert checkouts("sync") - antes["sync"] == 1
+        assert checkouts("async") - antes["async"] == 2
+        assert "# TYPE db_pool_connections gauge" in DB_POOL_CONNECTIONS.render()
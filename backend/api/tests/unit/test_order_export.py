@@ -0,0 +1,74 @@
+"""
+Tests para la exportación de pedidos (CSV / NDJSON)
+"""
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import app.application.services.order_export as order_export
+from app.application.services.order_export import EXPORT_COLUMNS, OrderExportService
+
+
+@pytest.mark.unit
+class TestOrderExport:
+    """Una línea por item, rango inclusive y lectura por lotes"""
+
+    def setup_method(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        with self.engine.begin() as conn:
+            for ddl in (
+                "CREATE TABLE Usuarios (id INTEGER PRIMARY KEY, nombre_completo TEXT, email TEXT)",
+                "CREATE TABLE Productos (id INTEGER PRIMARY KEY, nombre TEXT)",
+                """CREATE TABLE Pedidos (id INTEGER PRIMARY KEY, usuario_id INT, estado TEXT, estado_pago TEXT,
+                   metodo_pago TEXT, subtotal NUMERIC, costo_envio NUMERIC, total NUMERIC, municipio TEXT,
+                   departamento TEXT, pais TEXT, fecha_creacion TEXT)""",
+                "CREATE TABLE PedidoItems (id INTEGER PRIMARY KEY, pedido_id INT, producto_id INT, cantidad INT, precio_unitario NUMERIC)",
+            ):
+                conn.execute(text(ddl))
+            conn.execute(text("INSERT INTO Usuarios VALUES (1, 'Ana Pérez', 'ana@example.com')"))
+            conn.execute(text("INSERT INTO Productos VALUES (10, 'Collar'), (11, 'Arena')"))
+            for pedido_id, fecha in ((1, "2026-01-31 23:59:00"), (2, "2026-02-01 08:00:00"),
+                                     (3, "2026-02-28 12:00:00"), (4, "2026-03-01 00:00:00")):
+                conn.execute(text(
+                    "INSERT INTO Pedidos VALUES (:id, 1, 'Pagado', 'Pagado', 'Tarjeta', 30, 0, 30, NULL, NULL, 'Colombia', :f)"
+                ), {"id": pedido_id, "f": fecha})
+            conn.execute(text(
+                "INSERT INTO PedidoItems VALUES (1, 2, 10, 2, 10), (2, 2, 11, 1, 10), (3, 1, 10, 1, 30), (4, 4, 10, 1, 30)"
+            ))
+        self.service = OrderExportService(self.engine)
+
+    def teardown_method(self):
+        self.engine.dispose()
+
+    def test_csv_una_linea_por_item(self):
+        salida = "".join(self.service.iter_csv(date(2026, 2, 1), date(2026, 2, 28)))
+        filas = list(csv.DictReader(io.StringIO(salida)))
+
+        assert list(filas[0].keys()) == EXPORT_COLUMNS
+        # pedido 2 con dos items; pedido 3 sin items -> una línea vacía de item
+        assert [(f["pedido_id"], f["item_id"]) for f in filas] == [("2", "1"), ("2", "2"), ("3", "")]
+        assert filas[0]["cliente"] == "Ana Pérez"
+        assert filas[0]["producto_nombre"] == "Collar"
+        assert float(filas[0]["total_item"]) == 20
+
+    def test_ndjson(self):
+        lineas = "".join(self.service.iter_ndjson(date(2026, 1, 31), date(2026, 1, 31))).splitlines()
+        assert len(lineas) == 1
+        fila = json.loads(lineas[0])
+        assert fila["pedido_id"] == 1
+        assert fila["producto_id"] == 10
+
+    def test_rango_vacio_solo_encabezado(self):
+        salida = "".join(self.service.iter_csv(date(2025, 1, 1), date(2025, 1, 31)))
+        assert salida == ",".join(EXPORT_COLUMNS) + "\n"
+
+    def test_lotes(self, monkeypatch):
+        """Cada chunk del stream corresponde a un lote del cursor"""
+        monkeypatch.setattr(order_export, "EXPORT_BATCH_ROWS", 2)
+        lotes = list(self.service.iter_batches(date(2026, 1, 1), date(2026, 3, 31)))
+        assert [len(lote) for lote in lotes] == [2, 2, 1]
+        assert len(list(self.service.iter_ndjson(date(2026, 1, 1), date(2026, 3, 31)))) == 3
@@ -0,0 +1,135 @@
+"""
+Tests para la serialización por lote de pedidos
+"""
+import json
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.application.services.order_serializer import OrderSerializer
+
+
+class FakeSession:
+    """Responde Productos/Usuarios por OPENJSON y cuenta las consultas"""
+
+    def __init__(self, productos, usuarios, pedidos=()):
+        self.productos = productos
+        self.usuarios = usuarios
+        self.pedidos = list(pedidos)
+        self.statements = []
+        self.params = []
+
+    def execute(self, statement, params):
+        sql = str(statement)
+        self.statements.append(sql)
+        self.params.append(params)
+        if "FROM Pedidos" in sql:
+            return SimpleNamespace(fetchall=lambda: self.pedidos)
+        ids = json.loads(params["ids"])
+        source = self.productos if "FROM Productos" in sql else self.usuarios
+        rows = [source[i] for i in ids if i in source]
+        return SimpleNamespace(fetchall=lambda: rows)
+
+
+def _pedido(pedido_id, usuario_id, items):
+    return SimpleNamespace(
+        id=pedido_id, usuario_id=usuario_id, estado="Pendiente", total=Decimal("10.50"),
+        metodo_pago=None, direccion_entrega="Calle 1 # 2-3", municipio=None, departamento=None,
+        pais=None, telefono_contacto="3000000000", fecha_creacion=datetime(2026, 1, 1),
+        detalles=[
+            SimpleNamespace(id=item_id, producto_id=producto_id, cantidad=1, precio_unitario=Decimal("5.25"))
+            for item_id, producto_id in items
+        ],
+    )
+
+
+@pytest.mark.unit
+class TestOrderSerializer:
+    """Número de consultas constante por página"""
+
+    def _session(self):
+        productos = {
+            i: SimpleNamespace(id=i, nombre=f"Producto {i}", imagen=f"/img/{i}.jpg") for i in range(1, 50)
+        }
+        usuarios = {i: SimpleNamespace(id=i, nombre_completo=f"Cliente {i}") for i in range(1, 10)}
+        return FakeSession(productos, usuarios)
+
+    def test_consultas_constantes(self):
+        """Una página de 40 pedidos cuesta lo mismo que una de 1"""
+        db = self._session()
+        OrderSerializer.serialize_many(db, [_pedido(1, 1, [(1, 1)])])
+        una = len(db.statements)
+
+        db = self._session()
+        pedidos = [_pedido(n, n % 9 + 1, [(n * 10, n), (n * 10 + 1, n + 1)]) for n in range(1, 41)]
+        OrderSerializer.serialize_many(db, pedidos)
+        assert len(db.statements) == una == 2
+
+    def test_formato_respuesta(self):
+        """Items ordenados por id, con nombre e imagen del producto"""
+        db = self._session()
+        data = OrderSerializer.serialize(db, _pedido(7, 3, [(21, 4), (20, 99)]))
+
+        assert data["clienteNombre"] == "Cliente 3"
+        assert data["total"] == 10.5
+        assert data["metodo_pago"] == "Efectivo"
+        assert data["pais"] == "Colombia"
+        assert [item["id"] for item in data["items"]] == [20, 21]
+        assert "producto_nombre" not in data["items"][0]  # producto 99 no existe
+        assert data["items"][1]["producto_nombre"] == "Producto 4"
+        assert data["items"][1]["producto_imagen"] == "/img/4.jpg"
+
+    def test_pagina_vacia_sin_consultas(self):
+        db = self._session()
+        assert OrderSerializer.serialize_many(db, []) == []
+        assert db.statements == []
+
+    def test_usuario_inexistente(self):
+        db = self._session()
+        data = OrderSerializer.serialize(db, _pedido(1, 500, []))
+        assert data["clienteNombre"] == "Usuario ID: 500"
+        assert data["items"] == []
+
+
+@pytest.mark.unit
+class TestOrderSummaries:
+    """Proyección resumida del listado admin (?view=summary)"""
+
+    def _fila(self, pedido_id, nombre="Cliente 1"):
+        return SimpleNamespace(
+            id=pedido_id, usuario_id=1, nombre_completo=nombre, estado="Pendiente",
+            estado_pago="Pendiente de Pago", total=Decimal("99.90"),
+            fecha_creacion=datetime(2026, 1, 1), items_count=3,
+        )
+
+    def test_una_sola_consulta_sin_items(self):
+        db = FakeSession({}, {}, [self._fila(1), self._fila(2, nombre=None)])
+        filas = OrderSerializer.list_summaries(db, skip=20, limit=10)
+
+        assert len(db.statements) == 1
+        assert "FROM PedidoItems" in db.statements[0]  # solo el COUNT
+        assert "WHERE p." not in db.statements[0]
+        assert db.params[0] == {"skip": 20, "limit": 10}
+        assert filas[0] == {
+            "id": 1, "usuario_id": 1, "clienteNombre": "Cliente 1", "estado": "Pendiente",
+            "estado_pago": "Pendiente de Pago", "total": 99.9,
+            "fecha_creacion": datetime(2026, 1, 1), "items_count": 3,
+        }
+        assert filas[1]["clienteNombre"] == "Usuario ID: 1"
+
+    def test_filtros(self):
+        db = FakeSession({}, {})
+        OrderSerializer.list_summaries(db, estado="Enviado", usuario_id=7)
+        assert "p.estado = :estado AND p.usuario_id = :usuario_id" in db.statements[0]
+        assert db.params[0]["estado"] == "Enviado"
+        assert db.params[0]["usuario_id"] == 7
+
+    def test_cursor_ignora_skip(self):
+        db = FakeSession({}, {})
+        OrderSerializer.list_summaries(db, estado_pago="Pagado", skip=40, after=(datetime(2026, 1, 1), 9))
+        assert "p.estado_pago = :estado_pago" in db.statements[0]
+        assert "p.id < :after_id" in db.statements[0]
+        assert db.params[0]["skip"] == 0
+        assert (db.params[0]["after_fecha"], db.params[0]["after_id"]) == (datetime(2026, 1, 1), 9)
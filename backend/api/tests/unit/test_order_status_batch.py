@@ -0,0 +1,118 @@
+"""
+Tests para el cambio de estado por lote
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import app.application.services.order_status_batch as order_status_batch
+from app.application.services.order_status_batch import OrderStatusBatchService
+from app.domain.order_status import is_valid_transition
+
+
+class FakeSession:
+    """Devuelve el estado actual de los pedidos bloqueados y registra cada sentencia"""
+
+    def __init__(self, estados):
+        self.estados = estados
+        self.statements = []
+        self.params = []
+        self.committed = False
+        self.rolled_back = False
+
+    def execute(self, statement, params):
+        sql = str(statement)
+        self.statements.append(sql)
+        self.params.append(params)
+        if "UPDLOCK" in sql:
+            rows = [
+                SimpleNamespace(id=i, estado=self.estados[i]) for i in json.loads(params["ids"]) if i in self.estados
+            ]
+            return SimpleNamespace(fetchall=lambda: rows)
+        if "UPDATE Pedidos" in sql:
+            for i in json.loads(params["ids"]):
+                self.estados[i] = params["estado"]
+        return SimpleNamespace(rowcount=len(json.loads(params["ids"])))
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+@pytest.mark.unit
+class TestOrderStatusBatch:
+    """Validación con la máquina de estados y sentencias por conjunto"""
+
+    def setup_method(self):
+        self.eventos = []
+
+        def publish_many_safe(queue_name, messages):
+            self.eventos.extend((queue_name, m) for m in messages)
+            return len(messages)
+
+        self._original = order_status_batch.publish_many_safe
+        order_status_batch.publish_many_safe = publish_many_safe
+
+    def teardown_method(self):
+        order_status_batch.publish_many_safe = self._original
+
+    def test_sentencias_constantes(self):
+        """500 pedidos cuestan las mismas 3 sentencias que 1"""
+        db = FakeSession({i: "Pagado" for i in range(1, 501)})
+        resultado = OrderStatusBatchService.apply(db, range(1, 501), "Enviado", nota="Lote 42", usuario_id=3)
+
+        assert len(db.statements) == 3
+        # historial antes del UPDATE: estado_anterior se lee de la fila sin cambiar
+        assert "INSERT INTO PedidosHistorialEstado" in db.statements[1]
+        assert "UPDATE Pedidos" in db.statements[2]
+        assert db.params[1]["nota"] == "Lote 42" and db.params[1]["usuario_id"] == 3
+        assert db.committed
+        assert len(resultado["actualizados"]) == 500
+        assert resultado["eventos_publicados"] == 500
+        assert self.eventos[0] == (
+            "pedido.estado.cambiado", {"pedido_id": 1, "estado_anterior": "Pagado", "estado_nuevo": "Enviado"}
+        )
+
+    def test_rechaza_transiciones_invalidas(self):
+        db = FakeSession({1: "Pagado", 2: "Entregado", 3: "Pendiente", 4: "Pagado"})
+        resultado = OrderStatusBatchService.apply(db, [4, 1, 2, 3, 99, 1], "Enviado")
+
+        assert resultado["actualizados"] == [1, 4]
+        assert json.loads(db.params[1]["ids"]) == [1, 4]
+        assert [(r["pedido_id"], r["estado_actual"]) for r in resultado["rechazados"]] == [
+            (2, "Entregado"), (3, "Pendiente"), (99, None)
+        ]
+        assert db.estados[2] == "Entregado"
+        assert [m["pedido_id"] for _, m in self.eventos] == [1, 4]
+
+    def test_sin_validos_no_escribe(self):
+        db = FakeSession({1: "Cancelado"})
+        resultado = OrderStatusBatchService.apply(db, [1], "Enviado")
+
+        assert len(db.statements) == 1
+        assert resultado["actualizados"] == []
+        assert resultado["eventos_publicados"] == 0
+        assert self.eventos == []
+
+    def test_error_hace_rollback(self):
+        db = FakeSession({1: "Pagado"})
+
+        def falla(statement, params):
+            if "INSERT" in str(statement):
+                raise RuntimeError("deadlock")
+            return FakeSession.execute(db, statement, params)
+
+        db.execute = falla
+        with pytest.raises(RuntimeError):
+            OrderStatusBatchService.apply(db, [1], "Enviado")
+        assert db.rolled_back and not db.committed
+        assert self.eventos == []
+
+    def test_maquina_de_estados(self):
+        assert is_valid_transition("Pagado", "Enviado")
+        assert is_valid_transition("Enviado", "Entregado")
+        assert not is_valid_transition("Entregado", "Cancelado")
+        assert not is_valid_transition("Desconocido", "Enviado")
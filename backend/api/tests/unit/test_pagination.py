@@ -0,0 +1,29 @@
+"""
+Pruebas unitarias para los cursores de paginación keyset
+"""
+from datetime import datetime
+
+import pytest
+
+from app.shared.utils.pagination import encode_cursor, decode_cursor, next_cursor_from_rows
+
+
+@pytest.mark.unit
+class TestKeysetCursor:
+    """Pruebas de codificación/decodificación de cursores"""
+
+    def test_roundtrip(self):
+        """El cursor debe decodificarse a la misma fecha e id"""
+        fecha = datetime(2025, 5, 1, 10, 30, 15, 123000)
+        assert decode_cursor(encode_cursor(fecha, 77)) == (fecha, 77)
+
+    def test_invalid_cursor_raises_value_error(self):
+        """Un cursor manipulado debe rechazarse con ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor("no-es-un-cursor")
+
+    def test_next_cursor_only_when_page_is_full(self):
+        """Solo hay siguiente página si se llenó el límite"""
+        rows = [{"id": 2, "fecha_creacion": datetime(2025, 1, 2)}, {"id": 1, "fecha_creacion": datetime(2025, 1, 1)}]
+        assert next_cursor_from_rows(rows, 3) is None
+        assert decode_cursor(next_cursor_from_rows(rows, 2)) == (datetime(2025, 1, 1), 1)
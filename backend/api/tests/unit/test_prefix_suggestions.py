@@ -0,0 +1,35 @@
+"""
+Pruebas unitarias para el índice de sugerencias por prefijo
+"""
+import pytest
+
+from app.infrastructure.search import PrefixSuggestionIndex
+
+
+@pytest.fixture
+def index():
+    return PrefixSuggestionIndex([
+        (1, "Comida Húmeda Gato", 5),
+        (2, "Comida Seca Perro", 40),
+        (3, "Collar Antipulgas", 12),
+        (4, "Gato de Peluche", 0),
+    ], max_results=10, precomputed_len=2)
+
+
+@pytest.mark.unit
+class TestPrefixSuggestionIndex:
+    """Pruebas de coincidencia por prefijo y ranking por ventas"""
+
+    def test_ranked_by_units_sold(self, index):
+        """Prefijo corto (precalculado) ordena por unidades vendidas"""
+        assert [s["id"] for s in index.suggest("co")] == [2, 3, 1]
+
+    def test_matches_any_word_accent_insensitive(self, index):
+        """Debe encontrar palabras intermedias y sin tildes"""
+        assert [s["id"] for s in index.suggest("humeda")] == [1]
+        assert [s["id"] for s in index.suggest("gat")] == [1, 4]
+
+    def test_respects_limit_and_unknown_prefix(self, index):
+        """Debe respetar el límite y devolver vacío si no hay coincidencias"""
+        assert len(index.suggest("comida", limit=1)) == 1
+        assert index.suggest("zzz") == []
@@ -0,0 +1,65 @@
+"""
+Tests para el armado de facetas a partir de las filas GROUPING SETS
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.application.services.product_facets import build_facets
+
+
+def _fila(nivel, total, categoria_id=None, categoria_nombre=None, subcategoria_id=None,
+          subcategoria_nombre=None, bucket=None):
+    return SimpleNamespace(
+        nivel=nivel, total=total, categoria_id=categoria_id, categoria_nombre=categoria_nombre,
+        subcategoria_id=subcategoria_id, subcategoria_nombre=subcategoria_nombre, bucket=bucket,
+    )
+
+
+@pytest.mark.unit
+class TestProductFacets:
+    """Separación por nivel, orden por nombre y buckets de precio"""
+
+    def test_arma_facetas(self):
+        rows = [
+            # El orden de GROUPING SETS no está garantizado: subcategorías antes que su categoría
+            _fila("subcategoria", 3, categoria_id=2, categoria_nombre="Mascotas", subcategoria_id=21, subcategoria_nombre="Perros"),
+            _fila("subcategoria", 1, categoria_id=2, categoria_nombre="Mascotas", subcategoria_id=22, subcategoria_nombre="Gatos"),
+            _fila("categoria", 4, categoria_id=2, categoria_nombre="Mascotas"),
+            _fila("categoria", 2, categoria_id=1, categoria_nombre="Alimentos"),
+            _fila("subcategoria", 2, categoria_id=1, categoria_nombre="Alimentos", subcategoria_id=11, subcategoria_nombre="Granos"),
+            _fila("precio", 5, bucket=0),
+            _fila("precio", 1, bucket=2),
+            _fila("total", 6),
+        ]
+        facetas = build_facets(rows, [25000, 50000])
+
+        assert facetas["total"] == 6
+        assert [(c["id"], c["nombre"], c["total"]) for c in facetas["categorias"]] == [
+            (1, "Alimentos", 2), (2, "Mascotas", 4)
+        ]
+        assert facetas["categorias"][1]["subcategorias"] == [
+            {"id": 22, "nombre": "Gatos", "total": 1},
+            {"id": 21, "nombre": "Perros", "total": 3},
+        ]
+        # Bucket 1 sin filas: aparece con total 0; el último no tiene tope
+        assert facetas["precios"] == [
+            {"desde": 0, "hasta": 25000, "total": 5},
+            {"desde": 25000, "hasta": 50000, "total": 0},
+            {"desde": 50000, "hasta": None, "total": 1},
+        ]
+
+    def test_subcategoria_sin_categoria_se_descarta(self):
+        rows = [
+            _fila("subcategoria", 1, categoria_id=9, subcategoria_id=91, subcategoria_nombre="Huérfana"),
+            _fila("total", 1),
+        ]
+        facetas = build_facets(rows, [])
+
+        assert facetas == {"total": 1, "categorias": [], "precios": [{"desde": 0, "hasta": None, "total": 0}]}
+
+    def test_catalogo_vacio(self):
+        facetas = build_facets([], [100])
+
+        assert facetas["total"] == 0 and facetas["categorias"] == []
+        assert [p["total"] for p in facetas["precios"]] == [0, 0]
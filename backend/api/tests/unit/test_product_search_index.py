@@ -0,0 +1,43 @@
+"""
+Pruebas unitarias para el índice de búsqueda de productos (BM25)
+"""
+import pytest
+
+from app.infrastructure.search import ProductSearchIndex, tokenize
+
+
+@pytest.fixture
+def index():
+    idx = ProductSearchIndex()
+    idx.rebuild([
+        (1, "Croquetas para Perro Adulto", "Alimento balanceado para perros"),
+        (2, "Arena para Gato", "Arena aglomerante con aroma"),
+        (3, "Juguete Ratón", "Juguete para gatos pequeños"),
+    ])
+    return idx
+
+
+@pytest.mark.unit
+class TestProductSearchIndex:
+    """Pruebas de tokenización, ranking y actualizaciones incrementales"""
+
+    def test_tokenize_folds_accents_and_plurals(self):
+        """Debe ignorar tildes, mayúsculas, plurales simples y stopwords"""
+        assert tokenize("Ratón para GATOS") == ["raton", "gato"]
+
+    def test_name_match_ranks_first(self, index):
+        """Coincidencia en el nombre debe puntuar más que en la descripción"""
+        ids = [pid for pid, _ in index.search("gato")]
+        assert ids == [2, 3]
+
+    def test_accent_insensitive_query(self, index):
+        """Buscar sin tilde debe encontrar productos con tilde"""
+        assert [pid for pid, _ in index.search("raton")] == [3]
+
+    def test_incremental_upsert_and_remove(self, index):
+        """Actualizar y eliminar deben reflejarse sin reconstruir"""
+        index.upsert(2, "Arena Sanitaria", "Para conejos")
+        assert [pid for pid, _ in index.search("conejo")] == [2]
+        index.remove(2)
+        assert index.search("arena") == []
+        assert len(index) == 2
@@ -0,0 +1,87 @@
+"""
+Tests para el contador de consultas SQL por request
+"""
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.infrastructure.monitoring.query_stats import count_queries, current_query_stats, query_budget
+from app.presentation.middleware.query_stats import (
+    QueryStatsMiddleware,
+    add_request_listener,
+    remove_request_listener,
+)
+
+
+class _Route:
+    path = "/api/pruebas"
+
+
+def _run(app):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/api/pruebas", "route": _Route()}
+    asyncio.run(QueryStatsMiddleware(app)(scope, None, send))
+    return dict(sent[0]["headers"])
+
+
+@pytest.mark.unit
+class TestQueryStats:
+    """Conteo de sentencias, Server-Timing y presupuesto"""
+
+    def setup_method(self):
+        self.engine = create_engine("sqlite:///:memory:")
+
+    def teardown_method(self):
+        self.engine.dispose()
+
+    def _app(self, queries, budget=None):
+        engine = self.engine
+
+        async def app(scope, receive, send):
+            if budget is not None:
+                await query_budget(budget)()
+            with engine.connect() as conn:
+                for _ in range(queries):
+                    conn.execute(text("SELECT 1"))
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        return app
+
+    def test_server_timing(self):
+        headers = _run(self._app(3))
+        assert b'desc="3 queries"' in headers[b"server-timing"]
+        assert headers[b"server-timing"].startswith(b"db;dur=")
+        assert current_query_stats() is None
+
+    def test_presupuesto_excedido(self, caplog):
+        results = []
+        add_request_listener(results.append)
+        try:
+            with caplog.at_level(logging.WARNING):
+                _run(self._app(3, budget=2))
+        finally:
+            remove_request_listener(results.append)
+
+        assert results[0].count == 3 and results[0].budget == 2
+        assert results[0].over_budget()
+        assert "GET /api/pruebas ran 3 statements" in caplog.text
+
+    def test_dentro_del_presupuesto(self, caplog):
+        with caplog.at_level(logging.WARNING):
+            _run(self._app(2, budget=2))
+        assert "Query budget exceeded" not in caplog.text
+
+    def test_count_queries_global(self):
+        with count_queries() as stats:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT   2"))
+        assert stats.count == 2
+        assert stats.statements == ["SELECT 1", "SELECT 2"]
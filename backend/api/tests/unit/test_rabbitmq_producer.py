@@ -0,0 +1,91 @@
+"""
+Tests para la publicación por lote en RabbitMQ
+"""
+import time
+
+import pytest
+
+import app.infrastructure.external.rabbitmq as rabbitmq
+from app.infrastructure.external.rabbitmq import RabbitMQProducer
+
+
+class FakeChannel:
+    """Canal que falla después de `falla_tras` publicaciones"""
+
+    def __init__(self, publicados, falla_tras=None):
+        self.publicados = publicados
+        self.falla_tras = falla_tras
+        self.is_closed = False
+
+    def queue_declare(self, queue, durable):
+        pass
+
+    def basic_publish(self, exchange, routing_key, body, properties):
+        if self.falla_tras is not None and len(self.publicados) >= self.falla_tras:
+            self.is_closed = True
+            raise ConnectionError("canal cerrado")
+        self.publicados.append(body)
+
+
+class FakeConnection:
+    is_closed = False
+
+    def close(self):
+        self.is_closed = True
+
+
+class FakeProducer(RabbitMQProducer):
+    """`connect` consume un canal de la lista; sin canales el broker está caído"""
+
+    def __init__(self, canales):
+        super().__init__()
+        self.canales = list(canales)
+        self.conexiones = 0
+
+    def connect(self):
+        self.conexiones += 1
+        if not self.canales:
+            raise ConnectionError("broker caído")
+        self.connection = FakeConnection()
+        self.channel = self.canales.pop(0)
+
+
+@pytest.mark.unit
+class TestPublishMany:
+    """Una sola reconexión para el resto del lote; nunca reintentos por mensaje"""
+
+    def setup_method(self):
+        self._sleep = rabbitmq.time.sleep
+
+        def no_sleep(seconds):
+            raise AssertionError("publish_many no debe dormir")
+
+        rabbitmq.time.sleep = no_sleep
+
+    def teardown_method(self):
+        rabbitmq.time.sleep = self._sleep
+
+    def test_broker_caido(self):
+        producer = FakeProducer([])
+        mensajes = [{"pedido_id": i} for i in range(500)]
+
+        started = time.perf_counter()
+        assert producer.publish_many("pedido.estado.cambiado", mensajes) == 0
+        assert time.perf_counter() - started < 1
+        assert producer.conexiones == 2
+
+    def test_reconecta_una_vez_para_el_resto(self):
+        publicados = []
+        producer = FakeProducer([FakeChannel(publicados, falla_tras=3), FakeChannel(publicados)])
+
+        assert producer.publish_many("q", [{"n": i} for i in range(10)]) == 10
+        assert len(publicados) == 10
+        assert producer.conexiones == 2
+
+    def test_se_detiene_si_la_reconexion_falla(self):
+        publicados = []
+        producer = FakeProducer([FakeChannel(publicados, falla_tras=3), FakeChannel(publicados, falla_tras=5)])
+
+        assert producer.publish_many("q", [{"n": i} for i in range(10)]) == 5
+        assert producer.conexiones == 2
+        assert producer.connection is None
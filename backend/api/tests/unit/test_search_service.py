@@ -0,0 +1,74 @@
+"""
+Pruebas unitarias para la carga del índice de búsqueda desde la base de datos
+"""
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.application.services.search_service import ProductSearchService
+
+
+def make_db(rows, on_execute=None):
+    """Sesión mock que devuelve `rows` filtradas por :max_id"""
+    db = Mock(spec=Session)
+
+    def execute(query, params=None):
+        if on_execute is not None:
+            on_execute()
+        max_id = (params or {}).get("max_id", 0)
+        result = Mock()
+        result.fetchall.return_value = [r for r in rows if r.id > max_id]
+        return result
+
+    db.execute.side_effect = execute
+    return db
+
+
+def _producto(id, nombre):
+    return SimpleNamespace(id=id, nombre=nombre, descripcion=None)
+
+
+@pytest.mark.unit
+class TestProductSearchService:
+    """Pruebas de carga inicial, altas pendientes y consultas concurrentes"""
+
+    def test_carga_y_altas_pendientes(self):
+        """La primera búsqueda carga el índice; mark_created trae solo ids nuevos"""
+        rows = [_producto(1, "Arena para Gato")]
+        service = ProductSearchService()
+        db = make_db(rows)
+        assert service.search(db, "gato") == [1]
+
+        rows.append(_producto(2, "Gato de Peluche"))
+        service.mark_created()
+        assert sorted(service.search(db, "gato")) == [1, 2]
+        assert db.execute.call_args.args[1] == {"max_id": 1}
+        assert service._pending_since is None
+
+    def test_consulta_sin_lock_tomado(self):
+        """
+        Con run_sync la consulta cede el event loop: otra búsqueda puede entrar
+        en ensure_loaded en el mismo hilo mientras la primera espera la BD
+        """
+        rows = [_producto(1, "Arena para Gato")]
+        service = ProductSearchService()
+        reentrantes = []
+
+        def cold_start():
+            assert not service._lock.locked()
+            if db.execute.call_count == 1:
+                reentrantes.append(service.search(db, "gato"))  # arranque en frío: carga por su cuenta
+
+        db = make_db(rows, cold_start)
+        assert service.search(db, "gato") == [1]
+        assert reentrantes == [[1]]
+
+        # Con índice cargado y una consulta en curso, la otra búsqueda usa el actual
+        rows.append(_producto(2, "Gato de Peluche"))
+        service.mark_created()
+        vistos = []
+        db = make_db(rows, lambda: vistos.append(service.search(db, "gato")))
+        assert sorted(service.search(db, "gato")) == [1, 2]
+        assert vistos == [[1]]
@@ -0,0 +1,41 @@
+"""
+Tests para los helpers de consultas por lote (OPENJSON)
+"""
+import json
+
+import pytest
+
+from app.infrastructure.repositories.sql_helpers import id_list_param, in_id_list, keyset_after_clause
+
+
+@pytest.mark.unit
+class TestIdListParam:
+    """Un solo parámetro JSON, independiente del tamaño de la lista"""
+
+    def test_ordena_y_deduplica(self):
+        """Mismo conjunto de ids produce el mismo parámetro"""
+        assert id_list_param([3, 1, 3, 2]) == id_list_param({2, 3, 1})
+        assert json.loads(id_list_param(["5", 4])) == [4, 5]
+
+    def test_lista_vacia(self):
+        """Sin ids el parámetro es un arreglo JSON vacío"""
+        assert id_list_param([]) == "[]"
+
+    def test_texto_sql_constante(self):
+        """El texto SQL no depende de la cantidad de ids"""
+        clause = in_id_list("p.id")
+        assert clause == "p.id IN (SELECT CAST([value] AS INT) FROM OPENJSON(:ids))"
+        assert ":ids" in in_id_list("producto_id")
+        assert ":otros" in in_id_list("id", "otros")
+
+
+@pytest.mark.unit
+class TestKeysetAfterClause:
+    """Predicado keyset para ORDER BY fecha_creacion DESC, id DESC"""
+
+    def test_alias(self):
+        """Todas las columnas usan el alias recibido"""
+        clause = keyset_after_clause("o")
+        assert clause.startswith("(o.fecha_creacion < CAST(:after_fecha AS DATETIME)")
+        assert "o.id < :after_id" in clause
+        assert "p." not in clause
@@ -0,0 +1,122 @@
+"""
+Tests para la liberación de reservas de stock vencidas
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.application.services.stock_hold_sweeper import EXPIRED_HOLD_REASON, StockHoldSweeper
+
+
+PENDIENTE_EN_LINEA = {"estado": "Pendiente", "estado_pago": "Pendiente de Pago", "metodo_pago": "Tarjeta"}
+
+
+class FakeSession:
+    """Reservas vencidas por pedido; registra sentencias, commit y rollback"""
+
+    def __init__(self, vencidas, pedidos=None):
+        self.vencidas = vencidas
+        self.pedidos = pedidos or {}
+        self.statements = []
+        self.committed = False
+        self.rolled_back = False
+        self.closed = False
+
+    def execute(self, statement, params):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "SELECT TOP (:limit)" in sql:
+            rows = [
+                SimpleNamespace(pedido_id=pid, **self.pedidos.get(pid, PENDIENTE_EN_LINEA))
+                for pid in list(self.vencidas)[:params["limit"]]
+            ]
+            return SimpleNamespace(fetchall=lambda: rows)
+        # DELETE de las reservas vencidas del lote
+        ids = json.loads(params["ids"])
+        liberadas = sum(self.vencidas.pop(pid, 0) for pid in ids)
+        return SimpleNamespace(rowcount=liberadas)
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.unit
+class TestStockHoldSweeper:
+    """Cancela pedidos pendientes y libera el resto del lote en una sentencia"""
+
+    def setup_method(self):
+        self.cancelados = []
+
+    def _sweeper(self, db, ya_pagados=()):
+        async def cancel(session, pedido_id, razon=None, expected_estado=None):
+            assert session is db and razon == EXPIRED_HOLD_REASON and expected_estado == "Pendiente"
+            if pedido_id in ya_pagados:
+                raise HTTPException(status_code=400, detail="Solo se pueden cancelar pedidos pendientes de pago")
+            self.cancelados.append(pedido_id)
+            db.vencidas.pop(pedido_id, None)  # la cancelación libera sus reservas
+            return {"pedido_id": pedido_id}
+
+        return StockHoldSweeper(session_factory=lambda: db, cancel_order=cancel)
+
+    def test_lote(self):
+        db = FakeSession({1: 2, 2: 1, 3: 3})
+        resultado = self._sweeper(db, ya_pagados={2}).sweep_once(batch_size=10)
+
+        assert resultado == {"expirados": 3, "cancelados": [1, 3], "liberadas": 1}
+        assert self.cancelados == [1, 3]
+        assert db.vencidas == {}
+        assert len(db.statements) == 2
+        assert db.committed and db.closed
+
+    def test_pedido_en_efectivo_no_se_cancela(self):
+        """Un pedido contra entrega solo pierde la reserva"""
+        db = FakeSession({1: 2}, pedidos={1: {**PENDIENTE_EN_LINEA, "metodo_pago": "Efectivo"}})
+        resultado = self._sweeper(db).sweep_once(batch_size=10)
+
+        assert self.cancelados == []
+        assert resultado == {"expirados": 1, "cancelados": [], "liberadas": 2}
+        assert db.vencidas == {}
+
+    def test_pedido_enviado_no_se_cancela(self):
+        """Un pedido que el admin ya despachó nunca se cancela, aunque siga sin pago registrado"""
+        db = FakeSession(
+            {1: 1, 2: 1},
+            pedidos={1: {**PENDIENTE_EN_LINEA, "estado": "Enviado"}, 2: PENDIENTE_EN_LINEA},
+        )
+        resultado = self._sweeper(db).sweep_once(batch_size=10)
+
+        assert self.cancelados == [2]
+        assert resultado["cancelados"] == [2] and resultado["liberadas"] == 1
+        assert db.vencidas == {}
+
+    def test_respeta_tamano_de_lote(self):
+        db = FakeSession({i: 1 for i in range(1, 6)})
+        resultado = self._sweeper(db).sweep_once(batch_size=2)
+
+        assert resultado["expirados"] == 2
+        assert list(db.vencidas) == [3, 4, 5]
+
+    def test_sin_vencidas(self):
+        db = FakeSession({})
+        resultado = self._sweeper(db).sweep_once(batch_size=10)
+
+        assert resultado == {"expirados": 0, "cancelados": [], "liberadas": 0}
+        assert len(db.statements) == 1
+
+    def test_error_hace_rollback(self):
+        db = FakeSession({1: 1})
+
+        async def cancel(session, pedido_id, razon=None, expected_estado=None):
+            raise RuntimeError("deadlock")
+
+        with pytest.raises(RuntimeError):
+            StockHoldSweeper(session_factory=lambda: db, cancel_order=cancel).sweep_once(batch_size=10)
+        assert db.rolled_back and not db.committed and db.closed
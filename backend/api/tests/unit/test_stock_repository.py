@@ -0,0 +1,125 @@
+"""
+Tests para la reserva de stock en una sola sentencia
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.infrastructure.repositories.stock_repository import (
+    InsufficientStockError,
+    StockRepository,
+    stock_items_param,
+)
+
+
+class FakeSession:
+    """Aplica el UPDATE condicional sobre un dict de stock, con la semántica todo-o-nada"""
+
+    def __init__(self, stock, nombres=None):
+        self.stock = stock
+        self.nombres = nombres or {}
+        self.statements = []
+        self.reservas = []
+
+    def _solicitado(self, params):
+        return {item["producto_id"]: item["cantidad"] for item in json.loads(params["items"])}
+
+    def _retenido(self, pid):
+        return sum(r["cantidad"] for r in self.reservas if r["producto_id"] == pid)
+
+    def execute(self, statement, params):
+        sql = str(statement)
+        self.statements.append(sql)
+        solicitado = self._solicitado(params)
+        faltan = [
+            pid for pid, cantidad in solicitado.items()
+            if pid not in self.stock or self.stock[pid] - self._retenido(pid) < cantidad
+        ]
+        if "INSERT INTO ReservasStock" in sql:
+            rows = []
+            if not faltan:
+                for pid, cantidad in solicitado.items():
+                    self.reservas.append({"pedido_id": params["pedido_id"], "producto_id": pid, "cantidad": cantidad})
+                    rows.append(SimpleNamespace(producto_id=pid, cantidad=cantidad))
+            return SimpleNamespace(fetchall=lambda: rows)
+        if sql.lstrip().startswith("WITH") and "UPDATE p" in sql:
+            rows = []
+            if not faltan:
+                for pid, cantidad in solicitado.items():
+                    self.stock[pid] -= cantidad
+                    rows.append(SimpleNamespace(id=pid, cantidad_disponible=self.stock[pid]))
+            return SimpleNamespace(fetchall=lambda: rows)
+        rows = [
+            SimpleNamespace(producto_id=pid, nombre=self.nombres.get(pid) if pid in self.stock else None,
+                            cantidad_disponible=self.stock[pid] - self._retenido(pid) if pid in self.stock else None,
+                            cantidad=solicitado[pid])
+            for pid in faltan
+        ]
+        return SimpleNamespace(fetchall=lambda: rows)
+
+
+@pytest.mark.unit
+class TestStockItemsParam:
+
+    def test_agrupa_y_ordena(self):
+        assert json.loads(stock_items_param([(3, 1), (1, 2), (3, 4)])) == [
+            {"producto_id": 1, "cantidad": 2}, {"producto_id": 3, "cantidad": 5}
+        ]
+
+    def test_cantidad_invalida(self):
+        with pytest.raises(ValueError):
+            stock_items_param([(1, 0)])
+
+
+@pytest.mark.unit
+class TestStockRepository:
+    """Una ida a la base cuando hay stock; nada reservado si falta una línea"""
+
+    def test_reserva_en_una_sentencia(self):
+        db = FakeSession({1: 10, 2: 5, 3: 1})
+        restante = StockRepository(db).reserve_items([(1, 2), (2, 5), (1, 1)])
+
+        assert restante == {1: 7, 2: 0}
+        assert len(db.statements) == 1
+        assert "OUTPUT inserted.id" in db.statements[0]
+        assert "UPDLOCK" in db.statements[0]
+        assert db.stock == {1: 7, 2: 0, 3: 1}
+
+    def test_todo_o_nada(self):
+        db = FakeSession({1: 10, 2: 1}, nombres={2: "Arena"})
+        with pytest.raises(InsufficientStockError) as exc_info:
+            StockRepository(db).reserve_items([(1, 2), (2, 3)])
+
+        assert db.stock == {1: 10, 2: 1}
+        assert exc_info.value.faltantes == [
+            {"producto_id": 2, "nombre": "Arena", "disponible": 1, "solicitado": 3}
+        ]
+        assert exc_info.value.message() == "Stock insuficiente para Arena. Disponible: 1, Solicitado: 3"
+
+    def test_producto_inexistente(self):
+        db = FakeSession({1: 10})
+        with pytest.raises(InsufficientStockError) as exc_info:
+            StockRepository(db).reserve_items([(1, 1), (99, 1)])
+        assert exc_info.value.message() == "Producto con ID 99 no encontrado"
+        assert db.stock == {1: 10}
+
+    def test_sin_items_no_consulta(self):
+        db = FakeSession({})
+        assert StockRepository(db).reserve_items([]) == {}
+        assert db.statements == []
+
+    def test_reserva_temporal_descuenta_disponible(self):
+        """Una reserva activa no toca el stock pero reduce lo disponible para otros pedidos"""
+        db = FakeSession({1: 5}, nombres={1: "Arena"})
+        repo = StockRepository(db)
+
+        assert repo.hold_items(10, [(1, 4)], ttl_seconds=900) == {1: 4}
+        assert db.stock == {1: 5}
+        assert "DATEADD(SECOND, :ttl_seconds" in db.statements[0]
+        assert "expira_en > SYSUTCDATETIME()" in db.statements[0]
+
+        with pytest.raises(InsufficientStockError) as exc_info:
+            repo.hold_items(11, [(1, 2)], ttl_seconds=900)
+        assert exc_info.value.message() == "Stock insuficiente para Arena. Disponible: 1, Solicitado: 2"
+        assert [r["pedido_id"] for r in db.reservas] == [10]
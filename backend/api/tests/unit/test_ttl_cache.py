@@ -0,0 +1,55 @@
+"""
+Pruebas unitarias para TTLCache (caché del catálogo público)
+"""
+import pytest
+
+from app.infrastructure.cache.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestTTLCache:
+    """Pruebas de expiración, LRU e invalidación"""
+
+    def test_get_returns_stored_value(self):
+        """Debe devolver el valor almacenado antes de expirar"""
+        cache = TTLCache(max_entries=4, ttl_seconds=10, clock=FakeClock())
+        cache.set("k", [1, 2])
+        assert cache.get("k") == [1, 2]
+
+    def test_entry_expires_after_ttl(self):
+        """Debe descartar entradas vencidas"""
+        clock = FakeClock()
+        cache = TTLCache(max_entries=4, ttl_seconds=10, clock=clock)
+        cache.set("k", "v")
+        clock.now = 10.0
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Debe expulsar la entrada usada hace más tiempo"""
+        cache = TTLCache(max_entries=2, ttl_seconds=10, clock=FakeClock())
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_invalidate_clears_and_rejects_stale_set(self):
+        """Un valor calculado antes de invalidar no debe guardarse"""
+        cache = TTLCache(max_entries=4, ttl_seconds=10, clock=FakeClock())
+        cache.set("a", 1)
+        generation = cache.generation
+        cache.invalidate()
+        assert cache.get("a") is None
+        cache.set("b", 2, generation=generation)
+        assert cache.get("b") is None
@@ -0,0 +1,11 @@
+-- Migration: 016_add_productos_keyset_index.sql
+-- Description: Composite index backing keyset (cursor) pagination of product listings
+--              ORDER BY fecha_creacion DESC, id DESC filtered by activo = 1
+-- Date: 2026-10-17
+-- Idempotent: YES (uses IF NOT EXISTS)
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_producto_activo_fecha_id' AND object_id = OBJECT_ID('Productos'))
+    CREATE INDEX idx_producto_activo_fecha_id
+        ON Productos(activo, fecha_creacion DESC, id DESC)
+        INCLUDE (cantidad_disponible, categoria_id, subcategoria_id);
+GO
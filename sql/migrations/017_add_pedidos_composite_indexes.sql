@@ -0,0 +1,25 @@
+-- Migration: 017_add_pedidos_composite_indexes.sql
+-- Description: Composite indexes matching the admin order list filter shapes
+--              (WHERE estado / estado_pago / usuario_id ORDER BY fecha_creacion DESC, id DESC),
+--              so filtered pages and keyset cursors seek instead of sorting the range.
+--              INCLUDE columns cover the ?view=summary projection.
+-- Date: 2026-10-17
+-- Idempotent: YES (uses IF NOT EXISTS)
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_pedido_estado_fecha_id' AND object_id = OBJECT_ID('Pedidos'))
+    CREATE INDEX idx_pedido_estado_fecha_id
+        ON Pedidos(estado, fecha_creacion DESC, id DESC)
+        INCLUDE (usuario_id, estado_pago, total);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_pedido_estado_pago_fecha_id' AND object_id = OBJECT_ID('Pedidos'))
+    CREATE INDEX idx_pedido_estado_pago_fecha_id
+        ON Pedidos(estado_pago, fecha_creacion DESC, id DESC)
+        INCLUDE (usuario_id, estado, total);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_pedido_usuario_fecha_id' AND object_id = OBJECT_ID('Pedidos'))
+    CREATE INDEX idx_pedido_usuario_fecha_id
+        ON Pedidos(usuario_id, fecha_creacion DESC, id DESC)
+        INCLUDE (estado, estado_pago, total);
+GO
@@ -0,0 +1,45 @@
+-- Migration: 018_create_reservas_stock.sql
+-- Description: Time-limited stock holds for orders pending payment.
+--              Available stock = Productos.cantidad_disponible - SUM(cantidad) of holds with expira_en > now.
+--              Holds are deleted when the order is paid (stock deducted) or cancelled; the API's
+--              background sweeper cancels orders whose holds expired.
+-- Date: 2026-10-17
+-- Idempotent: YES (uses IF NOT EXISTS)
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'ReservasStock')
+BEGIN
+    CREATE TABLE [dbo].[ReservasStock] (
+        [id] INT NOT NULL PRIMARY KEY IDENTITY(1,1),
+        [pedido_id] INT NOT NULL,
+        [producto_id] INT NOT NULL,
+        [cantidad] INT NOT NULL,
+        [expira_en] DATETIME2(3) NOT NULL,
+        [fecha_creacion] DATETIME2(3) NOT NULL DEFAULT SYSUTCDATETIME(),
+
+        CONSTRAINT [FK_ReservasStock_Pedidos]
+            FOREIGN KEY ([pedido_id]) REFERENCES [dbo].[Pedidos](id) ON DELETE CASCADE,
+        CONSTRAINT [CK_ReservasStock_Cantidad] CHECK ([cantidad] > 0)
+    );
+
+    PRINT '✅ Table [ReservasStock] created successfully';
+END
+ELSE
+BEGIN
+    PRINT '⚠️  Table [ReservasStock] already exists';
+END
+GO
+
+-- Active holds per product (availability checks)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ReservasStock_Producto_Expira' AND object_id = OBJECT_ID('ReservasStock'))
+    CREATE INDEX IX_ReservasStock_Producto_Expira ON ReservasStock(producto_id, expira_en) INCLUDE (cantidad, pedido_id);
+GO
+
+-- Sweeper: expired holds, oldest first
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ReservasStock_Expira' AND object_id = OBJECT_ID('ReservasStock'))
+    CREATE INDEX IX_ReservasStock_Expira ON ReservasStock(expira_en) INCLUDE (pedido_id);
+GO
+
+-- Release on payment / cancellation
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ReservasStock_Pedido' AND object_id = OBJECT_ID('ReservasStock'))
+    CREATE INDEX IX_ReservasStock_Pedido ON ReservasStock(pedido_id);
+GO
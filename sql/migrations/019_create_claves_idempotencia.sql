@@ -0,0 +1,33 @@
+-- Migration: 019_create_claves_idempotencia.sql
+-- Description: Stored responses for requests sent with an Idempotency-Key header
+--              (POST /api/pedidos, POST /api/pagos/create-payment-intent).
+--              Keys are stored as SHA-256(endpoint + key) so rows are fixed-width; the row is
+--              inserted in the same transaction as the order/transaction it describes.
+-- Date: 2026-10-17
+-- Idempotent: YES (uses IF NOT EXISTS)
+
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'ClavesIdempotencia')
+BEGIN
+    CREATE TABLE [dbo].[ClavesIdempotencia] (
+        [usuario_id] INT NOT NULL,
+        [clave_hash] BINARY(32) NOT NULL,
+        [solicitud_hash] BINARY(32) NOT NULL,
+        [status_code] SMALLINT NULL,
+        [respuesta] NVARCHAR(MAX) NULL,
+        [expira_en] DATETIME2(0) NOT NULL,
+
+        CONSTRAINT [PK_ClavesIdempotencia] PRIMARY KEY CLUSTERED ([usuario_id], [clave_hash])
+    );
+
+    PRINT '✅ Table [ClavesIdempotencia] created successfully';
+END
+ELSE
+BEGIN
+    PRINT '⚠️  Table [ClavesIdempotencia] already exists';
+END
+GO
+
+-- Purge of expired keys
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ClavesIdempotencia_Expira' AND object_id = OBJECT_ID('ClavesIdempotencia'))
+    CREATE INDEX IX_ClavesIdempotencia_Expira ON ClavesIdempotencia(expira_en);
+GO